@@ -0,0 +1,208 @@
+"""
+Benchmarks of the model hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.run_benchmarks                      # run and compare against benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --json results.json  # also write machine-readable results
+    python -m benchmarks.run_benchmarks --save-baseline      # store the results as the new baseline
+    python -m benchmarks.run_benchmarks -k fleet             # only benchmarks whose name contains 'fleet'
+
+A benchmark is reported as a regression when its best time is more than ``--threshold`` times the baseline; the exit
+status is then 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import EvBatch, iter_design_space
+from models.ev_table import ev_table
+from models.factorized import FactorizedEvaluator
+from models.fleet import Fleet
+from models.multi_attribute_utility import MultiAttributeUtility, score_batch
+from models.route import Route
+from models.simulation import simulate_fleet
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+REFERENCE_ROUTES = (Route(length_km=5, number_stops=3), Route(length_km=15, number_stops=8), Route(length_km=40, number_stops=20))
+
+_BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark. The decorated function does any setup and returns the zero-argument callable to time.
+    """
+    def register(setup):
+        _BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _feasible_evs() -> list:
+    evs = []
+    for choices in iter_design_space():
+        try:
+            evs.append(Ev(*choices))
+        except ValueError:
+            continue
+    return evs
+
+
+@benchmark('ev_construction')
+def _ev_construction():
+    choices = list(iter_design_space())[3000]
+    return lambda: Ev(*choices)
+
+
+@benchmark('ev_batch_design_space')
+def _ev_batch_design_space():
+    return EvBatch.design_space
+
+
+@benchmark('ev_table_query')
+def _ev_table_query():
+    table = ev_table()
+
+    def query():
+        rows = table.where(range_km=(150, None), availability=(0.8, None), passenger_capacity=(8, None), total_vehicle_cost_1k_usd=(None, 60))
+        return table.project(table.top(10, 'availability', rows), columns=('availability', 'total_vehicle_cost_1k_usd'))
+    return query
+
+
+@benchmark('fleet_fixed_size')
+def _fleet_fixed_size():
+    ev = _feasible_evs()[500]
+    route = REFERENCE_ROUTES[1]
+    return lambda: Fleet(route, ev, fleet_size=12)
+
+
+@benchmark('fleet_throughput_target')
+def _fleet_throughput_target():
+    # C1 has 2 seats, the worst case for fleet sizing
+    ev = next(ev for ev in _feasible_evs() if ev.chasis.passenger_capacity == 2)
+    route = REFERENCE_ROUTES[0]
+    return lambda: Fleet(route, ev, peak_throughput_target=5000)
+
+
+@benchmark('mau_scalar')
+def _mau_scalar():
+    return lambda: MultiAttributeUtility(daily_passenger_volume=1234.5, peak_passenger_throuput=123, average_wait_time_minutes=7.5, availability=0.7123)
+
+
+@benchmark('mau_batch_100k')
+def _mau_batch():
+    rng = np.random.default_rng(0)
+    volume, throughput, wait, availability = rng.uniform(0, 3000, 100_000), rng.integers(0, 260, 100_000), rng.uniform(0, 35, 100_000), rng.uniform(0, 1, 100_000)
+    return lambda: score_batch(volume, throughput, wait, availability)
+
+
+@benchmark('fleet_to_dict')
+def _fleet_to_dict():
+    fleet = Fleet(REFERENCE_ROUTES[1], _feasible_evs()[500], fleet_size=12)
+    return fleet.to_dict
+
+
+@benchmark('full_catalog_sweep')
+def _full_catalog_sweep():
+    evs = _feasible_evs()
+
+    def sweep():
+        return [Fleet(route, ev, peak_throughput_target=150).score for route in REFERENCE_ROUTES for ev in evs]
+    return sweep
+
+
+@benchmark('factorized_catalog_sweep')
+def _factorized_catalog_sweep():
+    # the full_catalog_sweep scores through fleet equivalence classes
+    def sweep():
+        evaluator = FactorizedEvaluator()
+        return [evaluator.evaluate(route, peak_throughput_targets=[150])['score'] for route in REFERENCE_ROUTES]
+    return sweep
+
+
+@benchmark('simulation_300_vehicles_7_days')
+def _simulation():
+    return lambda: simulate_fleet(REFERENCE_ROUTES[2], _feasible_evs()[500], 300, days=7, chargers=30)
+
+
+def run(names=None, repeat: int = 5) -> dict:
+    """
+    Times the selected benchmarks and returns ``{name: {'best': s, 'median': s, 'loops': n}}`` with per-call seconds.
+    """
+    results = {}
+    for name, setup in _BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        timer = timeit.Timer(setup())
+        loops, _ = timer.autorange()
+        timings = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+        results[name] = {'best': min(timings), 'median': statistics.median(timings), 'loops': loops}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns ``(name, ratio, regressed)`` for every benchmark present in both, with ``ratio = best / baseline best``.
+    """
+    rows = []
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['best'] / baseline[name]['best']
+            rows.append((name, ratio, ratio > threshold))
+    return rows
+
+
+def _environment() -> dict:
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(), 'platform': platform.platform()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the EV model hot paths.')
+    parser.add_argument('-k', dest='filter', default=None, help='only run benchmarks whose name contains this string')
+    parser.add_argument('--json', default=None, help='write results as JSON to this path')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with these results')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    names = None if args.filter is None else [name for name in _BENCHMARKS if args.filter in name]
+    report = {'environment': _environment(), 'results': run(names, repeat=args.repeat)}
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    ratios = {name: (ratio, regressed) for name, ratio, regressed in compare(report['results'], baseline, args.threshold)}
+
+    print(f'{"benchmark":<28}{"best":>14}{"median":>14}{"vs baseline":>14}')
+    for name, result in report['results'].items():
+        ratio, regressed = ratios.get(name, (None, False))
+        vs = '' if ratio is None else f'{ratio:.2f}x' + (' REGRESSION' if regressed else '')
+        print(f'{name:<28}{1e6*result["best"]:>12.1f}us{1e6*result["median"]:>12.1f}us  {vs}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f'baseline saved to {args.baseline}')
+
+    return 1 if any(regressed for _, regressed in ratios.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
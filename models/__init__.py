@@ -0,0 +1,5 @@
+import os
+
+if os.environ.get('MODELS_INSTRUMENT', '') not in ('', '0'):
+    from models.instrumentation import enable_from_environment
+    enable_from_environment()
@@ -0,0 +1,59 @@
+class derived:
+    """
+    Non-data descriptor computing a derived attribute on first access and caching it in the instance ``__dict__``.
+
+    Eagerly built instances assign the attribute in ``__init__``, which shadows the descriptor, so they never reach it.
+    Lazily built instances skip the assignment; dependencies between derived attributes resolve themselves, because
+    computing one reads the others through their own descriptors.
+    """
+
+    __slots__ = ('getter', 'name')
+
+    def __init__(self, getter) -> None:
+        self.getter = getter
+        self.name = None
+
+    def __set_name__(self, owner, name) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.getter(instance)
+        # written straight to __dict__ so that read-only subclasses (FrozenEv) can still cache
+        instance.__dict__[self.name] = value
+        return value
+
+
+def is_lazy(instance, names: tuple) -> bool:
+    """
+    Whether some of the derived attributes ``names`` of ``instance`` have not been computed yet.
+    """
+    state = instance.__dict__
+    return any(name not in state for name in names)
+
+
+def invalidate(instance, names: tuple) -> None:
+    """
+    Drops the cached values of the derived attributes ``names``, to be recomputed on next access.
+    """
+    state = instance.__dict__
+    for name in names:
+        state.pop(name, None)
+
+
+def ordered_state(instance, names: tuple) -> dict:
+    """
+    ``instance.__dict__`` with every derived attribute in ``names`` computed and placed last, in the order of ``names``.
+
+    That is the order an eagerly built instance assigns them in, so lazy and eager instances list their attributes the same.
+    Instances already in that order (all eagerly built ones) get their ``__dict__`` back as is, which must not be modified.
+    """
+    state = instance.__dict__
+    if tuple(state)[-len(names):] == names:
+        return state
+
+    values = [getattr(instance, name) for name in names]
+    state = {k: v for k, v in state.items() if k not in names}
+    state.update(zip(names, values))
+    return state
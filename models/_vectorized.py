@@ -0,0 +1,54 @@
+import numpy as np
+
+
+# Veltkamp splitter for float64: splits a double into two 26-bit halves whose products are exact
+_SPLITTER = 2.0 ** 27 + 1
+
+
+def _split(a: np.ndarray) -> tuple:
+    t = _SPLITTER * a
+    high = t - (t - a)
+    return high, a - high
+
+
+def _product_error(a: np.ndarray, b: float, product: np.ndarray) -> np.ndarray:
+    # Dekker's two-product: a * b == product + error exactly
+    a_high, a_low = _split(a)
+    b_high, b_low = _split(np.float64(b))
+    return ((a_high * b_high - product) + a_high * b_low + a_low * b_high) + a_low * b_low
+
+
+def _round_near_ties(values: np.ndarray, ndigits: int) -> np.ndarray:
+    # decides on which side of the decimal midpoint (2k + 1) / (2 * 10**ndigits) each value exactly lies, then rounds
+    # half to even like the builtin
+    scale = 10.0 ** ndigits
+    k = np.floor(values * scale)
+    twice_scaled = values * (2 * scale)
+    side = (twice_scaled - (2 * k + 1)) + _product_error(values, 2 * scale, twice_scaled)
+    tie = side == 0
+    k = k + ((side > 0) | (tie & (k % 2 == 1)))
+    return np.copysign(k / scale, values)
+
+
+def round_like_python(values, ndigits: int) -> np.ndarray:
+    """
+    Element-wise equivalent of the builtin ``round(x, ndigits)`` for float arrays.
+
+    ``np.round`` scales by ``10**ndigits`` before rounding, which can land on the other side of a
+    half-way point than the builtin does. Those near-ties are decided exactly with an error-free product,
+    so the result is bit-identical to the scalar model code.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * (10.0 ** ndigits)
+    near_tie = np.isfinite(scaled) & (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if near_tie.any():
+        rounded = np.array(rounded, copy=True)
+        tied = values[near_tie]
+        if 0 <= ndigits <= 15 and np.all(np.abs(tied) < 1e290):
+            rounded[near_tie] = _round_near_ties(tied, ndigits)
+        else:
+            rounded[near_tie] = [round(v, ndigits) for v in tied.tolist()]
+
+    return rounded
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from models.catalog import CatalogComponent, ComponentCatalog
+
 
 class AutonomousSystemChoice(Enum):
     """
@@ -27,58 +29,32 @@ class AutonomousSystemChoice(Enum):
     A5 = auto()
 
 
-class AutonomousSystem:
-    """
-    :class:`AutonomousSystem` represents an instance of an autonomous system. To be used in the construction of :class:`Ev`
-    """
-
-    def __init__(self, autonomous_system: AutonomousSystemChoice) -> None:
-
-        if type(autonomous_system) is not AutonomousSystemChoice:
-            raise ValueError(f'autonomous_system argument must be of type AutonomousSystemChoice rather than supplied {type(autonomous_system)}')
-
-        self._key_weight_kg = "weight_kg"
-        self._key_added_power_consumption_Wh_per_kW = "added_power_consumption_Wh_per_kW"
-        self._key_cost_1k_usd = "cost_1k_usd"
+AUTONOMOUS_SYSTEM_CATALOG = ComponentCatalog(
+    AutonomousSystemChoice,
+    fields=('weight_kg', 'added_power_consumption_Wh_per_kW', 'cost_1k_usd'),
+    rows={
+        AutonomousSystemChoice.A1: (5, 0.5, 1),
+        AutonomousSystemChoice.A2: (12, 1.0, 2),
+        AutonomousSystemChoice.A3: (30, 1.5, 15),
+        AutonomousSystemChoice.A4: (60, 2.5, 35),
+        AutonomousSystemChoice.A5: (120, 5.0, 60)
+    }
+)
 
-        attribute_dict = self._get_attribute_mapping(autonomous_system)
 
-        self.choice: AutonomousSystemChoice = autonomous_system
-        self.weight_kg: float = attribute_dict.get(self._key_weight_kg, -1)
-        self.added_power_consumption_Wh_per_kW: float = attribute_dict.get(self._key_added_power_consumption_Wh_per_kW, -1)
-        self.cost_1k_usd: float =  attribute_dict.get(self._key_cost_1k_usd, -1)
+class AutonomousSystem(CatalogComponent):
+    """
+    :class:`AutonomousSystem` represents an instance of an autonomous system. To be used in the construction of :class:`Ev`
 
-    def _get_attribute_mapping(self, autonomous_system: AutonomousSystemChoice) -> dict:
+    Instances are shared per choice and read-only; their attributes come from :data:`AUTONOMOUS_SYSTEM_CATALOG`.
+    """
 
-        attribute_map = {
-            AutonomousSystemChoice.A1: {
-                self._key_weight_kg: 5,
-                self._key_added_power_consumption_Wh_per_kW: 0.5,
-                self._key_cost_1k_usd: 1
-            },
-            AutonomousSystemChoice.A2: {
-                self._key_weight_kg: 12,
-                self._key_added_power_consumption_Wh_per_kW: 1.0,
-                self._key_cost_1k_usd: 2
-            },
-            AutonomousSystemChoice.A3: {
-                self._key_weight_kg: 30,
-                self._key_added_power_consumption_Wh_per_kW: 1.5,
-                self._key_cost_1k_usd: 15
-            },
-            AutonomousSystemChoice.A4: {
-                self._key_weight_kg: 60,
-                self._key_added_power_consumption_Wh_per_kW: 2.5,
-                self._key_cost_1k_usd: 35
-            },
-            AutonomousSystemChoice.A5: {
-                self._key_weight_kg: 120,
-                self._key_added_power_consumption_Wh_per_kW: 5.0,
-                self._key_cost_1k_usd: 60
-            }
-        }
+    __slots__ = ('weight_kg', 'added_power_consumption_Wh_per_kW', 'cost_1k_usd')
 
-        return attribute_map.get(autonomous_system, None)
+    CATALOG = AUTONOMOUS_SYSTEM_CATALOG
+    ARGUMENT_NAME = 'autonomous_system'
 
-    def __str__(self) -> str:
-        return self.choice.name
+    choice: AutonomousSystemChoice
+    weight_kg: float
+    added_power_consumption_Wh_per_kW: float
+    cost_1k_usd: float
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from models.catalog import CatalogComponent, ComponentCatalog
+
 
 class BatteryChargerChoice(Enum):
     """
@@ -22,48 +24,30 @@ class BatteryChargerChoice(Enum):
     G3 = auto()
 
 
-class BatteryCharger:
-    """
-    :class:`BatteryCharger` represents an instance of a battery charger. To be used in the construction of :class:`Ev`
-    """
-
-    def __init__(self, battery_charger_choice: BatteryChargerChoice) -> None:
-        
-        if type(battery_charger_choice) is not BatteryChargerChoice:
-            raise ValueError(f'battery_charger_choice argument must be of type BatteryChargerChoice rather than supplied {type(battery_charger_choice)}')
+BATTERY_CHARGER_CATALOG = ComponentCatalog(
+    BatteryChargerChoice,
+    fields=('power_kW', 'cost_1k_usd', 'weight_kg'),
+    rows={
+        BatteryChargerChoice.G1: (10, 1, 1),
+        BatteryChargerChoice.G2: (20, 2.5, 1.8),
+        BatteryChargerChoice.G3: (60, 10, 5)
+    }
+)
 
-        self._key_power_kW = "power_kW"
-        self._key_cost_1k_usd = "cost_1k_usd"
-        self._key_weight_kg = "weight_kg"
 
-        attribute_dict = self._get_attribute_mapping(battery_charger_choice)
-
-        self.choice: BatteryChargerChoice = battery_charger_choice
-        self.power_kW: float = attribute_dict.get(self._key_power_kW, -1)
-        self.cost_1k_usd: float = attribute_dict.get(self._key_cost_1k_usd, -1)
-        self.weight_kg: float = attribute_dict.get(self._key_weight_kg, -1)
+class BatteryCharger(CatalogComponent):
+    """
+    :class:`BatteryCharger` represents an instance of a battery charger. To be used in the construction of :class:`Ev`
 
-    def _get_attribute_mapping(self, battery_choice: BatteryChargerChoice) -> dict:
+    Instances are shared per choice and read-only; their attributes come from :data:`BATTERY_CHARGER_CATALOG`.
+    """
 
-        attribute_map = {
-            BatteryChargerChoice.G1: {
-                self._key_power_kW: 10,
-                self._key_cost_1k_usd: 1,
-                self._key_weight_kg: 1
-            },
-            BatteryChargerChoice.G2: {
-                self._key_power_kW: 20,
-                self._key_cost_1k_usd: 2.5,
-                self._key_weight_kg: 1.8
-            },
-            BatteryChargerChoice.G3: {
-                self._key_power_kW: 60,
-                self._key_cost_1k_usd: 10,
-                self._key_weight_kg: 5
-            }
-        }
+    __slots__ = ('power_kW', 'cost_1k_usd', 'weight_kg')
 
-        return attribute_map.get(battery_choice, None)
+    CATALOG = BATTERY_CHARGER_CATALOG
+    ARGUMENT_NAME = 'battery_charger_choice'
 
-    def __str__(self) -> str:
-        return self.choice.name
+    choice: BatteryChargerChoice
+    power_kW: float
+    cost_1k_usd: float
+    weight_kg: float
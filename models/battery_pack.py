@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from models.catalog import CatalogComponent, ComponentCatalog
+
 
 class BatteryPackChoice(Enum):
     """
@@ -34,68 +36,34 @@ class BatteryPackChoice(Enum):
     P7 = auto()
 
 
-class BatteryPack:
-    """
-    :class:`BatteryPack` represents an instance of a battery Pack. To be used in the construction of :class:`Ev`
-    """
-
-    def __init__(self, battery_pack_choice: BatteryPackChoice) -> None:
-                
-        if type(battery_pack_choice) is not BatteryPackChoice:
-            raise ValueError(f'battery_pack_choice argument must be of type BatteryPackChoice rather than supplied {type(battery_pack_choice)}')
+BATTERY_PACK_CATALOG = ComponentCatalog(
+    BatteryPackChoice,
+    fields=('capacity_kWh', 'cost_1k_usd', 'weight_kg'),
+    rows={
+        BatteryPackChoice.P1: (40, 8, 512),
+        BatteryPackChoice.P2: (60, 16, 420),
+        BatteryPackChoice.P3: (75, 16, 825),
+        BatteryPackChoice.P4: (100, 25, 800),
+        BatteryPackChoice.P5: (125, 25, 1500),
+        BatteryPackChoice.P6: (240, 62, 1680),
+        BatteryPackChoice.P7: (240, 48, 2880)
+    }
+)
 
-        self._key_capacity_kWh = "capacity_kWh"
-        self._key_cost_1k_usd = "cost_1k_usd"
-        self._key_weight_kg = "weight_kg"
 
-        attribute_dict = self._get_attribute_mapping(battery_pack_choice)
-
-        self.choice: BatteryPackChoice = battery_pack_choice
-        self.capacity_kWh: float = attribute_dict.get(self._key_capacity_kWh, -1)
-        self.cost_1k_usd: float = attribute_dict.get(self._key_cost_1k_usd, -1)
-        self.weight_kg: float = attribute_dict.get(self._key_weight_kg, -1)
+class BatteryPack(CatalogComponent):
+    """
+    :class:`BatteryPack` represents an instance of a battery Pack. To be used in the construction of :class:`Ev`
 
-    def _get_attribute_mapping(self, battery_pack_choice: BatteryPackChoice) -> dict:
+    Instances are shared per choice and read-only; their attributes come from :data:`BATTERY_PACK_CATALOG`.
+    """
 
-        attribute_map = {
-            BatteryPackChoice.P1: {
-                self._key_capacity_kWh: 40,
-                self._key_cost_1k_usd: 8,
-                self._key_weight_kg: 512
-            },
-            BatteryPackChoice.P2: {
-                self._key_capacity_kWh: 60,
-                self._key_cost_1k_usd: 16,
-                self._key_weight_kg: 420
-            },
-            BatteryPackChoice.P3: {
-                self._key_capacity_kWh: 75,
-                self._key_cost_1k_usd: 16,
-                self._key_weight_kg: 825
-            },
-            BatteryPackChoice.P4: {
-                self._key_capacity_kWh: 100,
-                self._key_cost_1k_usd: 25,
-                self._key_weight_kg: 800
-            },
-            BatteryPackChoice.P5: {
-                self._key_capacity_kWh: 125,
-                self._key_cost_1k_usd: 25,
-                self._key_weight_kg: 1500
-            },
-            BatteryPackChoice.P6: {
-                self._key_capacity_kWh: 240,
-                self._key_cost_1k_usd: 62,
-                self._key_weight_kg: 1680
-            },
-            BatteryPackChoice.P7: {
-                self._key_capacity_kWh: 240,
-                self._key_cost_1k_usd: 48,
-                self._key_weight_kg: 2880
-            }
-        }
+    __slots__ = ('capacity_kWh', 'cost_1k_usd', 'weight_kg')
 
-        return attribute_map.get(battery_pack_choice, None)
+    CATALOG = BATTERY_PACK_CATALOG
+    ARGUMENT_NAME = 'battery_pack_choice'
 
-    def __str__(self) -> str:
-        return self.choice.name
+    choice: BatteryPackChoice
+    capacity_kWh: float
+    cost_1k_usd: float
+    weight_kg: float
@@ -0,0 +1,229 @@
+import math
+
+import numpy as np
+
+from models.autonomous_system import AUTONOMOUS_SYSTEM_CATALOG
+from models.battery_charger import BATTERY_CHARGER_CATALOG
+from models.battery_pack import BATTERY_PACK_CATALOG
+from models.chasis import CHASIS_CATALOG
+from models.ev import MAX_SPEED_KMH, UNCONSTRAINED_MAX_SPEED_KMH, Ev
+from models.fleet import DWELL_TIME_SECONDS, LOAD_FACTOR_EXPECTED_AVG, Fleet, FleetSizeScan
+from models.multi_attribute_utility import (AVAILABILITY_UTILITY, AVERAGE_WAIT_TIME_UTILITY, PASSENGER_VOLUME_UTILITY, PEAK_PASSENGER_THROUGHPUT_UTILITY,
+                                            WEIGHT_AVAILABILITY, WEIGHT_AVERAGE_WAIT_TIME, WEIGHT_PASSENGER_VOLUME, WEIGHT_PEAK_PASSENGER_THROUGHPUT)
+from models.motor_and_inverter import MOTOR_AND_INVERTER_CATALOG
+from models.route import Route
+
+
+# Branching order: the families that bound the score most tightly come first
+_FAMILIES = ('chasis', 'motor_and_inverter', 'battery_pack', 'battery_charger', 'autonomous_system')
+_CATALOGS = {
+    'autonomous_system': AUTONOMOUS_SYSTEM_CATALOG,
+    'battery_charger': BATTERY_CHARGER_CATALOG,
+    'battery_pack': BATTERY_PACK_CATALOG,
+    'chasis': CHASIS_CATALOG,
+    'motor_and_inverter': MOTOR_AND_INVERTER_CATALOG,
+}
+# Ev argument order
+_EV_ORDER = ('autonomous_system', 'battery_charger', 'battery_pack', 'chasis', 'motor_and_inverter')
+
+# Absorbs the 3-4 decimal rounding Ev, Fleet and MultiAttributeUtility apply to the quantities the bounds relax
+_ROUNDING_SLACK = 1e-3
+_SCORE_SLACK = 2e-4
+
+
+class BudgetOptimizationResult:
+    """
+    :class:`BudgetOptimizationResult` holds the optimal configurations found by :func:`optimize_under_budget` and how much of
+    the design space had to be evaluated to prove them optimal.
+
+    ``configurations`` lists ``(choices, fleet_size, fleet_cost_1k_usd)`` for every :class:`Ev` configuration reaching the
+    optimal score, each with the smallest fleet size that reaches it.
+    """
+
+    def __init__(self, score: float, configurations: list, statistics: dict) -> None:
+        self.score: float = score
+        self.configurations: list = configurations
+        self.statistics: dict = statistics
+
+    @property
+    def pruned_fraction(self) -> float:
+        """
+        Share of the :class:`Ev` configurations that were never evaluated.
+        """
+        return 1 - self.statistics['configurations_evaluated'] / self.statistics['configurations_total']
+
+    def __str__(self) -> str:
+        s = f'Best score: {self.score}\n'
+        for choices, fleet_size, fleet_cost_1k_usd in self.configurations:
+            s += f'\t{"-".join(choice.name for choice in choices)} x{fleet_size}: {fleet_cost_1k_usd} k$\n'
+        for k, v in self.statistics.items():
+            s += f'\t{k}: {v}\n'
+        return s
+
+
+def _max_affordable_fleet_size(vehicle_cost_1k_usd: float, budget_1k_usd: float) -> int:
+    fleet_size = math.floor(budget_1k_usd / vehicle_cost_1k_usd)
+    while vehicle_cost_1k_usd * (fleet_size + 1) <= budget_1k_usd:
+        fleet_size += 1
+    while fleet_size > 0 and vehicle_cost_1k_usd * fleet_size > budget_1k_usd:
+        fleet_size -= 1
+    return fleet_size
+
+
+class _ScoreBound:
+    """
+    Optimistic bound on the :class:`Fleet` score of any configuration completing a partial subsystem assignment.
+
+    Every quantity feeding the score is relaxed towards its best value over the unassigned families: cheapest parts (largest
+    affordable fleet), lightest parts (fastest vehicle, lowest consumption), biggest chassis and so on. The utility maps are
+    monotone, so the weighted sum at the relaxed quantities bounds the score from above.
+    """
+
+    def __init__(self, route: Route, budget_1k_usd: float, max_speed_kmh: float) -> None:
+        self.route = route
+        self.budget_1k_usd = budget_1k_usd
+        self.max_speed_kmh = max_speed_kmh
+        self.dwell_minutes = round(DWELL_TIME_SECONDS/60, 2) * route.stops
+
+    @staticmethod
+    def _range(assignment, family, field):
+        catalog = _CATALOGS[family]
+        if family in assignment:
+            value = catalog[field][assignment[family]]
+            return value, value
+        return catalog[field].min(), catalog[field].max()
+
+    def __call__(self, assignment: dict) -> float:
+        cost_min = sum(self._range(assignment, family, 'cost_1k_usd')[0] for family in _FAMILIES)
+        if cost_min <= 0:
+            return math.inf
+        fleet_size = math.floor(self.budget_1k_usd / (cost_min - 0.01)) if cost_min > 0.01 else math.inf
+        if fleet_size < 1:
+            return -math.inf
+
+        chasis_weight_min, chasis_weight_max = self._range(assignment, 'chasis', 'weight_kg')
+        other_weight_min = sum(self._range(assignment, family, 'weight_kg')[0] for family in _FAMILIES if family != 'chasis')
+        other_weight_max = sum(self._range(assignment, family, 'weight_kg')[1] for family in _FAMILIES if family != 'chasis')
+        power_min, power_max = self._range(assignment, 'motor_and_inverter', 'power_kW')
+
+        speed_max = min(self.max_speed_kmh, 700 * power_max / (chasis_weight_min + other_weight_min) + _ROUNDING_SLACK)
+        speed_min = min(self.max_speed_kmh, 700 * power_min / (chasis_weight_max + other_weight_max)) - _ROUNDING_SLACK
+
+        # utilities of throughput, volume and waiting time all improve with a shorter round-trip
+        roundtrip_min = 60 * self.route.length_km / speed_max + self.dwell_minutes - _ROUNDING_SLACK
+        if roundtrip_min <= 0 or math.isinf(fleet_size):
+            throughput_max = volume_utility = throughput_utility = wait_utility = math.inf
+        else:
+            capacity_max = self._range(assignment, 'chasis', 'passenger_capacity')[1]
+            throughput_max = math.floor(capacity_max * LOAD_FACTOR_EXPECTED_AVG * fleet_size) * 60 * fleet_size / roundtrip_min
+            wait_min = max(0.0, roundtrip_min / fleet_size - _ROUNDING_SLACK)
+            throughput_utility = PEAK_PASSENGER_THROUGHPUT_UTILITY(throughput_max)
+            wait_utility = AVERAGE_WAIT_TIME_UTILITY(wait_min)
+
+        nominal_power_min = self._range(assignment, 'chasis', 'nominal_power_consumption_Wh_per_km')[0]
+        added_power_min = self._range(assignment, 'autonomous_system', 'added_power_consumption_Wh_per_kW')[0]
+        capacity_kWh_min, capacity_kWh_max = self._range(assignment, 'battery_pack', 'capacity_kWh')
+        charger_power_max = self._range(assignment, 'battery_charger', 'power_kW')[1]
+
+        power_consumption_min = nominal_power_min + 0.1 * other_weight_min + added_power_min - _ROUNDING_SLACK
+        uptime_max = 1000 * capacity_kWh_max / power_consumption_min / max(speed_min, _ROUNDING_SLACK) + _ROUNDING_SLACK
+        downtime_min = capacity_kWh_min / charger_power_max + 0.25 - _ROUNDING_SLACK
+        availability_max = min(1.0, uptime_max / (uptime_max + downtime_min) + _ROUNDING_SLACK)
+
+        if math.isinf(throughput_max):
+            volume_utility = throughput_utility = wait_utility = 1.0
+        else:
+            volume_utility = PASSENGER_VOLUME_UTILITY(throughput_max * 24 * availability_max)
+
+        return WEIGHT_PASSENGER_VOLUME * volume_utility + WEIGHT_PEAK_PASSENGER_THROUGHPUT * throughput_utility + \
+            WEIGHT_AVERAGE_WAIT_TIME * wait_utility + WEIGHT_AVAILABILITY * AVAILABILITY_UTILITY(availability_max) + _SCORE_SLACK
+
+
+def optimize_under_budget(route: Route, budget_1k_usd: float, violate_constraints=False) -> BudgetOptimizationResult:
+    """
+    Finds the highest :attr:`Fleet.score` achievable on ``route`` with ``fleet_cost_1k_usd <= budget_1k_usd``.
+
+    The score never decreases with the fleet size, so each :class:`Ev` only needs evaluating at its largest affordable
+    fleet. Subsystem choices are explored depth first; a subtree is pruned when the :class:`_ScoreBound` of its partial
+    assignment falls below the best score found so far, or when it breaks the battery weight constraint. The result is
+    provably optimal and ties are all reported.
+    """
+    if type(route) is not Route:
+        raise ValueError(f'route argument must be of type route rather than supplied {type(route)}')
+    if not budget_1k_usd > 0:
+        raise ValueError(f'budget_1k_usd must be greater than 0, not {budget_1k_usd}')
+
+    bound = _ScoreBound(route, budget_1k_usd, max_speed_kmh=UNCONSTRAINED_MAX_SPEED_KMH if violate_constraints else MAX_SPEED_KMH)
+    family_sizes = [len(_CATALOGS[family]) for family in _FAMILIES]
+    statistics = {
+        'configurations_total': math.prod(family_sizes),
+        'configurations_evaluated': 0,
+        'fleets_evaluated': 0,
+        'configurations_pruned_by_bound': 0,
+        'configurations_pruned_as_infeasible': 0,
+        'nodes_visited': 0,
+    }
+
+    best_score = -math.inf
+    best = []
+
+    def subtree_size(depth):
+        return math.prod(family_sizes[depth:])
+
+    def evaluate_leaf(assignment):
+        nonlocal best_score, best
+        choices = tuple(_CATALOGS[family].choice(assignment[family]) for family in _EV_ORDER)
+        try:
+            ev = Ev(*choices, violate_constraints=violate_constraints)
+        except ValueError:
+            statistics['configurations_pruned_as_infeasible'] += 1
+            return
+        statistics['configurations_evaluated'] += 1
+
+        fleet_size = _max_affordable_fleet_size(ev.total_vehicle_cost_1k_usd, budget_1k_usd)
+        if fleet_size < 1:
+            return
+        statistics['fleets_evaluated'] += 1
+        score = Fleet(route, ev, fleet_size=fleet_size).score
+        if score > best_score:
+            best_score, best = score, [(ev, fleet_size)]
+        elif score == best_score:
+            best.append((ev, fleet_size))
+
+    def search(depth, assignment):
+        statistics['nodes_visited'] += 1
+        if depth == len(_FAMILIES):
+            evaluate_leaf(assignment)
+            return
+
+        family = _FAMILIES[depth]
+        children = []
+        for index in range(family_sizes[depth]):
+            child = dict(assignment)
+            child[family] = index
+            if not violate_constraints and 'battery_pack' in child and 'chasis' in child and \
+                    BATTERY_PACK_CATALOG['weight_kg'][child['battery_pack']] > CHASIS_CATALOG['weight_kg'][child['chasis']] / 3:
+                statistics['configurations_pruned_as_infeasible'] += subtree_size(depth + 1)
+                continue
+            children.append((bound(child), index, child))
+
+        # most promising first, so that a strong incumbent is found early
+        children.sort(key=lambda c: (-c[0], c[1]))
+        for child_bound, _, child in children:
+            # an unaffordable subtree bounds at -inf, which an empty incumbent would not prune
+            if child_bound == -math.inf or child_bound < best_score:
+                statistics['configurations_pruned_by_bound'] += subtree_size(depth + 1)
+                continue
+            search(depth + 1, child)
+
+    search(0, {})
+
+    configurations = []
+    for ev, fleet_size in best:
+        # cheapest fleet reaching the optimum: the first size at which the non-decreasing score curve reaches it
+        scores = FleetSizeScan(route, ev).curves(np.arange(1, fleet_size + 1))['score']
+        smallest = int(np.argmax(scores >= best_score)) + 1
+        choices = tuple(subsystem.choice for subsystem in (ev.autonomous_system, ev.battery_charger, ev.battery_pack, ev.chasis, ev.motor_and_inverter))
+        configurations.append((choices, smallest, ev.total_vehicle_cost_1k_usd * smallest))
+
+    return BudgetOptimizationResult(best_score if best else None, configurations, statistics)
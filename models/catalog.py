@@ -0,0 +1,103 @@
+from enum import Enum
+from types import MappingProxyType
+
+import numpy as np
+
+
+class ComponentCatalog:
+    """
+    :class:`ComponentCatalog` is the immutable attribute table of one component family (e.g. all :class:`BatteryPack` choices).
+
+    Rows are indexed by the position of the choice in its enum, i.e. ``choice.value - 1``. Every field is available as a
+    read-only NumPy column for vectorized code, and as the original Python scalar through :meth:`value`.
+    """
+
+    __slots__ = ('choice_enum', 'fields', 'columns', '_rows')
+
+    def __init__(self, choice_enum: type, fields: tuple, rows: dict) -> None:
+
+        if set(rows) != set(choice_enum):
+            raise ValueError(f'rows must contain exactly one entry per {choice_enum.__name__}')
+        if any(len(values) != len(fields) for values in rows.values()):
+            raise ValueError(f'every row must contain a value for each of {fields}')
+
+        ordered = tuple(tuple(rows[choice]) for choice in choice_enum)
+
+        columns = {}
+        for i, field in enumerate(fields):
+            values = [row[i] for row in ordered]
+            dtype = np.int64 if all(type(v) is int for v in values) else np.float64
+            column = np.array(values, dtype=dtype)
+            column.setflags(write=False)
+            columns[field] = column
+
+        object.__setattr__(self, 'choice_enum', choice_enum)
+        object.__setattr__(self, 'fields', tuple(fields))
+        object.__setattr__(self, 'columns', MappingProxyType(columns))
+        object.__setattr__(self, '_rows', ordered)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.columns[field]
+
+    @staticmethod
+    def index(choice: Enum) -> int:
+        return choice.value - 1
+
+    def choice(self, index: int) -> Enum:
+        return self.choice_enum(index + 1)
+
+    def value(self, choice: Enum, field: str):
+        return self._rows[choice.value - 1][self.fields.index(field)]
+
+    def row(self, choice: Enum) -> tuple:
+        return self._rows[choice.value - 1]
+
+
+class CatalogComponent:
+    """
+    Base class of the subsystem components. Each choice maps to a single shared, read-only instance whose attributes are
+    read from the component family's :class:`ComponentCatalog`, so constructing a component is a dictionary lookup.
+
+    Subclasses set ``CATALOG`` and ``ARGUMENT_NAME`` and declare the catalog fields as ``__slots__``.
+    """
+
+    __slots__ = ('choice',)
+
+    CATALOG: ComponentCatalog = None
+    ARGUMENT_NAME: str = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._INSTANCES = {}
+        for choice in cls.CATALOG.choice_enum:
+            instance = object.__new__(cls)
+            object.__setattr__(instance, 'choice', choice)
+            for field, value in zip(cls.CATALOG.fields, cls.CATALOG.row(choice)):
+                object.__setattr__(instance, field, value)
+            cls._INSTANCES[choice] = instance
+
+    def __new__(cls, choice):
+        if type(choice) is not cls.CATALOG.choice_enum:
+            raise ValueError(f'{cls.ARGUMENT_NAME} argument must be of type {cls.CATALOG.choice_enum.__name__} rather than supplied {type(choice)}')
+        return cls._INSTANCES[choice]
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} instances are shared and read-only')
+
+    def __reduce__(self):
+        return type(self), (self.choice,)
+
+    def to_dict(self) -> dict:
+        """
+        Catalog attributes of the component, without its choice.
+        """
+        return {field: getattr(self, field) for field in self.CATALOG.fields}
+
+    def __str__(self) -> str:
+        return self.choice.name
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from models.catalog import CatalogComponent, ComponentCatalog
+
 
 class ChasisChoice(Enum):
     """
@@ -36,83 +38,36 @@ class ChasisChoice(Enum):
     C8 = auto()
 
 
-class Chasis:
-    """
-    :class:`Chasis` represents an instance of a chasis. To be used in the construction of :class:`Ev`
-    """
-
-    def __init__(self, chasis_choice: ChasisChoice) -> None:
-
-        if type(chasis_choice) is not ChasisChoice:
-            raise ValueError(f'chasis_choice argument must be of type ChasisChoice rather than supplied {type(chasis_choice)}')
-
-        self._key_passenger_capacity = "passenger_capacity"
-        self._key_weight_kg = "weight_kg"
-        self._key_cost_1k_usd = "cost_1k_usd"
-        self._key_nominal_power_consumption_Wh_per_km = "nominal_power_consumption_Wh_per_km"
+CHASIS_CATALOG = ComponentCatalog(
+    ChasisChoice,
+    fields=('passenger_capacity', 'weight_kg', 'cost_1k_usd', 'nominal_power_consumption_Wh_per_km'),
+    rows={
+        ChasisChoice.C1: (2, 1350, 12, 140),
+        ChasisChoice.C2: (4, 1600, 17, 135),
+        ChasisChoice.C3: (6, 1800, 21, 145),
+        ChasisChoice.C4: (8, 2000, 29, 150),
+        ChasisChoice.C5: (10, 2200, 31, 160),
+        ChasisChoice.C6: (16, 2500, 33, 165),
+        ChasisChoice.C7: (20, 4000, 38, 180),
+        ChasisChoice.C8: (30, 7000, 47, 210)
+    }
+)
 
-        attribute_dict = self._get_attribute_mapping(chasis_choice)
 
-        self.choice: ChasisChoice = chasis_choice
-        self.passenger_capacity: int = attribute_dict.get(self._key_passenger_capacity, -1)
-        self.weight_kg: float = attribute_dict.get(self._key_weight_kg, -1)
-        self.cost_1k_usd: float = attribute_dict.get(self._key_cost_1k_usd, -1)
-        self.nominal_power_consumption_Wh_per_km: float = attribute_dict.get(self._key_nominal_power_consumption_Wh_per_km, -1)
+class Chasis(CatalogComponent):
+    """
+    :class:`Chasis` represents an instance of a chasis. To be used in the construction of :class:`Ev`
 
-    def _get_attribute_mapping(self, chasis_choice: ChasisChoice) -> dict:
+    Instances are shared per choice and read-only; their attributes come from :data:`CHASIS_CATALOG`.
+    """
 
-        attribute_map = {
-            ChasisChoice.C1: {
-                self._key_passenger_capacity: 2,
-                self._key_weight_kg: 1350,
-                self._key_cost_1k_usd: 12,
-                self._key_nominal_power_consumption_Wh_per_km: 140
-            },
-            ChasisChoice.C2: {
-                self._key_passenger_capacity: 4,
-                self._key_weight_kg: 1600,
-                self._key_cost_1k_usd: 17,
-                self._key_nominal_power_consumption_Wh_per_km: 135
-            },
-            ChasisChoice.C3: {
-                self._key_passenger_capacity: 6,
-                self._key_weight_kg: 1800,
-                self._key_cost_1k_usd: 21,
-                self._key_nominal_power_consumption_Wh_per_km: 145
-            },
-            ChasisChoice.C4: {
-                self._key_passenger_capacity: 8,
-                self._key_weight_kg: 2000,
-                self._key_cost_1k_usd: 29,
-                self._key_nominal_power_consumption_Wh_per_km: 150
-            },
-            ChasisChoice.C5: {
-                self._key_passenger_capacity: 10,
-                self._key_weight_kg: 2200,
-                self._key_cost_1k_usd: 31,
-                self._key_nominal_power_consumption_Wh_per_km: 160
-            },
-            ChasisChoice.C6: {
-                self._key_passenger_capacity: 16,
-                self._key_weight_kg: 2500,
-                self._key_cost_1k_usd: 33,
-                self._key_nominal_power_consumption_Wh_per_km: 165
-            },
-            ChasisChoice.C7: {
-                self._key_passenger_capacity: 20,
-                self._key_weight_kg: 4000,
-                self._key_cost_1k_usd: 38,
-                self._key_nominal_power_consumption_Wh_per_km: 180
-            },
-            ChasisChoice.C8: {
-                self._key_passenger_capacity: 30,
-                self._key_weight_kg: 7000,
-                self._key_cost_1k_usd: 47,
-                self._key_nominal_power_consumption_Wh_per_km: 210
-            }
-        }
+    __slots__ = ('passenger_capacity', 'weight_kg', 'cost_1k_usd', 'nominal_power_consumption_Wh_per_km')
 
-        return attribute_map.get(chasis_choice, None)
+    CATALOG = CHASIS_CATALOG
+    ARGUMENT_NAME = 'chasis_choice'
 
-    def __str__(self) -> str:
-        return self.choice.name
+    choice: ChasisChoice
+    passenger_capacity: int
+    weight_kg: float
+    cost_1k_usd: float
+    nominal_power_consumption_Wh_per_km: float
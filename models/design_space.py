@@ -0,0 +1,249 @@
+import numpy as np
+
+from models.ev_batch import CHOICE_ENUMS, SUBSYSTEM_CATALOGS, EvBatch
+from models.feasibility import feasibility_index
+
+
+class ConfigurationSpace:
+    """
+    :class:`ConfigurationSpace` is a lazily generated sequence of :class:`Ev` choice tuples, in ``itertools.product``
+    order over a subset of every choice enum.
+
+    A configuration is never stored: its rank is decoded in mixed radix over the subset sizes, so indexing and
+    :meth:`index` are ``O(1)``. Filtered views (:meth:`filter`, :meth:`feasible`) keep the ranks of the configurations they
+    retain, one integer per configuration, and still index in ``O(1)``.
+    """
+
+    def __init__(self, subsets: dict = None, positions=None) -> None:
+        """
+        :param subsets: ``{subsystem: choices}`` restricting subsystems, keyed like :data:`SUBSYSTEM_CATALOGS`. Subsystems
+            left out take every choice.
+        :param positions: ranks in the unfiltered space of the configurations of this view, in view order
+        """
+        subsets = {} if subsets is None else subsets
+        unknown = set(subsets) - set(SUBSYSTEM_CATALOGS)
+        if unknown:
+            raise ValueError(f'Unknown subsystems {sorted(unknown)}, expected some of {tuple(SUBSYSTEM_CATALOGS)}')
+
+        self.subsets: tuple = tuple(tuple(subsets.get(name, choice_enum)) for name, choice_enum in zip(SUBSYSTEM_CATALOGS, CHOICE_ENUMS))
+        for subset, choice_enum in zip(self.subsets, CHOICE_ENUMS):
+            if not subset or any(type(choice) is not choice_enum for choice in subset):
+                raise ValueError(f'subsets must be non-empty sequences of {choice_enum.__name__}')
+
+        self._radices = tuple(len(subset) for subset in self.subsets)
+        self._strides = tuple(int(np.prod(self._radices[i + 1:], dtype=np.int64)) for i in range(len(self._radices)))
+        self._size = int(np.prod(self._radices, dtype=np.int64))
+        self._subset_positions = tuple({choice: i for i, choice in enumerate(subset)} for subset in self.subsets)
+        self._codes = tuple(np.array([choice.value - 1 for choice in subset], dtype=np.int64) for subset in self.subsets)
+
+        self.positions: np.ndarray = None
+        if positions is not None:
+            self.positions = np.asarray(positions, dtype=np.int64)
+            if self.positions.size and (self.positions.min() < 0 or self.positions.max() >= self._size):
+                raise ValueError(f'positions must be within [0, {self._size})')
+            self.positions.flags.writeable = False
+        self._ranks = None
+
+    @classmethod
+    def from_choices(cls, choices) -> 'ConfigurationSpace':
+        """
+        View over the whole design space holding exactly ``choices``, in the given order.
+        """
+        space = cls()
+        return cls(positions=[space._position(tuple(combination)) for combination in choices])
+
+    def __len__(self) -> int:
+        return self._size if self.positions is None else len(self.positions)
+
+    def _position(self, choices: tuple) -> int:
+        if len(choices) != len(CHOICE_ENUMS):
+            raise ValueError(f'Expected one choice per subsystem {tuple(SUBSYSTEM_CATALOGS)}, not {choices}')
+        try:
+            return sum(stride * subset_positions[choice] for stride, subset_positions, choice in zip(self._strides, self._subset_positions, choices))
+        except KeyError as e:
+            raise ValueError(f'{e} is not part of this configuration space') from None
+
+    def _decode(self, position: int) -> tuple:
+        return tuple(subset[(position // stride) % radix] for subset, stride, radix in zip(self.subsets, self._strides, self._radices))
+
+    def __getitem__(self, rank: int) -> tuple:
+        size = len(self)
+        if not -size <= rank < size:
+            raise IndexError(f'configuration {rank} out of range for {size} configurations')
+        rank %= size
+        return self._decode(rank if self.positions is None else int(self.positions[rank]))
+
+    def __iter__(self):
+        for rank in range(len(self)):
+            yield self[rank]
+
+    def index(self, choices) -> int:
+        """
+        Rank of the choice tuple ``choices`` in this space.
+
+        :raises ValueError: if ``choices`` is not part of the space
+        """
+        position = self._position(tuple(choices))
+        if self.positions is None:
+            return position
+        if self._ranks is None:
+            self._ranks = {}
+            for rank, p in enumerate(self.positions.tolist()):
+                self._ranks.setdefault(p, rank)
+        if position not in self._ranks:
+            raise ValueError(f'{choices} is not part of this configuration space')
+        return self._ranks[position]
+
+    def __contains__(self, choices) -> bool:
+        try:
+            self.index(choices)
+        except ValueError:
+            return False
+        return True
+
+    def codes(self, ranks=None) -> np.ndarray:
+        """
+        ``(n, 5)`` array of the 0-based choice indices (as used by :class:`EvBatch`) of the configurations at ``ranks``, all
+        of them by default.
+        """
+        ranks = np.arange(len(self)) if ranks is None else np.asarray(ranks, dtype=np.int64)
+        positions = ranks if self.positions is None else self.positions[ranks]
+        return np.stack([codes[(positions // stride) % radix] for codes, stride, radix in zip(self._codes, self._strides, self._radices)], axis=-1)
+
+    def batch(self, violate_constraints=False, ranks=None) -> EvBatch:
+        """
+        :class:`EvBatch` of the configurations at ``ranks``, all of them by default, in order.
+        """
+        return EvBatch(*self.codes(ranks).T, violate_constraints=violate_constraints)
+
+    def _view(self, positions) -> 'ConfigurationSpace':
+        return ConfigurationSpace(dict(zip(SUBSYSTEM_CATALOGS, self.subsets)), positions)
+
+    def filter(self, predicate, violate_constraints=False, chunk_size: int = 65_536) -> 'ConfigurationSpace':
+        """
+        View of the configurations for which ``predicate``, called with the :meth:`batch` of ``chunk_size``
+        configurations at a time, returns ``True``, e.g. ``space.filter(lambda evs: evs.range_km >= 100)``.
+        """
+        if chunk_size < 1:
+            raise ValueError(f'chunk_size must be at least 1, not {chunk_size}')
+        kept = []
+        for start in range(0, len(self), chunk_size):
+            ranks = np.arange(start, min(start + chunk_size, len(self)))
+            kept.append(ranks[np.asarray(predicate(self.batch(violate_constraints, ranks)), dtype=bool)])
+        ranks = np.concatenate(kept) if kept else np.zeros(0, dtype=np.int64)
+        return self._view(ranks if self.positions is None else self.positions[ranks])
+
+    def feasible(self, violate_constraints=False) -> 'ConfigurationSpace':
+        """
+        View of the configurations that build an :class:`Ev` without raising, taken from the shared
+        :class:`FeasibilityIndex` rather than evaluated.
+        """
+        codes = feasibility_index(violate_constraints).codes
+
+        # position in this space's subsets of every code, -1 for the codes outside of them
+        subset_positions = []
+        for subset, choice_enum in zip(self.subsets, CHOICE_ENUMS):
+            lookup = np.full(len(choice_enum), -1, dtype=np.int64)
+            lookup[[choice.value - 1 for choice in subset]] = np.arange(len(subset))
+            subset_positions.append(lookup)
+        in_subsets = np.stack([lookup[codes[:, axis]] for axis, lookup in enumerate(subset_positions)], axis=-1)
+        in_subsets = in_subsets[(in_subsets >= 0).all(axis=1)]
+        positions = np.sort(in_subsets @ np.array(self._strides, dtype=np.int64))
+
+        if self.positions is not None:
+            positions = self.positions[np.isin(self.positions, positions)]
+        return self._view(positions)
+
+
+class DesignSpace:
+    """
+    :class:`DesignSpace` is the ``configuration x route x value`` product of a sweep, with ``O(1)`` conversion between a
+    flat index and its ``(autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter, route, value)``
+    point, where the value is a fleet size or a peak throughput target.
+
+    Points are numbered like ``itertools.product(configurations, routes, values)``, but nothing is materialized: a worker
+    handed an index range, a contiguous :meth:`shard` or a :meth:`strided_shard` generates its own points.
+    """
+
+    def __init__(self, configurations: ConfigurationSpace = None, routes=(None,), values=(None,)) -> None:
+        self.configurations: ConfigurationSpace = ConfigurationSpace() if configurations is None else configurations
+        self.routes: tuple = tuple(routes)
+        self.values: tuple = tuple(values)
+        if not self.routes or not self.values:
+            raise ValueError("routes and values must not be empty")
+
+    def __len__(self) -> int:
+        return len(self.configurations) * len(self.routes) * len(self.values)
+
+    def unrank(self, index: int) -> tuple:
+        """
+        Point at flat ``index``.
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f'point {index} out of range for {len(self)} points')
+        index, value_index = divmod(index, len(self.values))
+        configuration_index, route_index = divmod(index, len(self.routes))
+        return self.configurations[configuration_index] + (self.routes[route_index], self.values[value_index])
+
+    def rank(self, point: tuple) -> int:
+        """
+        Flat index of ``point``, the inverse of :meth:`unrank`.
+
+        :raises ValueError: if the point is not part of the space
+        """
+        *choices, route, value = point
+        try:
+            route_index, value_index = self.routes.index(route), self.values.index(value)
+        except ValueError:
+            raise ValueError(f'{point} is not part of this design space') from None
+        return (self.configurations.index(choices) * len(self.routes) + route_index) * len(self.values) + value_index
+
+    def __getitem__(self, index: int) -> tuple:
+        return self.unrank(index)
+
+    def __iter__(self):
+        return self.points(range(len(self)))
+
+    def points(self, indices):
+        """
+        Generates the points at ``indices``, any iterable of flat indices such as a ``range``.
+        """
+        for index in indices:
+            yield self.unrank(index)
+
+    def iter_range(self, start: int, stop: int, step: int = 1):
+        """
+        Generates the points of ``range(start, stop, step)``, clipped to the space.
+        """
+        return self.points(range(max(start, 0), min(stop, len(self)), step))
+
+    def shard(self, shard_index: int, shard_count: int) -> range:
+        """
+        Contiguous ``[start, stop)`` indices of shard ``shard_index`` of ``shard_count`` near equal shards.
+        """
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f'shard_index must be within [0, {shard_count}), not {shard_index}')
+        size = len(self)
+        return range(shard_index * size // shard_count, (shard_index + 1) * size // shard_count)
+
+    def strided_shard(self, shard_index: int, shard_count: int) -> range:
+        """
+        Indices ``shard_index, shard_index + shard_count, ...``: every shard gets a similar mix of configurations.
+        """
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f'shard_index must be within [0, {shard_count}), not {shard_index}')
+        return range(shard_index, len(self), shard_count)
+
+    def unrank_codes(self, indices) -> tuple:
+        """
+        Vectorized :meth:`unrank` of an index array.
+
+        :return: ``(codes, route_index, value_index)``, with ``codes`` the ``(n, 5)`` choice indices of
+            :meth:`ConfigurationSpace.codes`
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f'point indices must be within [0, {len(self)})')
+        rest, value_index = np.divmod(indices, len(self.values))
+        configuration_index, route_index = np.divmod(rest, len(self.routes))
+        return self.configurations.codes(configuration_index), route_index, value_index
@@ -1,3 +1,6 @@
+from operator import methodcaller
+
+from models._lazy import derived, ordered_state
 from models.autonomous_system import AutonomousSystem, AutonomousSystemChoice
 from models.battery_charger import BatteryCharger, BatteryChargerChoice
 from models.battery_pack import BatteryPack, BatteryPackChoice
@@ -5,12 +8,49 @@ from models.chasis import Chasis, ChasisChoice
 from models.motor_and_inverter import MotorAndInverter, MotorAndInverterChoice
 
 
+# Maximum operated speed [km/h] = 32
+MAX_SPEED_KMH = 32
+
+# Maximum operated speed [km/h] when violating constraints = 999 (no practical limit)
+UNCONSTRAINED_MAX_SPEED_KMH = 999
+
+
 class Ev():
     """
     :class:`Ev` represents a single configuration of an EV to be used with :class:`Fleet`
+
+    With ``lazy=True`` the derived attributes are computed on first access instead of in ``__init__``, so that e.g. a
+    filter on cost never pays for range or availability. Names and values are the same in both modes.
     """
 
-    def __init__(self, autonomous_system_choice: AutonomousSystemChoice = None, battery_charger_choice: BatteryChargerChoice = None, battery_pack_choice: BatteryPackChoice = None,  chasis_choice: ChasisChoice = None, motor_and_inverter_choice: MotorAndInverterChoice = None, violate_constraints=False) -> None:
+    # Derived attributes, in the order they depend on each other
+    DERIVED_ATTRIBUTES = (
+        'total_vehicle_cost_1k_usd',
+        'total_vehicle_weight_kg',
+        'battery_charge_time_hours',
+        'power_consumption_Wh_per_km',
+        'range_km',
+        'maximum_sustained_speed_km_per_hour',
+        'operated_speed_km_hour',
+        'uptime_hours',
+        'downtime_hours',
+        'availability',
+        'passenger_capacity_to_cost_ratio',
+    )
+
+    total_vehicle_cost_1k_usd = derived(methodcaller('_calculate_total_vehicle_cost_1k_usd'))
+    total_vehicle_weight_kg = derived(methodcaller('_calculate_total_vehicle_weight_kg'))
+    battery_charge_time_hours = derived(methodcaller('_calculate_battery_charge_time_hours'))
+    power_consumption_Wh_per_km = derived(methodcaller('_calculate_power_consumption_Wh_per_km'))
+    range_km = derived(methodcaller('_calculate_range_km'))
+    maximum_sustained_speed_km_per_hour = derived(methodcaller('_calculate_average_speed_km_per_hour'))
+    operated_speed_km_hour = derived(methodcaller('_calculate_operated_speed_km_hour'))
+    uptime_hours = derived(methodcaller('_calculate_uptime_hours'))
+    downtime_hours = derived(methodcaller('_calculate_downtime_hours'))
+    availability = derived(methodcaller('_calculate_availability'))
+    passenger_capacity_to_cost_ratio = derived(methodcaller('_calculate_passenger_capacity_to_cost_ratio'))
+
+    def __init__(self, autonomous_system_choice: AutonomousSystemChoice = None, battery_charger_choice: BatteryChargerChoice = None, battery_pack_choice: BatteryPackChoice = None,  chasis_choice: ChasisChoice = None, motor_and_inverter_choice: MotorAndInverterChoice = None, violate_constraints=False, lazy=False) -> None:
 
         choices = (autonomous_system_choice, battery_pack_choice, battery_charger_choice, chasis_choice, motor_and_inverter_choice)
         if any(choices) is None:
@@ -31,7 +71,8 @@ class Ev():
         }
 
         # CONSTANTS
-        self.MAX_SPEED_KMH = 32
+        self.violate_constraints: bool = bool(violate_constraints)
+        self.MAX_SPEED_KMH = MAX_SPEED_KMH
 
         # CONSTRAINTS
         if not violate_constraints:
@@ -40,21 +81,44 @@ class Ev():
                 raise ValueError("The battery pack weight shall be no greater than ⅓ of the chassis weight (this is a proxy for limited space availability).")
         else:
             # rules to set if we're violating constraints
-            self.MAX_SPEED_KMH = 999
+            self.MAX_SPEED_KMH = UNCONSTRAINED_MAX_SPEED_KMH
 
         # DERIVED ATTRIBUTES
+        if lazy:
+            return
         self.total_vehicle_cost_1k_usd: float = self._calculate_total_vehicle_cost_1k_usd()
         self.total_vehicle_weight_kg: float = self._calculate_total_vehicle_weight_kg()
         self.battery_charge_time_hours: float = self._calculate_battery_charge_time_hours()
         self.power_consumption_Wh_per_km: float = self._calculate_power_consumption_Wh_per_km()
         self.range_km: float = self._calculate_range_km()
         self.maximum_sustained_speed_km_per_hour: float = self._calculate_average_speed_km_per_hour()
-        self.operated_speed_km_hour: float = min(self.MAX_SPEED_KMH, self.maximum_sustained_speed_km_per_hour)
+        self.operated_speed_km_hour: float = self._calculate_operated_speed_km_hour()
         self.uptime_hours: float = self._calculate_uptime_hours()
         self.downtime_hours: float = self._calculate_downtime_hours()
         self.availability: float = self._calculate_availability()
         self.passenger_capacity_to_cost_ratio: float = self._calculate_passenger_capacity_to_cost_ratio()
 
+    def freeze(self) -> 'Ev':
+        """
+        Makes the :class:`Ev` read-only so that it can be shared, e.g. by :class:`EvRegistry`.
+        """
+        self.__class__ = FrozenEv
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Flat ``dict`` of the :class:`Ev` and its subsystems, as in :meth:`Fleet.to_dict`: subsystem choice names and
+        ``{subsystem}_{field}`` catalog attributes.
+        """
+        d = {k: v for k, v in ordered_state(self, self.DERIVED_ATTRIBUTES).items() if k[0] != '_'}
+        for subsystem_str, subsystem in self.subsystems.items():
+            elements = {f'{subsystem_str}_{k}': v for k, v in subsystem.to_dict().items()}
+            elements[subsystem_str] = subsystem.choice.name
+            d.update(elements)
+
+        d.pop("subsystems")
+        return d
+
     def _calculate_total_vehicle_cost_1k_usd(self):
         total_cost = 0.0
         total_cost += self.autonomous_system.cost_1k_usd
@@ -106,6 +170,9 @@ class Ev():
         avg_speed = 700 * self.motor_and_inverter.power_kW / self.total_vehicle_weight_kg
         return round(avg_speed, 4)
 
+    def _calculate_operated_speed_km_hour(self) -> float:
+        return min(self.MAX_SPEED_KMH, self.maximum_sustained_speed_km_per_hour)
+
     def _calculate_uptime_hours(self) -> float:
         """
         #Up-time [h] = Range [km] / Average Speed [km/h]
@@ -192,3 +259,18 @@ class Ev():
         s += f'\t{"Passengers to Cost Ratio:":<28}{self.passenger_capacity_to_cost_ratio}\n'
 
         return s
+
+
+class FrozenEv(Ev):
+    """
+    :class:`FrozenEv` is a read-only :class:`Ev`, as returned by :meth:`Ev.freeze`.
+    """
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError(f'{type(self).__name__} is read-only, build a new Ev instead')
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError(f'{type(self).__name__} is read-only, build a new Ev instead')
+
+    def freeze(self) -> 'Ev':
+        return self
@@ -0,0 +1,198 @@
+import itertools
+
+import numpy as np
+
+from models._vectorized import round_like_python
+from models.autonomous_system import AUTONOMOUS_SYSTEM_CATALOG, AutonomousSystemChoice
+from models.battery_charger import BATTERY_CHARGER_CATALOG, BatteryChargerChoice
+from models.battery_pack import BATTERY_PACK_CATALOG, BatteryPackChoice
+from models.chasis import CHASIS_CATALOG, ChasisChoice
+from models.ev import MAX_SPEED_KMH, UNCONSTRAINED_MAX_SPEED_KMH, Ev
+from models.motor_and_inverter import MOTOR_AND_INVERTER_CATALOG, MotorAndInverterChoice
+
+
+# Subsystem catalogs in Ev argument order
+SUBSYSTEM_CATALOGS = {
+    'autonomous_system': AUTONOMOUS_SYSTEM_CATALOG,
+    'battery_charger': BATTERY_CHARGER_CATALOG,
+    'battery_pack': BATTERY_PACK_CATALOG,
+    'chasis': CHASIS_CATALOG,
+    'motor_and_inverter': MOTOR_AND_INVERTER_CATALOG,
+}
+
+CHOICE_ENUMS = (AutonomousSystemChoice, BatteryChargerChoice, BatteryPackChoice, ChasisChoice, MotorAndInverterChoice)
+
+# Names of the subsystem attributes, as the ``{subsystem}_{field}`` columns of :meth:`Fleet.to_dict`
+ATTRIBUTE_NAMES = tuple(f'{subsystem_str}_{field}' for subsystem_str, catalog in SUBSYSTEM_CATALOGS.items() for field in catalog.fields)
+
+
+class EvBatch:
+    """
+    :class:`EvBatch` evaluates many :class:`Ev` configurations at once using NumPy arrays.
+
+    Configurations are given as arrays of choice indices (``choice.value - 1``) in the same argument order as
+    :class:`Ev`. Every derived attribute of :class:`Ev` is available under the same name as a column array, rounded
+    exactly as :class:`Ev` rounds it. Constraints do not raise, they are reported as boolean masks instead:
+
+    * ``battery_weight_ok``: the battery pack weighs no more than ⅓ of the chassis
+    * ``speed_capped``: the maximum sustained speed is above ``MAX_SPEED_KMH`` so the operated speed is capped
+    * ``valid``: the configuration could be constructed as an :class:`Ev` with the given ``violate_constraints``
+
+    ``attributes`` optionally overrides subsystem catalog values with arrays broadcast against the indices, keyed by
+    :data:`ATTRIBUTE_NAMES` (e.g. ``battery_pack_capacity_kWh``), to evaluate perturbed components.
+
+    With ``broadcast=False`` the subsystem attributes keep the shape of their own indices or overrides, and every column
+    only the axes of what it depends on: open-grid indices (e.g. from ``np.ix_``) then give partial arrays that broadcast to
+    the whole grid, each value computed once per combination of the subsystems it depends on.
+    """
+
+    def __init__(self, autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter, violate_constraints=False, attributes: dict = None,
+                 broadcast=True) -> None:
+
+        attributes = {} if attributes is None else attributes
+        unknown = set(attributes) - set(ATTRIBUTE_NAMES)
+        if unknown:
+            raise ValueError(f'Unknown subsystem attributes {sorted(unknown)}, expected some of {ATTRIBUTE_NAMES}')
+
+        own_indices = [np.asarray(i, dtype=np.int64) for i in (autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter)]
+        shape = np.broadcast_shapes(*(np.shape(i) for i in own_indices), *(np.shape(v) for v in attributes.values()))
+        indices = [np.broadcast_to(i, shape) for i in own_indices]
+        for index, choice_enum in zip(indices, CHOICE_ENUMS):
+            if index.size and (index.min() < 0 or index.max() >= len(choice_enum)):
+                raise ValueError(f'{choice_enum.__name__} indices must be within [0, {len(choice_enum)})')
+
+        # CHOICES
+        self.autonomous_system_index: np.ndarray = indices[0]
+        self.battery_charger_index: np.ndarray = indices[1]
+        self.battery_pack_index: np.ndarray = indices[2]
+        self.chasis_index: np.ndarray = indices[3]
+        self.motor_and_inverter_index: np.ndarray = indices[4]
+        self.violate_constraints: bool = violate_constraints
+
+        # CONSTANTS
+        self.MAX_SPEED_KMH = UNCONSTRAINED_MAX_SPEED_KMH if violate_constraints else MAX_SPEED_KMH
+
+        # SUBSYSTEM ATTRIBUTES, catalog values unless overridden
+        self.attributes: dict = {}
+        for (subsystem_str, catalog), index in zip(SUBSYSTEM_CATALOGS.items(), indices if broadcast else own_indices):
+            for field in catalog.fields:
+                name = f'{subsystem_str}_{field}'
+                if name in attributes:
+                    values = np.asarray(attributes[name], dtype=np.float64)
+                    self.attributes[name] = np.broadcast_to(values, shape) if broadcast else values
+                else:
+                    self.attributes[name] = catalog[field][index]
+        self.passenger_capacity: np.ndarray = self.attributes['chasis_passenger_capacity']
+
+        # CONSTRAINTS
+        self.battery_weight_ok: np.ndarray = self.attributes['battery_pack_weight_kg'] <= self.attributes['chasis_weight_kg'] / 3
+        self.valid: np.ndarray = self.battery_weight_ok | violate_constraints
+
+        # DERIVED ATTRIBUTES
+        self.total_vehicle_cost_1k_usd: np.ndarray = self._calculate_total_vehicle_cost_1k_usd()
+        self.total_vehicle_weight_kg: np.ndarray = self._calculate_total_vehicle_weight_kg()
+        self.battery_charge_time_hours: np.ndarray = self._calculate_battery_charge_time_hours()
+        self.power_consumption_Wh_per_km: np.ndarray = self._calculate_power_consumption_Wh_per_km()
+        self.range_km: np.ndarray = self._calculate_range_km()
+        self.maximum_sustained_speed_km_per_hour: np.ndarray = self._calculate_average_speed_km_per_hour()
+        self.operated_speed_km_hour: np.ndarray = np.minimum(self.MAX_SPEED_KMH, self.maximum_sustained_speed_km_per_hour)
+        self.speed_capped: np.ndarray = self.maximum_sustained_speed_km_per_hour > self.MAX_SPEED_KMH
+        self.uptime_hours: np.ndarray = self._calculate_uptime_hours()
+        self.downtime_hours: np.ndarray = self._calculate_downtime_hours()
+        self.availability: np.ndarray = self._calculate_availability()
+        self.passenger_capacity_to_cost_ratio: np.ndarray = self._calculate_passenger_capacity_to_cost_ratio()
+
+    @classmethod
+    def design_space(cls, violate_constraints=False) -> 'EvBatch':
+        """
+        Evaluates every subsystem combination, ordered like ``itertools.product`` over the choice enums.
+        """
+        grids = np.indices(tuple(len(choice_enum) for choice_enum in CHOICE_ENUMS)).reshape(len(CHOICE_ENUMS), -1)
+        return cls(*grids, violate_constraints=violate_constraints)
+
+    @classmethod
+    def from_choices(cls, choices, violate_constraints=False) -> 'EvBatch':
+        """
+        Builds a batch from an iterable of ``(autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter)`` choice tuples.
+        """
+        indices = np.array([[choice.value - 1 for choice in combination] for combination in choices], dtype=np.int64).reshape(-1, len(CHOICE_ENUMS))
+        return cls(*indices.T, violate_constraints=violate_constraints)
+
+    def __len__(self) -> int:
+        return self.autonomous_system_index.size
+
+    def choices(self, i: int) -> tuple:
+        """
+        Returns the choice enums of configuration ``i`` in :class:`Ev` argument order.
+        """
+        indices = (self.autonomous_system_index, self.battery_charger_index, self.battery_pack_index, self.chasis_index, self.motor_and_inverter_index)
+        return tuple(list(choice_enum)[index.flat[i]] for index, choice_enum in zip(indices, CHOICE_ENUMS))
+
+    def to_ev(self, i: int) -> Ev:
+        """
+        Builds the scalar :class:`Ev` for configuration ``i``.
+        """
+        return Ev(*self.choices(i), violate_constraints=self.violate_constraints)
+
+    def _calculate_total_vehicle_cost_1k_usd(self) -> np.ndarray:
+        a = self.attributes
+        # summed in Ev order, gaining the axes of each term
+        total_cost = 0.0
+        total_cost = total_cost + a['autonomous_system_cost_1k_usd']
+        total_cost = total_cost + a['battery_pack_cost_1k_usd']
+        total_cost = total_cost + a['battery_charger_cost_1k_usd']
+        total_cost = total_cost + a['chasis_cost_1k_usd']
+        total_cost = total_cost + a['motor_and_inverter_cost_1k_usd']
+        return round_like_python(total_cost, 2)
+
+    def _calculate_total_vehicle_weight_kg(self) -> np.ndarray:
+        a = self.attributes
+        total_weight_kg = 0.0
+        total_weight_kg = total_weight_kg + a['autonomous_system_weight_kg']
+        total_weight_kg = total_weight_kg + a['battery_pack_weight_kg']
+        total_weight_kg = total_weight_kg + a['battery_charger_weight_kg']
+        total_weight_kg = total_weight_kg + a['chasis_weight_kg']
+        total_weight_kg = total_weight_kg + a['motor_and_inverter_weight_kg']
+        return round_like_python(total_weight_kg, 4)
+
+    def _calculate_battery_charge_time_hours(self) -> np.ndarray:
+        charge_time_hours = self.attributes['battery_pack_capacity_kWh'] / self.attributes['battery_charger_power_kW']
+        return round_like_python(charge_time_hours, 4)
+
+    def _calculate_power_consumption_Wh_per_km(self) -> np.ndarray:
+        a = self.attributes
+        power_consumption_Wh_per_kM = a['chasis_nominal_power_consumption_Wh_per_km'] + \
+            (0.1 * (self.total_vehicle_weight_kg - a['chasis_weight_kg'])) + a['autonomous_system_added_power_consumption_Wh_per_kW']
+        return round_like_python(power_consumption_Wh_per_kM, 4)
+
+    def _calculate_range_km(self) -> np.ndarray:
+        wH_to_kWH = 1000
+        range_km = wH_to_kWH * self.attributes['battery_pack_capacity_kWh'] / self.power_consumption_Wh_per_km
+        return round_like_python(range_km, 4)
+
+    def _calculate_average_speed_km_per_hour(self) -> np.ndarray:
+        avg_speed = 700 * self.attributes['motor_and_inverter_power_kW'] / self.total_vehicle_weight_kg
+        return round_like_python(avg_speed, 4)
+
+    def _calculate_uptime_hours(self) -> np.ndarray:
+        uptime_hours = self.range_km / self.operated_speed_km_hour
+        return round_like_python(uptime_hours, 4)
+
+    def _calculate_downtime_hours(self) -> np.ndarray:
+        downtime_hours = self.battery_charge_time_hours + 0.25
+        return round_like_python(downtime_hours, 4)
+
+    def _calculate_availability(self) -> np.ndarray:
+        availability = self.uptime_hours / (self.uptime_hours + self.downtime_hours)
+        return round_like_python(availability, 4)
+
+    def _calculate_passenger_capacity_to_cost_ratio(self) -> np.ndarray:
+        ratio = self.passenger_capacity / self.total_vehicle_cost_1k_usd
+        return round_like_python(ratio, 4)
+
+
+def iter_design_space():
+    """
+    Yields every subsystem choice combination in :class:`Ev` argument order.
+    """
+    return itertools.product(*CHOICE_ENUMS)
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+from models.autonomous_system import AutonomousSystemChoice
+from models.battery_charger import BatteryChargerChoice
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+from models.ev import Ev
+from models.motor_and_inverter import MotorAndInverterChoice
+
+
+class CacheInfo:
+    """
+    :class:`CacheInfo` is a snapshot of the counters of an :class:`EvRegistry`.
+    """
+
+    __slots__ = ('hits', 'misses', 'maxsize', 'currsize')
+
+    def __init__(self, hits: int, misses: int, maxsize: int, currsize: int) -> None:
+        self.hits = hits
+        self.misses = misses
+        self.maxsize = maxsize
+        self.currsize = currsize
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return f'hits={self.hits} misses={self.misses} maxsize={self.maxsize} currsize={self.currsize} hit_rate={self.hit_rate:.3f}'
+
+
+class EvRegistry:
+    """
+    :class:`EvRegistry` builds :class:`Ev` s through a bounded LRU cache keyed by ``(choices, violate_constraints)``.
+
+    Every :class:`Ev` is a deterministic function of its choices, so identical configurations share one frozen instance
+    (see :meth:`Ev.freeze`). Configurations that violate a constraint are cached too and raise the same ``ValueError`` on
+    every lookup.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be at least 1, not {maxsize}')
+
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._cache = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, autonomous_system_choice: AutonomousSystemChoice, battery_charger_choice: BatteryChargerChoice, battery_pack_choice: BatteryPackChoice, chasis_choice: ChasisChoice, motor_and_inverter_choice: MotorAndInverterChoice, violate_constraints=False) -> Ev:
+        """
+        Returns the shared :class:`Ev` for the given choices, building it on a miss. Takes the same arguments as :class:`Ev`.
+
+        :raises ValueError: if the configuration violates a constraint, as :class:`Ev` does
+        """
+        key = (autonomous_system_choice, battery_charger_choice, battery_pack_choice, chasis_choice, motor_and_inverter_choice, bool(violate_constraints))
+
+        try:
+            ev = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            try:
+                ev = Ev(*key[:5], violate_constraints=violate_constraints).freeze()
+            except ValueError as e:
+                ev = e
+            self._cache[key] = ev
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        if isinstance(ev, ValueError):
+            raise ValueError(*ev.args)
+        return ev
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def clear(self) -> None:
+        """
+        Drops every cached :class:`Ev` and resets the hit/miss counters.
+        """
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Process-wide registry, used by the sweep runner
+DEFAULT_REGISTRY = EvRegistry()
+
+
+def get_ev(*choices, violate_constraints=False) -> Ev:
+    """
+    :meth:`EvRegistry.get` on :data:`DEFAULT_REGISTRY`.
+    """
+    return DEFAULT_REGISTRY.get(*choices, violate_constraints=violate_constraints)
@@ -0,0 +1,139 @@
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import ATTRIBUTE_NAMES, CHOICE_ENUMS, SUBSYSTEM_CATALOGS
+from models.feasibility import feasibility_index
+
+
+class EvTable:
+    """
+    :class:`EvTable` is a read-only table of the derived and subsystem attributes of every buildable :class:`Ev`
+    configuration, answering range queries without building any :class:`Ev`.
+
+    Rows are those of :class:`FeasibilityIndex`, in ``itertools.product`` order. Every column gets a sorted index on
+    first use, so the rows within a range are a binary search away. A conjunction of ranges starts from its most selective
+    one and checks the others on those rows only::
+
+        table = ev_table()
+        rows = table.where(range_km=(250, None), availability=(0.8, None), passenger_capacity=(10, None), total_vehicle_cost_1k_usd=(None, 60))
+        table.project(table.top(5, 'availability', rows), columns=('availability', 'total_vehicle_cost_1k_usd'))
+    """
+
+    # Queryable columns: the Ev derived attributes, the passenger capacity and the subsystem catalog attributes
+    COLUMNS = Ev.DERIVED_ATTRIBUTES + ('passenger_capacity',) + ATTRIBUTE_NAMES
+
+    def __init__(self, violate_constraints=False) -> None:
+        index = feasibility_index(violate_constraints)
+        self.violate_constraints: bool = violate_constraints
+        self.codes: np.ndarray = index.codes
+
+        self.columns: dict = {}
+        for name in self.COLUMNS:
+            values = np.array(index.batch.attributes[name] if name in ATTRIBUTE_NAMES else getattr(index.batch, name))
+            values.flags.writeable = False
+            self.columns[name] = values
+
+        self._indexes = {}
+        self._descending = {}
+        self._members = tuple(tuple(choice_enum) for choice_enum in CHOICE_ENUMS)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _column(self, name: str) -> np.ndarray:
+        if name not in self.columns:
+            raise ValueError(f'Unknown column {name}, expected one of {self.COLUMNS}')
+        return self.columns[name]
+
+    def index(self, name: str) -> tuple:
+        """
+        ``(order, sorted_values)`` of column ``name``: the rows by increasing value, ties in row order, and their values.
+        """
+        if name not in self._indexes:
+            values = self._column(name)
+            order = np.argsort(values, kind='stable')
+            self._indexes[name] = (order, values[order])
+        return self._indexes[name]
+
+    def where(self, **bounds) -> np.ndarray:
+        """
+        Rows, in row order, whose every column named in ``bounds`` is within its inclusive ``(low, high)`` bounds, ``None``
+        leaving a side open, e.g. ``table.where(range_km=(250, None), total_vehicle_cost_1k_usd=(None, 60))``. A single
+        value instead of a pair matches that value only. Any length-2 sequence, e.g. a list, is a pair.
+        """
+        if not bounds:
+            return np.arange(len(self))
+
+        ranges = []
+        for name, bound in bounds.items():
+            if np.ndim(bound) == 0:
+                low, high = bound, bound
+            elif len(bound) == 2:
+                low, high = bound
+            else:
+                raise ValueError(f'bounds of {name} must be a single value or a (low, high) pair, not {bound!r}')
+            order, values = self.index(name)
+            start = 0 if low is None else int(np.searchsorted(values, low, side='left'))
+            stop = len(values) if high is None else int(np.searchsorted(values, high, side='right'))
+            ranges.append((max(stop - start, 0), name, low, high, order[start:stop]))
+
+        ranges.sort(key=lambda r: r[0])
+        rows = np.sort(ranges[0][-1])
+        for _, name, low, high, _ in ranges[1:]:
+            values = self.columns[name][rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            rows = rows[keep]
+        return rows
+
+    def top(self, k: int, by: str, rows=None, ascending=False) -> np.ndarray:
+        """
+        The ``k`` rows (among ``rows``, all by default) with the highest ``by`` values, or the lowest with ``ascending``,
+        best first. Ties are kept in row order.
+        """
+        if k < 0:
+            raise ValueError(f'k must not be negative, not {k}')
+        if ascending:
+            order, _ = self.index(by)
+        else:
+            if by not in self._descending:
+                self._descending[by] = np.lexsort((np.arange(len(self)), -self._column(by)))
+            order = self._descending[by]
+        if rows is None:
+            return order[:k]
+        selected = np.zeros(len(self), dtype=bool)
+        selected[np.asarray(rows, dtype=np.int64)] = True
+        return order[selected[order]][:k]
+
+    def choices(self, rows) -> list:
+        """
+        Choice tuples, in :class:`Ev` argument order, of ``rows``.
+        """
+        return [tuple(member[code] for member, code in zip(self._members, codes)) for codes in self.codes[np.asarray(rows, dtype=np.int64)].tolist()]
+
+    def project(self, rows, columns=()) -> list:
+        """
+        One dict per row of ``rows``: the choice name of every subsystem, keyed like :meth:`Ev.to_dict`, then ``columns``.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        for name in columns:
+            self._column(name)
+        names = [[member[code].name for member, code in zip(self._members, codes)] for codes in self.codes[rows].tolist()]
+        values = [self.columns[name][rows].tolist() for name in columns]
+        return [dict(zip(SUBSYSTEM_CATALOGS, row_names), **{name: column[i] for name, column in zip(columns, values)}) for i, row_names in enumerate(names)]
+
+
+_TABLES = {}
+
+
+def ev_table(violate_constraints=False) -> EvTable:
+    """
+    Shared :class:`EvTable`, built on first use.
+    """
+    key = bool(violate_constraints)
+    if key not in _TABLES:
+        _TABLES[key] = EvTable(violate_constraints=key)
+    return _TABLES[key]
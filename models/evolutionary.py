@@ -0,0 +1,230 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.ev_batch import CHOICE_ENUMS, EvBatch
+from models.fleet import DWELL_TIME_SECONDS, LOAD_FACTOR_EXPECTED_AVG
+from models.fleet_sizing import fleet_metrics, route_roundtrip_minutes
+from models.multi_attribute_utility import score_batch
+from models.pareto import OBJECTIVE_SENSES, ParetoArchive, ParetoPoint, nondominated_mask
+from models.route import Route
+
+
+# Objectives of the search, with their sense in :data:`OBJECTIVE_SENSES`
+OBJECTIVES = ('score', 'fleet_cost_1k_usd', 'average_wait_time_minutes')
+
+# Genes of a genome: the 0-based choice index of every subsystem, in :class:`Ev` argument order, then the fleet size
+GENES = tuple(choice_enum.__name__ for choice_enum in CHOICE_ENUMS) + ('fleet_size',)
+
+
+def evaluate_genomes(route: Route, genomes, violate_constraints=False) -> dict:
+    """
+    Evaluates ``(n, 6)`` genomes (see :data:`GENES`) on ``route`` as one batch, exactly as
+    ``Fleet(route, Ev(*choices), fleet_size=fleet_size)`` would.
+
+    :return: arrays of the :data:`OBJECTIVES`, ``valid`` (the :class:`Ev` can be built) and ``violation`` (by how many kg the
+        battery pack exceeds ⅓ of the chassis weight, 0 for valid genomes)
+    """
+    genomes = np.asarray(genomes, dtype=np.int64).reshape(-1, len(GENES))
+    evs = EvBatch(*genomes[:, :-1].T, violate_constraints=violate_constraints)
+    n = genomes[:, -1].astype(np.float64)
+
+    roundtrip = route_roundtrip_minutes(route.length_km, route.stops, evs.operated_speed_km_hour, DWELL_TIME_SECONDS)
+    fleet_cost_1k_usd = evs.total_vehicle_cost_1k_usd * n
+    metrics = fleet_metrics(evs.passenger_capacity, roundtrip, n, evs.availability, LOAD_FACTOR_EXPECTED_AVG)
+    average_wait_time_minutes = metrics['average_wait_time_minutes']
+    score = score_batch(metrics['maximum_passenger_volume'], metrics['peak_hourly_passenger_throughput'], average_wait_time_minutes, evs.availability)
+
+    excess = evs.attributes['battery_pack_weight_kg'] - evs.attributes['chasis_weight_kg'] / 3
+    return {
+        'score': score,
+        'fleet_cost_1k_usd': fleet_cost_1k_usd,
+        'average_wait_time_minutes': average_wait_time_minutes,
+        'valid': evs.valid,
+        'violation': np.where(evs.valid, 0.0, excess),
+    }
+
+
+def _crowding_distance(points: np.ndarray) -> np.ndarray:
+    distance = np.zeros(len(points))
+    if len(points) < 3:
+        distance[:] = np.inf
+        return distance
+    for k in range(points.shape[1]):
+        order = np.argsort(points[:, k], kind='stable')
+        values = points[order, k]
+        distance[order[[0, -1]]] = np.inf
+        spread = values[-1] - values[0]
+        if spread > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / spread
+    return distance
+
+
+def rank_population(objectives: np.ndarray, valid: np.ndarray, violation: np.ndarray) -> tuple:
+    """
+    Non-dominated rank and crowding distance of every individual, with every objective minimized.
+
+    Valid individuals are peeled front by front; invalid ones rank after all of them, by increasing constraint violation.
+
+    :return: ``(rank, crowding)``
+    """
+    rank = np.zeros(len(objectives), dtype=np.int64)
+    crowding = np.zeros(len(objectives))
+
+    remaining = np.flatnonzero(valid)
+    front_number = 0
+    while len(remaining):
+        on_front = nondominated_mask(objectives[remaining])
+        front = remaining[on_front]
+        rank[front] = front_number
+        crowding[front] = _crowding_distance(objectives[front])
+        remaining = remaining[~on_front]
+        front_number += 1
+
+    invalid = np.flatnonzero(~valid)
+    rank[invalid] = front_number + np.unique(violation[invalid], return_inverse=True)[1]
+    return rank, crowding
+
+
+class EvolutionResult:
+    """
+    :class:`EvolutionResult` is the outcome of :func:`run_nsga2`.
+
+    ``front`` holds the non-dominated :class:`ParetoPoint` s among every genome evaluated during the run, not only the
+    final population. ``history`` has one entry per generation, the initial population being generation 0.
+    """
+
+    def __init__(self, front: list, population: np.ndarray, objectives: np.ndarray, history: list, evaluations: int, cache_hits: int) -> None:
+        self.front: list = front
+        self.population: np.ndarray = population
+        self.objectives: np.ndarray = objectives
+        self.history: list = history
+        self.evaluations: int = evaluations
+        self.cache_hits: int = cache_hits
+
+    def __str__(self) -> str:
+        s = f'NSGA-II: {len(self.history) - 1} generations, {self.evaluations} evaluations, {self.cache_hits} cache hits, {len(self.front)} points on the front\n'
+        for point in self.front:
+            s += f'\t{point}\n'
+        return s
+
+
+def _evaluate_chunk(route, genomes, violate_constraints) -> np.ndarray:
+    values = evaluate_genomes(route, genomes, violate_constraints)
+    return np.column_stack([values[name] for name in OBJECTIVES + ('valid', 'violation')])
+
+
+def run_nsga2(route: Route, population_size: int = 100, generations: int = 50, max_fleet_size: int = 50, seed=None, workers: int = 1, crossover_probability: float = 0.9,
+              mutation_probability: float = None, violate_constraints=False) -> EvolutionResult:
+    """
+    Searches subsystem choices and fleet sizes on ``route`` for the trade-off between a high MAU score, a low fleet cost
+    and a short average wait, with NSGA-II (Deb et al., 2002).
+
+    Each generation breeds ``population_size`` children by binary tournament on (rank, crowding distance), uniform
+    crossover and per-gene mutation (a new random choice, or a step of up to a tenth of ``max_fleet_size`` vehicles), then
+    keeps the best ``population_size`` of parents and children. Configurations breaking the battery weight constraint rank
+    after every valid one, by how far they break it.
+
+    Fitness is cached per genome, so a genome is evaluated once however often it reappears. The genomes missing from the
+    cache are evaluated as one :func:`evaluate_genomes` batch, split over ``workers`` processes when there are several.
+
+    :param seed: anything :class:`numpy.random.SeedSequence` accepts; runs with the same seed and arguments are identical,
+        whatever ``workers``
+    :param mutation_probability: per gene, ``1 / 6`` by default
+    """
+    if population_size < 2:
+        raise ValueError(f'population_size must be at least 2, not {population_size}')
+    if generations < 0 or max_fleet_size < 1:
+        raise ValueError(f'generations must not be negative and max_fleet_size must be at least 1, not {generations} and {max_fleet_size}')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f'workers must be at least 1, not {workers}')
+    mutation_probability = 1 / len(GENES) if mutation_probability is None else mutation_probability
+
+    rng = np.random.default_rng(seed)
+    gene_sizes = np.array([len(choice_enum) for choice_enum in CHOICE_ENUMS] + [max_fleet_size])
+    signs = np.array([1.0 if OBJECTIVE_SENSES[name] == 'min' else -1.0 for name in OBJECTIVES])
+    fleet_size_step = max(1, max_fleet_size // 10)
+
+    cache = {}
+    archive = ParetoArchive(tuple(OBJECTIVE_SENSES[name] for name in OBJECTIVES))
+    history = []
+    cache_hits = 0
+
+    def random_genomes(size):
+        genomes = rng.integers(0, gene_sizes, size=(size, len(GENES)))
+        genomes[:, -1] += 1
+        return genomes
+
+    def evaluate(genomes, executor):
+        nonlocal cache_hits
+        keys = [tuple(genome) for genome in genomes.tolist()]
+        missing = list(dict.fromkeys(key for key in keys if key not in cache))
+        cache_hits += len(keys) - len(missing)
+        if missing:
+            batch = np.array(missing, dtype=np.int64)
+            if executor is None:
+                values = _evaluate_chunk(route, batch, violate_constraints)
+            else:
+                chunks = np.array_split(batch, workers)
+                values = np.concatenate(list(executor.map(_evaluate_chunk, [route] * len(chunks), chunks, [violate_constraints] * len(chunks))))
+            cache.update(zip(missing, values))
+            valid = values[:, len(OBJECTIVES)] == 1
+            archive.add(values[valid, :len(OBJECTIVES)], batch[valid])
+        return np.array([cache[key] for key in keys])
+
+    def record(generation, rank, values):
+        valid = values[:, len(OBJECTIVES)] == 1
+        history.append({
+            'generation': generation,
+            'evaluations': len(cache),
+            'cache_hits': cache_hits,
+            'front_size': len(archive),
+            'best_score': float(values[valid, 0].max()) if valid.any() else float('nan'),
+            'population_front_size': int(np.sum(valid & (rank == 0))),
+        })
+
+    def select(rank, crowding, size):
+        # binary tournament: lower rank wins, then larger crowding distance, then the first contestant
+        a, b = rng.integers(0, len(rank), size), rng.integers(0, len(rank), size)
+        b_wins = (rank[b] < rank[a]) | ((rank[b] == rank[a]) & (crowding[b] > crowding[a]))
+        return np.where(b_wins, b, a)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        population = random_genomes(population_size)
+        values = evaluate(population, executor)
+        rank, crowding = rank_population(values[:, :len(OBJECTIVES)] * signs, values[:, len(OBJECTIVES)] == 1, values[:, -1])
+        record(0, rank, values)
+
+        for generation in range(1, generations + 1):
+            first, second = population[select(rank, crowding, population_size)], population[select(rank, crowding, population_size)]
+            crossover = (rng.random((population_size, len(GENES))) < 0.5) & (rng.random((population_size, 1)) < crossover_probability)
+            children = np.where(crossover, second, first)
+
+            mutate = rng.random((population_size, len(GENES))) < mutation_probability
+            mutated = random_genomes(population_size)
+            children[:, :-1] = np.where(mutate[:, :-1], mutated[:, :-1], children[:, :-1])
+            steps = rng.integers(-fleet_size_step, fleet_size_step + 1, population_size)
+            children[:, -1] = np.clip(np.where(mutate[:, -1], children[:, -1] + steps, children[:, -1]), 1, max_fleet_size)
+
+            combined = np.concatenate((population, children))
+            combined_values = np.concatenate((values, evaluate(children, executor)))
+            combined_rank, combined_crowding = rank_population(combined_values[:, :len(OBJECTIVES)] * signs, combined_values[:, len(OBJECTIVES)] == 1, combined_values[:, -1])
+
+            survivors = np.lexsort((-combined_crowding, combined_rank))[:population_size]
+            population, values = combined[survivors], combined_values[survivors]
+            rank, crowding = rank_population(values[:, :len(OBJECTIVES)] * signs, values[:, len(OBJECTIVES)] == 1, values[:, -1])
+            record(generation, rank, values)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    front = []
+    for point, payload in zip(archive.points.tolist(), archive.payloads.tolist()):
+        combination = tuple(choice_enum(code + 1) for choice_enum, code in zip(CHOICE_ENUMS, payload[:-1]))
+        front.append(ParetoPoint(combination, payload[-1], dict(zip(OBJECTIVES, point))))
+    front.sort(key=lambda p: tuple(p.coordinates.values()))
+
+    return EvolutionResult(front, population, values[:, :len(OBJECTIVES)], history, len(cache), cache_hits)
@@ -0,0 +1,260 @@
+import csv
+import itertools
+import os
+
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS
+from models.fleet import Fleet
+from models.route import Route
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised when pyarrow is not installed
+    pa = pq = None
+
+
+FORMATS = ('parquet', 'arrow', 'csv')
+
+_FORMAT_BY_SUFFIX = {
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+    '.csv': 'csv',
+}
+
+# Fleet, route and EV fields holding counts; every other numeric field is stored as float64
+_INTEGER_FIELDS = {'peak_throughput_target', 'fleet_size', 'peak_hourly_passenger_throughput', 'stops', 'MAX_SPEED_KMH'}
+
+# EV flags, stored as booleans
+_BOOLEAN_FIELDS = {'violate_constraints'}
+
+_SCHEMA = None
+
+
+def fleet_schema() -> tuple:
+    """
+    Column names and types of :meth:`Fleet.to_dict`, as a tuple of ``(name, type)`` where type is ``'int64'``,
+    ``'float64'``, ``'bool'`` or ``'string'``.
+
+    Column names are taken from a reference :class:`Fleet`, subsystem column types from the component catalogs. The schema
+    is derived once and shared by every writer.
+    """
+    global _SCHEMA
+    if _SCHEMA is not None:
+        return _SCHEMA
+
+    ev = Ev(*(choice_enum(1) for choice_enum in CHOICE_ENUMS), violate_constraints=True)
+    reference = Fleet(Route(length_km=1.0, number_stops=1), ev, fleet_size=1)
+
+    types = {}
+    for subsystem_str, subsystem in ev.subsystems.items():
+        types[subsystem_str] = 'string'
+        for field in subsystem.CATALOG.fields:
+            types[f'{subsystem_str}_{field}'] = 'int64' if subsystem.CATALOG[field].dtype.kind == 'i' else 'float64'
+
+    _SCHEMA = tuple((name, types.get(name, 'int64' if name in _INTEGER_FIELDS else 'bool' if name in _BOOLEAN_FIELDS else 'float64')) for name in reference.to_dict())
+    return _SCHEMA
+
+
+def preferred_format() -> str:
+    """
+    ``'parquet'`` when pyarrow is installed, ``'csv'`` otherwise.
+    """
+    return 'parquet' if pa is not None else 'csv'
+
+
+def infer_format(path) -> str:
+    """
+    One of :data:`FORMATS`, from the suffix of ``path``.
+    """
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix not in _FORMAT_BY_SUFFIX:
+        raise ValueError(f'Cannot infer an output format from {path}, please pass one of {FORMATS}')
+    return _FORMAT_BY_SUFFIX[suffix]
+
+
+def _arrow_schema(schema):
+    arrow_types = {'int64': pa.int64(), 'float64': pa.float64(), 'bool': pa.bool_(), 'string': pa.string()}
+    return pa.schema([(name, arrow_types[kind]) for name, kind in schema])
+
+
+class FleetWriter:
+    """
+    :class:`FleetWriter` streams evaluated fleets to a Parquet, Arrow IPC or CSV file with the fixed :func:`fleet_schema`.
+
+    Rows are buffered column-wise and flushed every ``batch_size`` rows as one record batch (Parquet row group), so memory
+    stays flat however many fleets are written. Arrow IPC files can be memory-mapped by downstream tools
+    (``pyarrow.memory_map`` + ``pyarrow.ipc.open_file``). CSV needs nothing beyond the standard library.
+
+    Use as a context manager, or call :meth:`close` once done.
+    """
+
+    def __init__(self, path, format: str = None, batch_size: int = 8192) -> None:
+
+        format = infer_format(path) if format is None else format
+        if format not in FORMATS:
+            raise ValueError(f'format must be one of {FORMATS}, not {format}')
+        if format != 'csv' and pa is None:
+            raise ImportError(f"Writing {format} files requires pyarrow, use format='csv' or install pyarrow")
+        if batch_size < 1:
+            raise ValueError(f'batch_size must be at least 1, not {batch_size}')
+
+        self.path = path
+        self.format: str = format
+        self.batch_size: int = batch_size
+        self.schema: tuple = fleet_schema()
+        self.rows_written: int = 0
+
+        self._names = tuple(name for name, _ in self.schema)
+        self._buffer = [[] for _ in self._names]
+        self._buffered = 0
+        self._closed = False
+
+        if format == 'csv':
+            self._file = open(path, 'w', newline='')
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self._names)
+        elif format == 'parquet':
+            self._arrow_schema = _arrow_schema(self.schema)
+            self._writer = pq.ParquetWriter(path, self._arrow_schema)
+        else:
+            self._arrow_schema = _arrow_schema(self.schema)
+            self._sink = pa.OSFile(str(path), 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self._arrow_schema)
+
+    def __enter__(self) -> 'FleetWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def write(self, fleet) -> None:
+        """
+        Appends one :class:`Fleet`, or a dict as returned by :meth:`Fleet.to_dict`.
+        """
+        row = fleet.to_dict() if isinstance(fleet, Fleet) else fleet
+        try:
+            values = [row[name] for name in self._names]
+        except KeyError as e:
+            raise ValueError(f'fleet row is missing column {e}') from None
+
+        if self.format == 'csv':
+            self._csv.writerow(['' if value is None else value for value in values])
+            self.rows_written += 1
+            return
+
+        for column, value in zip(self._buffer, values):
+            column.append(value)
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def write_many(self, fleets) -> None:
+        for fleet in fleets:
+            self.write(fleet)
+
+    def flush(self) -> None:
+        if self.format == 'csv':
+            self._file.flush()
+            return
+        if not self._buffered:
+            return
+
+        arrays = [pa.array(column, type=field.type) for column, field in zip(self._buffer, self._arrow_schema)]
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._arrow_schema))
+        self.rows_written += self._buffered
+        self._buffer = [[] for _ in self._names]
+        self._buffered = 0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self.format == 'csv':
+            self._file.close()
+            return
+        self._writer.close()
+        if self.format == 'arrow':
+            self._sink.close()
+
+
+def _csv_columns(path, columns: tuple, chunk_size: int, numeric: bool):
+    with open(path, newline='') as f:
+        header = next(csv.reader([f.readline()]))
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f'{path} has no columns {missing}')
+        usecols = [header.index(name) for name in columns]
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            values = np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=np.float64 if numeric else str, ndmin=2)
+            yield dict(zip(columns, values.T))
+
+
+def _arrow_columns(path, format: str, columns: tuple, chunk_size: int, numeric: bool):
+    if pa is None:
+        raise ImportError(f'Reading {format} files requires pyarrow')
+    if format == 'parquet':
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(columns))
+    else:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all().select(list(columns))
+        batches = table.to_batches(max_chunksize=chunk_size)
+    for batch in batches:
+        yield {name: batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64 if numeric else str) for name in columns}
+
+
+def read_columns(path, columns, chunk_size: int = 250_000, format: str = None, numeric=True):
+    """
+    Streams ``columns`` of a :class:`FleetWriter` file as dicts of arrays of at most ``chunk_size`` rows, in row order.
+
+    :param format: one of :data:`FORMATS`, inferred from the suffix of ``path`` by default
+    :param numeric: read the columns as float64, otherwise as strings
+    """
+    columns = tuple(columns)
+    format = infer_format(path) if format is None else format
+    if format not in FORMATS:
+        raise ValueError(f'format must be one of {FORMATS}, not {format}')
+    if format == 'csv':
+        return _csv_columns(path, columns, chunk_size, numeric)
+    return _arrow_columns(path, format, columns, chunk_size, numeric)
+
+
+def write_columns(path, names, chunks, format: str = None) -> None:
+    """
+    Writes the ``names`` columns of ``chunks``, dicts of equal length arrays, to a Parquet, Arrow IPC or CSV file whose
+    column types are those of the arrays.
+
+    :param format: one of :data:`FORMATS`, inferred from the suffix of ``path`` by default
+    """
+    names = tuple(names)
+    format = infer_format(path) if format is None else format
+    if format not in FORMATS:
+        raise ValueError(f'format must be one of {FORMATS}, not {format}')
+    if format == 'csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            for chunk in chunks:
+                writer.writerows(zip(*(chunk[name].tolist() for name in names)))
+        return
+
+    if pa is None:
+        raise ImportError(f"Writing {format} files requires pyarrow, use format='csv' or install pyarrow")
+    writer = None
+    try:
+        for chunk in chunks:
+            batch = pa.RecordBatch.from_arrays([pa.array(chunk[name]) for name in names], names=list(names))
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema) if format == 'parquet' else pa.ipc.new_file(str(path), batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
@@ -0,0 +1,176 @@
+import numpy as np
+
+from models.design_space import ConfigurationSpace
+from models.ev import Ev
+from models.ev_batch import EvBatch
+from models.fleet import DWELL_TIME_SECONDS, FLEET_BUFFER_VEHICLES, LOAD_FACTOR_EXPECTED_AVG
+from models.fleet_sizing import UNREACHABLE, fleet_metrics, minimum_fleet_sizes, route_roundtrip_minutes
+from models.multi_attribute_utility import score_batch
+from models.route import Route
+
+
+class FactorizedEvs:
+    """
+    :class:`FactorizedEvs` computes the :class:`Ev` attributes of every configuration of a :class:`ConfigurationSpace`
+    on the open grid of its choice subsets, one axis per subsystem in :class:`Ev` argument order.
+
+    The attributes come from an :class:`EvBatch` with ``broadcast=False`` over the open-grid indices, so every quantity
+    keeps only the axes of the subsystems it depends on and is computed once per combination of those:
+    ``battery_charge_time_hours`` on the battery charger x battery pack plane, the additive cost and weight as running
+    sums that gain one axis per term, and so on. ``derived[name]`` holds these broadcastable partial arrays and
+    :meth:`column` expands one of them to the configurations of the space.
+    """
+
+    DERIVED_ATTRIBUTES = Ev.DERIVED_ATTRIBUTES
+
+    def __init__(self, configurations: ConfigurationSpace = None, violate_constraints=False) -> None:
+        self.configurations: ConfigurationSpace = ConfigurationSpace() if configurations is None else configurations
+        self.violate_constraints: bool = violate_constraints
+
+        # the choice subsets as open-grid indices, one axis per subsystem, through the EvBatch formulas
+        self.shape: tuple = tuple(len(subset) for subset in self.configurations.subsets)
+        indices = np.ix_(*(np.array([choice.value - 1 for choice in subset], dtype=np.int64) for subset in self.configurations.subsets))
+        batch = EvBatch(*indices, violate_constraints=violate_constraints, broadcast=False)
+
+        self.attributes: dict = batch.attributes
+        self.battery_weight_ok: np.ndarray = batch.battery_weight_ok
+        self.valid: np.ndarray = batch.valid
+        self.derived: dict = {name: getattr(batch, name) for name in self.DERIVED_ATTRIBUTES}
+
+    def __len__(self) -> int:
+        return len(self.configurations)
+
+    def partial_size(self, name: str) -> int:
+        """
+        Number of values computed for the derived attribute or constraint ``name``, at most ``len(self)`` for the full grid.
+        """
+        return int(np.size(self.derived[name] if name in self.derived else getattr(self, name)))
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Values of a derived attribute, subsystem attribute, ``battery_weight_ok`` or ``valid`` for every configuration,
+        in :class:`ConfigurationSpace` order.
+        """
+        if name in self.derived:
+            values = self.derived[name]
+        elif name in self.attributes:
+            values = self.attributes[name]
+        elif name in ('battery_weight_ok', 'valid'):
+            values = getattr(self, name)
+        else:
+            raise ValueError(f'Unknown attribute {name}')
+        values = np.broadcast_to(values, self.shape).reshape(-1)
+        return values if self.configurations.positions is None else values[self.configurations.positions]
+
+
+class FactorizedEvaluator:
+    """
+    :class:`FactorizedEvaluator` evaluates :class:`Fleet` s of every configuration of a :class:`ConfigurationSpace`
+    through two levels of equivalence classes, instead of once per configuration.
+
+    * Speed classes share their passenger capacity and operated speed, hence their route round-trip, fleet sizes, waits,
+      throughputs and frequencies.
+    * Fleet classes also share their availability, hence every fleet metric but the cost, including the MAU score.
+
+    The fleet cost is the only metric evaluated per configuration, as the vehicle cost times the fleet size of its class.
+    Invalid configurations belong to no class.
+    """
+
+    def __init__(self, configurations: ConfigurationSpace = None, violate_constraints=False) -> None:
+        self.evs: FactorizedEvs = FactorizedEvs(configurations, violate_constraints)
+        self.valid: np.ndarray = self.evs.column('valid')
+        self.total_vehicle_cost_1k_usd: np.ndarray = self.evs.column('total_vehicle_cost_1k_usd')
+
+        keys = np.column_stack([self.evs.column(name) for name in ('chasis_passenger_capacity', 'operated_speed_km_hour', 'availability')])
+        valid = np.flatnonzero(self.valid)
+
+        # fleet classes, then the speed class of every fleet class
+        class_keys, inverse = np.unique(keys[valid], axis=0, return_inverse=True)
+        self.class_of: np.ndarray = np.full(len(keys), -1, dtype=np.int64)
+        self.class_of[valid] = inverse.reshape(-1)
+        self.passenger_capacity, self.operated_speed_km_hour, self.availability = class_keys.T
+        speed_keys, speed_inverse = np.unique(class_keys[:, :2], axis=0, return_inverse=True)
+        self.speed_class_of_class: np.ndarray = speed_inverse.reshape(-1)
+        self.speed_passenger_capacity, self.speed_operated_speed_km_hour = speed_keys.T
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def class_count(self) -> int:
+        return len(self.availability)
+
+    @property
+    def speed_class_count(self) -> int:
+        return len(self.speed_operated_speed_km_hour)
+
+    def evaluate(self, route: Route, fleet_sizes=None, peak_throughput_targets=None) -> dict:
+        """
+        Fleet metrics of every configuration on ``route`` for each of ``fleet_sizes``, or for the fleet sized to each of
+        ``peak_throughput_targets``, identical to building ``Fleet(route, ev, fleet_size=...)`` or
+        ``Fleet(route, ev, peak_throughput_target=...)`` for each configuration.
+
+        :return: ``(configurations, values)`` arrays keyed like :meth:`FleetSizeScan.curves`, plus ``valid``: the
+            configuration is valid and the fleet could be sized. Other entries hold a fleet size of 0 and NaN metrics.
+        """
+        if type(route) is not Route:
+            raise ValueError(f'route argument must be of type route rather than supplied {type(route)}')
+        if (fleet_sizes is None) == (peak_throughput_targets is None):
+            raise ValueError("Please specify exactly one of fleet_sizes or peak_throughput_targets")
+
+        if fleet_sizes is not None and np.any(np.asarray(fleet_sizes) < 1):
+            raise ValueError("fleet sizes must be at least 1")
+
+        # a space without buildable configuration has no class to evaluate
+        if self.class_count == 0:
+            shape = (len(self), np.size(fleet_sizes if fleet_sizes is not None else peak_throughput_targets))
+            result = {name: np.full(shape, np.nan) for name in ('fleet_cost_1k_usd', 'average_wait_time_minutes', 'peak_hourly_passenger_throughput',
+                                                                'maximum_passenger_volume', 'frequency_peak', 'score')}
+            return {'fleet_size': np.zeros(shape, dtype=np.int64), **result, 'valid': np.zeros(shape, dtype=bool)}
+
+        capacity = self.speed_passenger_capacity[:, None]
+        roundtrip = route_roundtrip_minutes(route.length_km, route.stops, self.speed_operated_speed_km_hour, DWELL_TIME_SECONDS)[:, None]
+
+        # SPEED CLASSES
+        if fleet_sizes is not None:
+            fleet_size = np.broadcast_to(np.asarray(fleet_sizes, dtype=np.int64).reshape(1, -1), (self.speed_class_count, np.size(fleet_sizes)))
+        else:
+            targets = np.asarray(peak_throughput_targets, dtype=np.float64).reshape(1, -1)
+            fleet_size = minimum_fleet_sizes(capacity, roundtrip, targets, LOAD_FACTOR_EXPECTED_AVG)
+            fleet_size = np.where(fleet_size == UNREACHABLE, 0, fleet_size + FLEET_BUFFER_VEHICLES)
+        sized = fleet_size >= 1
+
+        n = np.where(sized, fleet_size, np.nan)
+        # the volume is throughput * 24 * availability, evaluated left to right, so the volume at an availability of 1 is
+        # scaled per fleet class below without changing a bit
+        metrics = fleet_metrics(capacity, roundtrip, n, 1.0, LOAD_FACTOR_EXPECTED_AVG)
+
+        # FLEET CLASSES
+        speed_class = self.speed_class_of_class
+        availability = self.availability[:, None]
+        class_sized = sized[speed_class]
+        maximum_passenger_volume = metrics['maximum_passenger_volume'][speed_class] * availability
+        score = np.full(maximum_passenger_volume.shape, np.nan)
+        score[class_sized] = score_batch(maximum_passenger_volume[class_sized], metrics['peak_hourly_passenger_throughput'][speed_class][class_sized],
+                                         metrics['average_wait_time_minutes'][speed_class][class_sized], np.broadcast_to(availability, class_sized.shape)[class_sized])
+
+        # CONFIGURATIONS
+        class_of = self.class_of
+        member = class_of >= 0
+        rows = speed_class[np.where(member, class_of, 0)]
+        valid = member[:, None] & sized[rows]
+
+        def expand(values, by_class=False):
+            values = values[np.where(member, class_of, 0)] if by_class else values[rows]
+            return np.where(valid, values, np.nan)
+
+        return {
+            'fleet_size': np.where(valid, fleet_size[rows], 0),
+            'fleet_cost_1k_usd': np.where(valid, self.total_vehicle_cost_1k_usd[:, None] * n[rows], np.nan),
+            'average_wait_time_minutes': expand(metrics['average_wait_time_minutes']),
+            'peak_hourly_passenger_throughput': expand(metrics['peak_hourly_passenger_throughput']),
+            'maximum_passenger_volume': expand(maximum_passenger_volume, by_class=True),
+            'frequency_peak': expand(metrics['frequency_peak']),
+            'score': expand(score, by_class=True),
+            'valid': valid,
+        }
@@ -0,0 +1,104 @@
+import numpy as np
+
+from models.battery_pack import BATTERY_PACK_CATALOG
+from models.chasis import CHASIS_CATALOG
+from models.ev_batch import CHOICE_ENUMS, EvBatch
+
+
+class FeasibilityIndex:
+    """
+    :class:`FeasibilityIndex` enumerates the :class:`Ev` configurations that can be built without raising.
+
+    The battery weight rule only involves the battery pack and the chassis, so the valid ``(battery_pack, chasis)``
+    pairs are tabulated once from the two catalogs and the design space is expanded from those pairs alone. Derived
+    attributes of the feasible configurations are evaluated once, in an :class:`EvBatch`, so that further constraints
+    (cost, range, seats, or any predicate on the batch columns) are plain vectorized masks.
+
+    Rows are in ``itertools.product`` order over the choice enums, like :func:`iter_design_space` without the infeasible
+    configurations.
+    """
+
+    def __init__(self, violate_constraints=False) -> None:
+        self.violate_constraints: bool = violate_constraints
+
+        # pair_ok[battery_pack, chasis]
+        pair_ok = BATTERY_PACK_CATALOG['weight_kg'][:, None] <= CHASIS_CATALOG['weight_kg'][None, :] / 3
+        self.pair_ok: np.ndarray = pair_ok | violate_constraints
+        self.pair_ok.flags.writeable = False
+
+        # position of every feasible configuration in the full design space: the valid (battery_pack, chasis) pairs, in
+        # row-major order, crossed with the three other axes are already in itertools.product order
+        sizes = tuple(len(choice_enum) for choice_enum in CHOICE_ENUMS)
+        battery_pack, chasis = np.nonzero(self.pair_ok)
+        autonomous_system, battery_charger, pair, motor_and_inverter = np.ix_(*(np.arange(size) for size in (sizes[0], sizes[1], len(battery_pack), sizes[4])))
+        self.positions: np.ndarray = np.ravel_multi_index((autonomous_system, battery_charger, battery_pack[pair], chasis[pair], motor_and_inverter), sizes).reshape(-1)
+        self.codes: np.ndarray = np.ascontiguousarray(np.stack(np.unravel_index(self.positions, sizes), axis=-1))
+        self.codes.flags.writeable = False
+        self.batch: EvBatch = EvBatch(*self.codes.T, violate_constraints=violate_constraints)
+
+        self._rows = {tuple(codes): row for row, codes in enumerate(self.codes.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, choices) -> bool:
+        return tuple(choice.value - 1 for choice in choices) in self._rows
+
+    def pairs(self) -> list:
+        """
+        Valid ``(BatteryPackChoice, ChasisChoice)`` pairs.
+        """
+        battery_pack_enum, chasis_enum = CHOICE_ENUMS[2], CHOICE_ENUMS[3]
+        return [(battery_pack_enum(p + 1), chasis_enum(c + 1)) for p, c in zip(*np.nonzero(self.pair_ok))]
+
+    def mask(self, max_cost_1k_usd: float = None, min_range_km: float = None, min_passenger_capacity: int = None, constraints=()) -> np.ndarray:
+        """
+        Boolean mask over the feasible rows meeting every given constraint.
+
+        :param constraints: extra predicates, each called with the :class:`EvBatch` of the feasible configurations and
+            returning a boolean array, e.g. ``lambda evs: evs.availability >= 0.8``
+        """
+        batch = self.batch
+        mask = np.ones(len(self), dtype=bool)
+        if max_cost_1k_usd is not None:
+            mask &= batch.total_vehicle_cost_1k_usd <= max_cost_1k_usd
+        if min_range_km is not None:
+            mask &= batch.range_km >= min_range_km
+        if min_passenger_capacity is not None:
+            mask &= batch.passenger_capacity >= min_passenger_capacity
+        for constraint in constraints:
+            mask &= np.asarray(constraint(batch), dtype=bool)
+        return mask
+
+    def rows(self, **constraints) -> np.ndarray:
+        """
+        Indices of the feasible rows meeting ``constraints`` (see :meth:`mask`).
+        """
+        return np.flatnonzero(self.mask(**constraints))
+
+    def choices(self, **constraints) -> list:
+        """
+        Choice tuples, in :class:`Ev` argument order, of the configurations meeting ``constraints`` (see :meth:`mask`).
+        """
+        members = [list(choice_enum) for choice_enum in CHOICE_ENUMS]
+        return [tuple(member[code] for member, code in zip(members, codes)) for codes in self.codes[self.mask(**constraints)].tolist()]
+
+
+_INDEXES = {}
+
+
+def feasibility_index(violate_constraints=False) -> FeasibilityIndex:
+    """
+    Shared :class:`FeasibilityIndex`, built on first use.
+    """
+    key = bool(violate_constraints)
+    if key not in _INDEXES:
+        _INDEXES[key] = FeasibilityIndex(violate_constraints=key)
+    return _INDEXES[key]
+
+
+def feasible_choices(violate_constraints=False, **constraints) -> list:
+    """
+    :meth:`FeasibilityIndex.choices` of the shared index, ready to pass as the ``choices`` of a sweep.
+    """
+    return feasibility_index(violate_constraints).choices(**constraints)
@@ -1,16 +1,61 @@
+import copy
 import math
+from operator import methodcaller
 
+import numpy as np
+
+from models._lazy import derived, invalidate, is_lazy, ordered_state
 from models.ev import Ev
-from models.multi_attribute_utility import MultiAttributeUtility
+from models.fleet_record import FleetRecord
+from models.fleet_sizing import UNREACHABLE, fleet_metrics, minimum_fleet_size, minimum_fleet_sizes, route_roundtrip_minutes
+from models.multi_attribute_utility import MultiAttributeUtility, score_batch
 from models.route import Route
 
 
+# Average passenger weight [kg] = 100
+PASSENGER_WEIGHT_AVERAGE_KG = 100
+
+# Expected average load factor/trip = 0.75
+LOAD_FACTOR_EXPECTED_AVG = 0.75
+
+# Benchmark availability of competing systems: 0.75
+BENCHMARK_AVAIL_COMPETING_SYSTEMS = 0.75
+
+# Dwell time [s] = 60 (time for passengers get out and get in)
+DWELL_TIME_SECONDS = 60
+
+# Optional number of fleet buffer
+FLEET_BUFFER_VEHICLES = 0
+
+# Version of the Ev, Fleet, fleet sizing, MAU and Route formulas, to bump whenever a change to them changes any result
+MODEL_VERSION = 1
+
+
 class Fleet:
     """
     :class:`Fleet` represents an n number of vehicle fleet of :class:`Ev` and its derived properties. 
+
+    With ``lazy=True`` the fleet size dependent attributes, including the MAU score, are computed on first access.
     """
 
-    def __init__(self, route: Route, ev: Ev, fleet_size: int = None, peak_throughput_target: int = None) -> None:
+    # Fleet size dependent attributes, in the order they depend on each other
+    DERIVED_ATTRIBUTES = (
+        'fleet_cost_1k_usd',
+        'average_wait_time_minutes',
+        'peak_hourly_passenger_throughput',
+        'maximum_passenger_volume',
+        'frequency_peak',
+        'score',
+    )
+
+    fleet_cost_1k_usd = derived(methodcaller('calculate_total_fleet_cost_usd'))
+    average_wait_time_minutes = derived(methodcaller('calculate_average_waiting_time_minutes'))
+    peak_hourly_passenger_throughput = derived(lambda fleet: fleet.calculate_throughput(fleet.fleet_size))
+    maximum_passenger_volume = derived(methodcaller('calculate_maximum_passenger_volume'))
+    frequency_peak = derived(lambda fleet: fleet.calculate_frequency_per_hour(fleet.peak_hourly_passenger_throughput))
+    score = derived(methodcaller('calculate_mau_score'))
+
+    def __init__(self, route: Route, ev: Ev, fleet_size: int = None, peak_throughput_target: int = None, lazy=False) -> None:
         """
         Creates the :class:`Fleet` class. 
 
@@ -20,12 +65,14 @@ class Fleet:
         :type ev: :class:`Ev`
         :param fleet_size: Size of fleet
         :type fleet_size: int
+        :param lazy: compute the fleet size dependent attributes on first access
+        :type lazy: bool
         """
 
         # PARAMETER VALIDATION
         if type(route) is not Route:
             raise ValueError(f'route argument must be of type route rather than supplied {type(route)}')
-        if type(ev) is not Ev:
+        if not isinstance(ev, Ev):
             raise ValueError(f'ev argument must be of type Ev rather than supplied {type(ev)}')
         if fleet_size is None and peak_throughput_target is None:
             raise AttributeError("Please either specify a fleet_size value or peak_throughput_target")
@@ -33,20 +80,11 @@ class Fleet:
             raise AttributeError(f"fleet_size must be of type int.")
 
         # CONSTANTS
-        # Average passenger weight [kg] = 100
-        self._PASSENGER_WEIGHT_AVERAGE_KG = 100
-
-        # Expected average load factor/trip = 0.75
-        self._LOAD_FACTOR_EXPECTED_AVG = 0.75
-
-        # Benchmark availability of competing systems: 0.75
-        self._BENCHMARK_AVAIL_COMPETING_SYSTEMS = 0.75
-
-        # Dwell time [s] = 60 (time for passengers get out and get in)
-        self._DWELL_TIME_SECONDS = 60
-
-        # Optional number of fleet buffer
-        self._FLEET_BUFFER_VEHICLES = 0
+        self._PASSENGER_WEIGHT_AVERAGE_KG = PASSENGER_WEIGHT_AVERAGE_KG
+        self._LOAD_FACTOR_EXPECTED_AVG = LOAD_FACTOR_EXPECTED_AVG
+        self._BENCHMARK_AVAIL_COMPETING_SYSTEMS = BENCHMARK_AVAIL_COMPETING_SYSTEMS
+        self._DWELL_TIME_SECONDS = DWELL_TIME_SECONDS
+        self._FLEET_BUFFER_VEHICLES = FLEET_BUFFER_VEHICLES
 
         # DERIVED PARAMETERS
         self.route: Route = route
@@ -56,6 +94,17 @@ class Fleet:
         self.route_completion_time_per_vehicle_minutes: float = self.calculate_route_roundtrip_minutes()
 
         self.fleet_size: int = fleet_size if fleet_size is not None else self.optimize_ideal_fleet_size()
+        if not lazy:
+            self._calculate_fleet_size_dependents()
+
+    def _update_fleet_size_dependents(self) -> None:
+        # a lazy fleet stays lazy, an eager one is recomputed
+        if is_lazy(self, self.DERIVED_ATTRIBUTES):
+            invalidate(self, self.DERIVED_ATTRIBUTES)
+        else:
+            self._calculate_fleet_size_dependents()
+
+    def _calculate_fleet_size_dependents(self) -> None:
         self.fleet_cost_1k_usd: float = self.calculate_total_fleet_cost_usd()
 
         self.average_wait_time_minutes: float = self.calculate_average_waiting_time_minutes()
@@ -65,6 +114,36 @@ class Fleet:
 
         self.score: float = self.calculate_mau_score()
 
+    def with_fleet_size(self, fleet_size: int) -> 'Fleet':
+        """
+        Returns a copy of this :class:`Fleet` with ``fleet_size`` vehicles, as ``Fleet(route, ev, fleet_size=fleet_size)``
+        would build it. The route round-trip time is reused, only the fleet size dependent attributes are recomputed.
+        """
+        if type(fleet_size) is not int:
+            raise AttributeError(f"fleet_size must be of type int.")
+
+        fleet = copy.copy(self)
+        fleet.peak_throughput_target = None
+        fleet.fleet_size = fleet_size
+        fleet._update_fleet_size_dependents()
+        return fleet
+
+    def with_route(self, route: Route) -> 'Fleet':
+        """
+        Returns a copy of this :class:`Fleet` running on ``route``. A fleet sized for a peak throughput target is re-sized
+        for the same target on the new route, otherwise the fleet size is kept.
+        """
+        if type(route) is not Route:
+            raise ValueError(f'route argument must be of type route rather than supplied {type(route)}')
+
+        fleet = copy.copy(self)
+        fleet.route = route
+        fleet.route_completion_time_per_vehicle_minutes = fleet.calculate_route_roundtrip_minutes()
+        if fleet.peak_throughput_target is not None:
+            fleet.fleet_size = fleet.optimize_ideal_fleet_size()
+        fleet._update_fleet_size_dependents()
+        return fleet
+
     def calculate_frequency_per_hour(self, throughput: int, cars_per_train=1) -> float:
         # OS4 Appendix B. Thanks Wikipedia
         # will give you the number of vehicles required to service a route given a throughput target
@@ -89,11 +168,17 @@ class Fleet:
         return calculated_throughput
 
     def optimize_ideal_fleet_size(self) -> int:
-        fleet_size = 0
-        calculated_throughput = 0
-        while calculated_throughput < self.peak_throughput_target:
-            fleet_size += 1
-            calculated_throughput = self.calculate_throughput(fleet_size)
+        """
+        Smallest fleet size whose :meth:`calculate_throughput` reaches ``peak_throughput_target``, plus the fleet buffer.
+
+        :raises UnreachableThroughputError: if no fleet size reaches the target
+        """
+        fleet_size = minimum_fleet_size(
+            passenger_capacity=self.vehicle.chasis.passenger_capacity,
+            roundtrip_minutes=self.route_completion_time_per_vehicle_minutes,
+            peak_throughput_target=self.peak_throughput_target,
+            load_factor=self._LOAD_FACTOR_EXPECTED_AVG
+        )
         return fleet_size + self._FLEET_BUFFER_VEHICLES
 
     def calculate_total_fleet_cost_usd(self) -> float:
@@ -102,7 +187,7 @@ class Fleet:
 
     def calculate_average_waiting_time_minutes(self) -> float:
         # uses peak load...
-        time = self.calculate_route_roundtrip_minutes() / self.fleet_size
+        time = self.route_completion_time_per_vehicle_minutes / self.fleet_size
         return round(time, 3)
 
     def calculate_mau_score(self) -> float:
@@ -117,28 +202,92 @@ class Fleet:
 
     def to_dict(self) -> dict:
         # fleet
-        d = {k: v for k, v in self.__dict__.items() if k[0] != '_' and k not in ('route', 'vehicle')}
+        d = {k: v for k, v in ordered_state(self, self.DERIVED_ATTRIBUTES).items() if k[0] != '_' and k not in ('route', 'vehicle')}
 
         # route
         route = {k: v for k, v in self.route.__dict__.items() if k[0] != '_'}
         d.update(route)
 
         # ev and subsystems
-        ev = {k: v for k, v in self.vehicle.__dict__.items() if k[0] != '_'}
-        for subsystem_str, subsystem in self.vehicle.subsystems.items():
-            elements = {f'{subsystem_str}_{k}': v for k, v in subsystem.__dict__.items() if k[0] != '_' and k != 'choice'}
-            elements[subsystem_str] = subsystem.choice.name
-            ev.update(elements)
-
-        ev.pop("subsystems")
-        d.update(ev)
+        d.update(self.vehicle.to_dict())
 
         return d
 
+    def to_record(self) -> FleetRecord:
+        """
+        Compact, immutable :class:`FleetRecord` of the fleet, holding choice codes, route parameters and fleet metrics only.
+        """
+        return FleetRecord.from_fleet(self)
+
     def __str__(self) -> str:
         s = 'Fleet:\n'
-        for k, v in self.__dict__.items():
+        for k, v in ordered_state(self, self.DERIVED_ATTRIBUTES).items():
             if k in {'vehicle'}:
                 continue
             s += f'\t{k}: {v}\n'
         return s
+
+
+class FleetSizeScan:
+    """
+    :class:`FleetSizeScan` evaluates one :class:`Ev` on one :class:`Route` over many fleet sizes at once.
+
+    The route round-trip time and the vehicle attributes are computed once; :meth:`curves` then returns every fleet size
+    dependent :class:`Fleet` attribute as an array, identical to building ``Fleet(route, ev, fleet_size=n)`` for each size.
+    """
+
+    def __init__(self, route: Route, ev: Ev) -> None:
+        self.reference: Fleet = Fleet(route, ev, fleet_size=1)
+        self.route: Route = route
+        self.vehicle: Ev = ev
+        self.route_completion_time_per_vehicle_minutes: float = self.reference.route_completion_time_per_vehicle_minutes
+
+    def fleet(self, fleet_size: int) -> Fleet:
+        return self.reference.with_fleet_size(fleet_size)
+
+    def curves(self, fleet_sizes) -> dict:
+        """
+        Fleet attributes for every fleet size, keyed like :meth:`Fleet.to_dict`.
+
+        :param fleet_sizes: iterable or array of fleet sizes, each at least 1
+        """
+        fleet_size = np.asarray(fleet_sizes, dtype=np.int64)
+        if np.any(fleet_size < 1):
+            raise ValueError("fleet sizes must be at least 1")
+
+        n = fleet_size.astype(np.float64)
+        availability = self.vehicle.availability
+        metrics = fleet_metrics(self.vehicle.chasis.passenger_capacity, self.route_completion_time_per_vehicle_minutes, n, availability,
+                                self.reference._LOAD_FACTOR_EXPECTED_AVG)
+        score = score_batch(metrics['maximum_passenger_volume'], metrics['peak_hourly_passenger_throughput'], metrics['average_wait_time_minutes'], availability)
+
+        return {
+            'fleet_size': fleet_size,
+            'fleet_cost_1k_usd': self.vehicle.total_vehicle_cost_1k_usd * n,
+            'average_wait_time_minutes': metrics['average_wait_time_minutes'],
+            'peak_hourly_passenger_throughput': metrics['peak_hourly_passenger_throughput'].astype(np.int64),
+            'maximum_passenger_volume': metrics['maximum_passenger_volume'],
+            'frequency_peak': metrics['frequency_peak'],
+            'score': score,
+        }
+
+
+def size_fleets(routes, evs, peak_throughput_targets) -> np.ndarray:
+    """
+    Batched :meth:`Fleet.optimize_ideal_fleet_size` over many ``(route, ev, peak_throughput_target)`` tuples.
+
+    ``routes``, ``evs`` and ``peak_throughput_targets`` are equal length sequences. Targets that no fleet size can reach are
+    reported as :data:`models.fleet_sizing.UNREACHABLE` instead of raising.
+    """
+    if not len(routes) == len(evs) == len(peak_throughput_targets):
+        raise ValueError("routes, evs and peak_throughput_targets must have the same length")
+
+    length_km = np.array([route.length_km for route in routes], dtype=np.float64)
+    stops = np.array([route.stops for route in routes], dtype=np.float64)
+    operated_speed_km_hour = np.array([ev.operated_speed_km_hour for ev in evs], dtype=np.float64)
+    passenger_capacity = np.array([ev.chasis.passenger_capacity for ev in evs], dtype=np.int64)
+
+    roundtrip_minutes = route_roundtrip_minutes(length_km, stops, operated_speed_km_hour, DWELL_TIME_SECONDS)
+    sizes = minimum_fleet_sizes(passenger_capacity, roundtrip_minutes, np.asarray(peak_throughput_targets, dtype=np.float64), LOAD_FACTOR_EXPECTED_AVG)
+
+    return np.where(sizes == UNREACHABLE, sizes, sizes + FLEET_BUFFER_VEHICLES)
@@ -0,0 +1,273 @@
+import math
+
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS, SUBSYSTEM_CATALOGS
+from models.ev_registry import get_ev
+from models.route import Route
+
+
+# Fleet attributes kept by a record, in :meth:`Fleet.to_dict` order
+FLEET_FIELDS = (
+    'peak_throughput_target',
+    'route_completion_time_per_vehicle_minutes',
+    'fleet_size',
+    'fleet_cost_1k_usd',
+    'average_wait_time_minutes',
+    'peak_hourly_passenger_throughput',
+    'maximum_passenger_volume',
+    'frequency_peak',
+    'score',
+)
+
+# One row of a :class:`FleetRecordArray`. Choice codes are 0-based indices in :class:`Ev` argument order and a fleet
+# sized without a peak throughput target stores NaN as its target.
+FLEET_RECORD_DTYPE = np.dtype(
+    [(subsystem_str, np.uint8) for subsystem_str in SUBSYSTEM_CATALOGS]
+    + [('violate_constraints', np.bool_), ('length_km', np.float64), ('stops', np.int64)]
+    + [(name, np.int64 if name in ('fleet_size', 'peak_hourly_passenger_throughput') else np.float64) for name in FLEET_FIELDS]
+)
+
+
+class FleetRecord:
+    """
+    :class:`FleetRecord` is the compact, immutable result of a :class:`Fleet`: choice codes, route parameters, fleet size
+    and the fleet metrics, without the :class:`Route`, :class:`Ev` and subsystem objects behind them.
+
+    The :class:`Ev` attributes are not stored; :meth:`to_dict` looks the vehicle up in the shared :class:`EvRegistry`,
+    so a record gives the same columns as :meth:`Fleet.to_dict`.
+    """
+
+    __slots__ = ('codes', 'violate_constraints', 'length_km', 'stops') + FLEET_FIELDS
+
+    def __init__(self, codes: tuple, violate_constraints: bool, length_km: float, stops: int, peak_throughput_target, route_completion_time_per_vehicle_minutes: float,
+                 fleet_size: int, fleet_cost_1k_usd: float, average_wait_time_minutes: float, peak_hourly_passenger_throughput: int, maximum_passenger_volume: float,
+                 frequency_peak: float, score: float) -> None:
+        """
+        :param codes: 0-based choice indices, in :class:`Ev` argument order
+        :type codes: tuple
+        """
+        if len(codes) != len(CHOICE_ENUMS):
+            raise ValueError(f'codes must hold one index per subsystem {tuple(SUBSYSTEM_CATALOGS)}, not {codes}')
+
+        values = (tuple(int(code) for code in codes), bool(violate_constraints), length_km, stops, peak_throughput_target, route_completion_time_per_vehicle_minutes,
+                  fleet_size, fleet_cost_1k_usd, average_wait_time_minutes, peak_hourly_passenger_throughput, maximum_passenger_volume, frequency_peak, score)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_fleet(cls, fleet) -> 'FleetRecord':
+        """
+        Record of ``fleet``. The metrics of a lazy fleet are computed on the way.
+        """
+        ev = fleet.vehicle
+        codes = tuple(subsystem.choice.value - 1 for subsystem in (ev.autonomous_system, ev.battery_charger, ev.battery_pack, ev.chasis, ev.motor_and_inverter))
+        return cls(codes, ev.violate_constraints, fleet.route.length_km, fleet.route.stops, *(getattr(fleet, name) for name in FLEET_FIELDS))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> 'FleetRecord':
+        """
+        Record of a :meth:`Fleet.to_dict` row, e.g. a :class:`SweepResult` ``fleet``.
+        """
+        codes = tuple(choice_enum[d[subsystem_str]].value - 1 for subsystem_str, choice_enum in zip(SUBSYSTEM_CATALOGS, CHOICE_ENUMS))
+        return cls(codes, d['violate_constraints'], d['length_km'], d['stops'], *(d[name] for name in FLEET_FIELDS))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is read-only')
+
+    def __reduce__(self):
+        return type(self), self._values()
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    @property
+    def choices(self) -> tuple:
+        """
+        Choice enums, in :class:`Ev` argument order.
+        """
+        return ev_choices(self.codes)
+
+    @property
+    def route(self) -> Route:
+        return Route(length_km=self.length_km, number_stops=self.stops)
+
+    @property
+    def vehicle(self) -> Ev:
+        """
+        The shared, read-only :class:`Ev` of the record (see :func:`get_ev`).
+        """
+        return get_ev(*self.choices, violate_constraints=self.violate_constraints)
+
+    def to_row(self) -> tuple:
+        """
+        The record as a row of :data:`FLEET_RECORD_DTYPE`.
+        """
+        target = math.nan if self.peak_throughput_target is None else self.peak_throughput_target
+        return self.codes + (self.violate_constraints, self.length_km, self.stops, target) + tuple(getattr(self, name) for name in FLEET_FIELDS[1:])
+
+    @classmethod
+    def from_row(cls, row) -> 'FleetRecord':
+        """
+        Record of a :data:`FLEET_RECORD_DTYPE` row, with Python scalars.
+        """
+        values = row.tolist() if isinstance(row, np.void) else tuple(row)
+        n = len(CHOICE_ENUMS)
+        codes, (violate_constraints, length_km, stops, target), metrics = values[:n], values[n:n + 4], values[n + 4:]
+        if math.isnan(target):
+            target = None
+        elif target.is_integer():
+            target = int(target)
+        return cls(codes, violate_constraints, length_km, stops, target, *metrics)
+
+    def to_dict(self) -> dict:
+        """
+        Same columns as :meth:`Fleet.to_dict` of the fleet the record was taken from.
+        """
+        d = {name: getattr(self, name) for name in FLEET_FIELDS}
+        d['length_km'] = self.length_km
+        d['stops'] = self.stops
+        d.update(_ev_columns(self.codes, self.violate_constraints))
+        return d
+
+    def __str__(self) -> str:
+        s = 'FleetRecord:\n'
+        s += f'\tvehicle: {", ".join(choice.name for choice in self.choices)}\n'
+        s += f'\troute: {self.route}\n'
+        for name in FLEET_FIELDS:
+            s += f'\t{name}: {getattr(self, name)}\n'
+        return s
+
+
+# Ev.to_dict() of the shared Ev of every (codes, violate_constraints) seen, at most the size of the design space twice
+_EV_COLUMNS = {}
+
+
+def _ev_columns(codes: tuple, violate_constraints: bool) -> dict:
+    key = (codes, violate_constraints)
+    columns = _EV_COLUMNS.get(key)
+    if columns is None:
+        columns = _EV_COLUMNS[key] = get_ev(*ev_choices(codes), violate_constraints=violate_constraints).to_dict()
+    return columns
+
+
+def ev_choices(codes) -> tuple:
+    """
+    Choice enums of 0-based choice ``codes``, in :class:`Ev` argument order.
+    """
+    return tuple(choice_enum(int(code) + 1) for choice_enum, code in zip(CHOICE_ENUMS, codes))
+
+
+class FleetRecordArray:
+    """
+    :class:`FleetRecordArray` stores many :class:`FleetRecord` s contiguously, one :data:`FLEET_RECORD_DTYPE` row each.
+
+    Rows are appended into a buffer that grows geometrically. Indexing returns a :class:`FleetRecord` and :meth:`column`
+    a NumPy array of one field, so filters and sorts over millions of results stay vectorized.
+    """
+
+    def __init__(self, records=(), capacity: int = 1024) -> None:
+        self._data = np.empty(max(int(capacity), 1), dtype=FLEET_RECORD_DTYPE)
+        self._size = 0
+        self.extend(records)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> 'FleetRecordArray':
+        """
+        Wraps a copy of a :data:`FLEET_RECORD_DTYPE` array, e.g. one read back with ``np.load``.
+        """
+        array = np.asarray(array)
+        if array.dtype != FLEET_RECORD_DTYPE:
+            raise ValueError(f'array must be of dtype FLEET_RECORD_DTYPE rather than supplied {array.dtype}')
+
+        records = cls(capacity=len(array))
+        records._data[:len(array)] = array
+        records._size = len(array)
+        return records
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        if size > len(self._data):
+            data = np.empty(max(size, 2 * len(self._data)), dtype=FLEET_RECORD_DTYPE)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    def append(self, record) -> None:
+        """
+        Appends a :class:`FleetRecord` or the record of a :class:`Fleet`.
+        """
+        if not isinstance(record, FleetRecord):
+            record = record.to_record()
+        self._reserve(self._size + 1)
+        self._data[self._size] = record.to_row()
+        self._size += 1
+
+    def extend(self, records) -> None:
+        """
+        Appends every :class:`FleetRecord` or :class:`Fleet` of ``records``.
+        """
+        rows = [(record if isinstance(record, FleetRecord) else record.to_record()).to_row() for record in records]
+        self._reserve(self._size + len(rows))
+        self._data[self._size:self._size + len(rows)] = rows
+        self._size += len(rows)
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Read-only view of the stored rows.
+        """
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def nbytes(self) -> int:
+        return self._size * FLEET_RECORD_DTYPE.itemsize
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only view of the field ``name`` (see :data:`FLEET_RECORD_DTYPE`) of every row.
+        """
+        if name not in FLEET_RECORD_DTYPE.names:
+            raise ValueError(f'Unknown field {name}, expected one of {FLEET_RECORD_DTYPE.names}')
+        return self.array[name]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FleetRecordArray.from_array(self.array[index])
+        if not -self._size <= index < self._size:
+            raise IndexError(f'record index {index} out of range for {self._size} records')
+        return FleetRecord.from_row(self._data[index % self._size])
+
+    def __iter__(self):
+        for row in self.array.tolist():
+            yield FleetRecord.from_row(row)
+
+    def take(self, rows) -> 'FleetRecordArray':
+        """
+        Records at ``rows``, an index array or a boolean mask, e.g. ``records.take(records.column('score') > 0.6)``.
+        """
+        return FleetRecordArray.from_array(self.array[rows])
+
+    def to_dicts(self) -> list:
+        """
+        :meth:`FleetRecord.to_dict` of every record.
+        """
+        return [record.to_dict() for record in self]
+
+    def __str__(self) -> str:
+        return f'FleetRecordArray: {self._size} records, {self.nbytes} bytes'
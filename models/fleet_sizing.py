@@ -0,0 +1,171 @@
+import math
+
+import numpy as np
+
+from models._vectorized import round_like_python
+
+
+# Marker returned by :func:`minimum_fleet_sizes` for targets that no fleet size can reach
+UNREACHABLE = -1
+
+# Fleet sizes are searched as float64 values, which stay exact up to 2**53
+_MAX_FLEET_SIZE = 2 ** 53
+
+
+class UnreachableThroughputError(ValueError):
+    """
+    Raised when no fleet size can reach a peak throughput target.
+    """
+
+
+def throughput(passenger_capacity: int, roundtrip_minutes: float, fleet_size: int, load_factor: float = 0.75) -> int:
+    """
+    Peak hourly throughput of a fleet, evaluated exactly like :meth:`Fleet.calculate_throughput`.
+    """
+    pass_per_stop = math.floor(passenger_capacity * load_factor * fleet_size)
+    cycles = 60 / (roundtrip_minutes / fleet_size)
+    return math.floor(pass_per_stop * cycles)
+
+
+def _is_reachable(passenger_capacity, roundtrip_minutes, load_factor, target) -> bool:
+    return passenger_capacity * load_factor > 0 and 0 < roundtrip_minutes < math.inf and target < math.inf
+
+
+def _estimate_fleet_size(passenger_capacity, roundtrip_minutes, load_factor, target):
+    # throughput(n) ~= capacity * load_factor * n * 60 * n / roundtrip, solved for n
+    return np.ceil(np.sqrt(target * roundtrip_minutes / (60 * passenger_capacity * load_factor)))
+
+
+def minimum_fleet_size(passenger_capacity: int, roundtrip_minutes: float, peak_throughput_target: float, load_factor: float = 0.75) -> int:
+    """
+    Smallest fleet size whose :func:`throughput` reaches ``peak_throughput_target``.
+
+    Gives the same answer as adding one vehicle at a time: :func:`throughput` is non-decreasing in the fleet size, so
+    the search starts from the closed-form estimate, gallops to bracket the answer and bisects the bracket.
+
+    :raises UnreachableThroughputError: if no fleet size reaches the target
+    """
+    if not 0 < peak_throughput_target:
+        return 0
+    if not _is_reachable(passenger_capacity, roundtrip_minutes, load_factor, peak_throughput_target):
+        raise UnreachableThroughputError(
+            f'No fleet size reaches a peak throughput of {peak_throughput_target} with passenger_capacity={passenger_capacity}, '
+            f'roundtrip_minutes={roundtrip_minutes} and load_factor={load_factor}')
+
+    def reaches(fleet_size):
+        return throughput(passenger_capacity, roundtrip_minutes, fleet_size, load_factor) >= peak_throughput_target
+
+    # invariant: lo does not reach the target (0 never does), hi does
+    estimate = int(min(max(1, _estimate_fleet_size(passenger_capacity, roundtrip_minutes, load_factor, peak_throughput_target)), _MAX_FLEET_SIZE))
+    step = 1
+    if reaches(estimate):
+        hi = estimate
+        lo = hi - step
+        while lo >= 1 and reaches(lo):
+            hi = lo
+            step *= 2
+            lo = hi - step
+        lo = max(lo, 0)
+    else:
+        lo = estimate
+        hi = lo + step
+        while not reaches(hi):
+            if hi >= _MAX_FLEET_SIZE:
+                raise UnreachableThroughputError(f'No fleet size up to {_MAX_FLEET_SIZE} reaches a peak throughput of {peak_throughput_target}')
+            lo = hi
+            step *= 2
+            hi = min(lo + step, _MAX_FLEET_SIZE)
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if reaches(mid):
+            hi = mid
+        else:
+            lo = mid
+
+    return hi
+
+
+def _throughputs(capacity_load, roundtrip_minutes, fleet_sizes):
+    pass_per_stop = np.floor(capacity_load * fleet_sizes)
+    cycles = 60 / (roundtrip_minutes / fleet_sizes)
+    return np.floor(pass_per_stop * cycles)
+
+
+def minimum_fleet_sizes(passenger_capacity, roundtrip_minutes, peak_throughput_target, load_factor=0.75) -> np.ndarray:
+    """
+    Batched :func:`minimum_fleet_size` over broadcastable arrays.
+
+    Entries whose target cannot be reached are set to :data:`UNREACHABLE` rather than raising.
+    """
+    passenger_capacity, roundtrip_minutes, target, load_factor = np.broadcast_arrays(
+        np.asarray(passenger_capacity), np.asarray(roundtrip_minutes, dtype=np.float64),
+        np.asarray(peak_throughput_target, dtype=np.float64), np.asarray(load_factor, dtype=np.float64))
+
+    capacity_load = passenger_capacity * load_factor
+    with np.errstate(invalid='ignore', divide='ignore'):
+        needed = target > 0
+        reachable = (capacity_load > 0) & (roundtrip_minutes > 0) & np.isfinite(roundtrip_minutes) & np.isfinite(target)
+        active = needed & reachable
+
+        sizes = np.zeros(target.shape, dtype=np.int64)
+        sizes[needed & ~reachable] = UNREACHABLE
+
+        capacity_load = capacity_load[active]
+        roundtrip_minutes = roundtrip_minutes[active]
+        target = target[active]
+
+        # bracket the answer: lo never reaches the target, hi always does
+        lo = np.zeros(target.shape)
+        hi = np.clip(_estimate_fleet_size(capacity_load, roundtrip_minutes, 1.0, target), 1, _MAX_FLEET_SIZE)
+        exhausted = np.zeros(target.shape, dtype=bool)
+        short = _throughputs(capacity_load, roundtrip_minutes, hi) < target
+        while short.any():
+            exhausted |= short & (hi == _MAX_FLEET_SIZE)
+            short &= ~exhausted
+            lo[short] = hi[short]
+            hi[short] = np.minimum(hi[short] * 2, _MAX_FLEET_SIZE)
+            short &= _throughputs(capacity_load, roundtrip_minutes, hi) < target
+        lo[exhausted] = hi[exhausted] - 1
+
+        wide = hi - lo > 1
+        while wide.any():
+            mid = np.floor((lo + hi) / 2)
+            reaches = _throughputs(capacity_load, roundtrip_minutes, mid) >= target
+            hi = np.where(wide & reaches, mid, hi)
+            lo = np.where(wide & ~reaches, mid, lo)
+            wide = hi - lo > 1
+
+    sizes[active] = np.where(exhausted, UNREACHABLE, hi).astype(np.int64)
+    return sizes
+
+
+def route_roundtrip_minutes(length_km, stops, operated_speed_km_hour, dwell_time_seconds) -> np.ndarray:
+    """
+    Batched :meth:`Fleet.calculate_route_roundtrip_minutes` over broadcastable arrays.
+    """
+    return round_like_python((60*np.asarray(length_km)/operated_speed_km_hour) + (round_like_python(np.asarray(dwell_time_seconds)/60, 2) * stops), 3)
+
+
+def fleet_metrics(passenger_capacity, roundtrip_minutes, fleet_size, availability, load_factor) -> dict:
+    """
+    Fleet size dependent :class:`Fleet` attributes over broadcastable arrays, bit-identical to the scalar ones.
+
+    Fleet sizes are taken as floats, so a NaN size gives NaN metrics rather than raising.
+
+    :return: ``average_wait_time_minutes``, ``peak_hourly_passenger_throughput``, ``maximum_passenger_volume`` and
+        ``frequency_peak`` arrays
+    """
+    n = np.asarray(fleet_size, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_wait_time_minutes = round_like_python(roundtrip_minutes / n, 3)
+        pass_per_stop = np.floor(passenger_capacity * load_factor * n)
+        peak_hourly_passenger_throughput = np.floor(pass_per_stop * (60 / (roundtrip_minutes / n)))
+        maximum_passenger_volume = peak_hourly_passenger_throughput * 24 * availability
+        frequency_peak = round_like_python(peak_hourly_passenger_throughput / (load_factor * passenger_capacity * 1), 4)
+    return {
+        'average_wait_time_minutes': average_wait_time_minutes,
+        'peak_hourly_passenger_throughput': peak_hourly_passenger_throughput,
+        'maximum_passenger_volume': maximum_passenger_volume,
+        'frequency_peak': frequency_peak,
+    }
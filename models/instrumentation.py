@@ -0,0 +1,255 @@
+"""
+Opt-in instrumentation of the model hot paths.
+
+While enabled, every model stage (subsystem construction, ``Ev._calculate_*``, ``Fleet.calculate_*``, fleet sizing,
+``MultiAttributeUtility`` interpolation, ``to_dict`` ...) is wrapped to record its call count, inclusive and exclusive
+wall time and the net number of memory blocks it allocated. The wrappers are only installed while instrumentation is
+enabled and the original functions are put back afterwards, so disabled instrumentation costs nothing.
+
+Enable it for a block of code::
+
+    with instrumented() as profiler:
+        run_sweep(...)
+    profiler.write_json('profile.json')
+    profiler.write_collapsed('profile.folded')   # flamegraph.pl / speedscope input
+
+or for a whole process by setting ``MODELS_INSTRUMENT=1`` before ``models`` is imported; ``MODELS_INSTRUMENT_REPORT``
+and ``MODELS_INSTRUMENT_STACKS`` then name the JSON report and collapsed stack file written at exit (``{pid}`` is
+replaced by the process id, so that pool workers do not overwrite each other).
+
+Stage timings are kept per process and assume a single thread.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from models import fleet as fleet_module
+from models.catalog import CatalogComponent
+from models.ev import Ev
+from models.ev_batch import EvBatch
+from models.fleet import Fleet, FleetSizeScan
+from models.multi_attribute_utility import MultiAttributeUtility
+
+
+ENVIRONMENT_VARIABLE = 'MODELS_INSTRUMENT'
+REPORT_ENVIRONMENT_VARIABLE = 'MODELS_INSTRUMENT_REPORT'
+STACKS_ENVIRONMENT_VARIABLE = 'MODELS_INSTRUMENT_STACKS'
+
+
+def default_stages() -> list:
+    """
+    ``(owner, attribute, label)`` of every instrumented stage, where ``owner`` is a class or module.
+    """
+    stages = [(CatalogComponent, '__new__', 'CatalogComponent.__new__'), (Ev, '__init__', 'Ev.__init__')]
+    stages += [(Ev, name, f'Ev.{name}') for name in vars(Ev) if name.startswith('_calculate_')]
+    stages += [(Fleet, name, f'Fleet.{name}') for name in vars(Fleet)
+               if name.startswith('calculate_') or name in ('__init__', '_calculate_fleet_size_dependents', 'optimize_ideal_fleet_size', 'with_fleet_size', 'with_route', 'to_dict')]
+    stages += [(MultiAttributeUtility, name, f'MultiAttributeUtility.{name}') for name in vars(MultiAttributeUtility)
+               if name.startswith('utility_') or name in ('__init__', 'interpolate', '_calculate_weighted_sum_mau')]
+    stages += [
+        (fleet_module, 'minimum_fleet_size', 'fleet_sizing.minimum_fleet_size'),
+        (fleet_module, 'score_batch', 'multi_attribute_utility.score_batch'),
+        (FleetSizeScan, 'curves', 'FleetSizeScan.curves'),
+        (EvBatch, '__init__', 'EvBatch.__init__'),
+    ]
+    return stages
+
+
+class StageStats:
+    """
+    Counters of one instrumented stage. Times are in seconds; ``allocated_blocks`` is the net change of
+    ``sys.getallocatedblocks()`` over the calls, children included.
+    """
+
+    __slots__ = ('calls', 'total_seconds', 'self_seconds', 'allocated_blocks')
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.self_seconds = 0.0
+        self.allocated_blocks = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler:
+    """
+    :class:`Profiler` accumulates :class:`StageStats` per stage label and the exclusive time of every stage call stack.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict = {}
+        self.stacks: dict = {}
+        self._frames = []
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.stacks.clear()
+
+    def wrap(self, label: str, func):
+        """
+        Returns ``func`` wrapped to record its calls under ``label``.
+        """
+        stats = self.stages.setdefault(label, StageStats())
+        frames = self._frames
+        stacks = self.stacks
+        clock = time.perf_counter
+        blocks = sys.getallocatedblocks
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # frame: [stack key, children seconds]
+            key = f'{frames[-1][0]};{label}' if frames else label
+            frame = [key, 0.0]
+            frames.append(frame)
+            blocks_before = blocks()
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                frames.pop()
+                stats.calls += 1
+                stats.total_seconds += elapsed
+                stats.self_seconds += elapsed - frame[1]
+                stats.allocated_blocks += blocks() - blocks_before
+                stacks[key] = stacks.get(key, 0.0) + elapsed - frame[1]
+                if frames:
+                    frames[-1][1] += elapsed
+
+        return wrapper
+
+    def report(self) -> dict:
+        """
+        JSON-serializable report: per stage counters, sorted by exclusive time.
+        """
+        ordered = sorted(self.stages.items(), key=lambda item: item[1].self_seconds, reverse=True)
+        return {
+            'pid': os.getpid(),
+            'stages': {label: stats.to_dict() for label, stats in ordered if stats.calls},
+        }
+
+    def collapsed_stacks(self) -> list:
+        """
+        Stacks in the collapsed ``frame;frame;frame microseconds`` format read by flamegraph.pl, speedscope and inferno.
+        """
+        return [f'{stack} {round(seconds * 1e6)}' for stack, seconds in sorted(self.stacks.items())]
+
+    def write_json(self, path) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_collapsed(self, path) -> None:
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.collapsed_stacks()) + '\n')
+
+    def __str__(self) -> str:
+        s = f'{"stage":<56}{"calls":>10}{"total ms":>12}{"self ms":>12}{"blocks":>10}\n'
+        for label, stats in self.report()['stages'].items():
+            s += f'{label:<56}{stats["calls"]:>10}{1e3*stats["total_seconds"]:>12.3f}{1e3*stats["self_seconds"]:>12.3f}{stats["allocated_blocks"]:>10}\n'
+        return s
+
+
+_ACTIVE: Profiler = None
+_ORIGINALS = []
+
+
+def _wrap_descriptor(profiler, raw, label):
+    if isinstance(raw, staticmethod):
+        return staticmethod(profiler.wrap(label, raw.__func__))
+    if isinstance(raw, classmethod):
+        return classmethod(profiler.wrap(label, raw.__func__))
+    return profiler.wrap(label, raw)
+
+
+def enable(profiler: Profiler = None, stages: list = None) -> Profiler:
+    """
+    Installs the instrumentation wrappers, recording into ``profiler`` (a new one by default), and returns the active
+    :class:`Profiler`. Enabling while already enabled returns the active profiler unchanged.
+
+    :raises ValueError: if an owner of ``stages`` does not define the named function, in which case nothing is wrapped
+    """
+    global _ACTIVE
+    if _ACTIVE is not None:
+        return _ACTIVE
+
+    profiler = Profiler() if profiler is None else profiler
+    # every stage is resolved before any is wrapped, and a failed install is rolled back, so enable either wraps every
+    # stage or none
+    resolved = []
+    for owner, name, label in default_stages() if stages is None else stages:
+        if name not in vars(owner):
+            raise ValueError(f'{owner.__name__} defines no {name} to instrument')
+        resolved.append((owner, name, label, vars(owner)[name]))
+
+    try:
+        for owner, name, label, raw in resolved:
+            wrapped = _wrap_descriptor(profiler, raw, label)
+            _ORIGINALS.append((owner, name, raw))
+            setattr(owner, name, wrapped)
+    except BaseException:
+        disable()
+        raise
+
+    _ACTIVE = profiler
+    return profiler
+
+
+def disable() -> Profiler:
+    """
+    Restores the original functions and returns the profiler that was active, if any.
+    """
+    global _ACTIVE
+    while _ORIGINALS:
+        owner, name, raw = _ORIGINALS.pop()
+        setattr(owner, name, raw)
+
+    profiler, _ACTIVE = _ACTIVE, None
+    return profiler
+
+
+def active_profiler() -> Profiler:
+    return _ACTIVE
+
+
+@contextmanager
+def instrumented(profiler: Profiler = None, stages: list = None):
+    """
+    Context manager enabling instrumentation for its block and yielding the :class:`Profiler`. Instrumentation that was
+    already enabled (e.g. through the environment) is left enabled on exit.
+    """
+    already_enabled = _ACTIVE is not None
+    profiler = enable(profiler, stages)
+    try:
+        yield profiler
+    finally:
+        if not already_enabled:
+            disable()
+
+
+def _write_at_exit(profiler: Profiler, report_path: str, stacks_path: str) -> None:
+    if report_path:
+        profiler.write_json(report_path.replace('{pid}', str(os.getpid())))
+    if stacks_path:
+        profiler.write_collapsed(stacks_path.replace('{pid}', str(os.getpid())))
+
+
+def enable_from_environment() -> Profiler:
+    """
+    Enables instrumentation if ``MODELS_INSTRUMENT`` is set to a non-empty value other than ``0``, registering the
+    report files named by the environment to be written at exit.
+    """
+    if os.environ.get(ENVIRONMENT_VARIABLE, '') in ('', '0'):
+        return None
+
+    profiler = enable()
+    report_path = os.environ.get(REPORT_ENVIRONMENT_VARIABLE)
+    stacks_path = os.environ.get(STACKS_ENVIRONMENT_VARIABLE)
+    if report_path or stacks_path:
+        atexit.register(_write_at_exit, profiler, report_path, stacks_path)
+    return profiler
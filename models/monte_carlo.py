@@ -0,0 +1,279 @@
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models.ev_batch import ATTRIBUTE_NAMES, SUBSYSTEM_CATALOGS, EvBatch
+from models.fleet import DWELL_TIME_SECONDS, FLEET_BUFFER_VEHICLES, LOAD_FACTOR_EXPECTED_AVG
+from models.fleet_sizing import UNREACHABLE, fleet_metrics, minimum_fleet_sizes, route_roundtrip_minutes
+from models.multi_attribute_utility import DEFAULT_WEIGHTS, score_batch
+from models.route import Route
+
+
+class Distribution(ABC):
+    """
+    Base of the distributions an uncertain input is sampled from.
+    """
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        ``size`` independent samples drawn with ``rng``.
+        """
+
+
+class Constant(Distribution):
+
+    def __init__(self, value: float) -> None:
+        self.value: float = value
+
+    def sample(self, rng, size) -> np.ndarray:
+        return np.full(size, self.value, dtype=np.float64)
+
+
+class Normal(Distribution):
+
+    def __init__(self, mean: float, std: float) -> None:
+        if std < 0:
+            raise ValueError(f'std must not be negative, not {std}')
+        self.mean: float = mean
+        self.std: float = std
+
+    def sample(self, rng, size) -> np.ndarray:
+        return rng.normal(self.mean, self.std, size)
+
+
+class Uniform(Distribution):
+
+    def __init__(self, low: float, high: float) -> None:
+        if high < low:
+            raise ValueError(f'high must not be below low, got [{low}, {high}]')
+        self.low: float = low
+        self.high: float = high
+
+    def sample(self, rng, size) -> np.ndarray:
+        return rng.uniform(self.low, self.high, size)
+
+
+class Triangular(Distribution):
+
+    def __init__(self, low: float, mode: float, high: float) -> None:
+        if not low <= mode <= high:
+            raise ValueError(f'Expected low <= mode <= high, got {low}, {mode}, {high}')
+        self.low: float = low
+        self.mode: float = mode
+        self.high: float = high
+
+    def sample(self, rng, size) -> np.ndarray:
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+class LogNormal(Distribution):
+    """
+    Log-normal distribution with median ``median`` and log-space standard deviation ``sigma``, convenient for strictly
+    positive multiplicative factors.
+    """
+
+    def __init__(self, median: float, sigma: float) -> None:
+        if median <= 0 or sigma < 0:
+            raise ValueError(f'median must be positive and sigma non-negative, got {median}, {sigma}')
+        self.median: float = median
+        self.sigma: float = sigma
+
+    def sample(self, rng, size) -> np.ndarray:
+        return rng.lognormal(np.log(self.median), self.sigma, size)
+
+
+# Fleet constants that can be sampled, sampled as absolute values
+FLEET_CONSTANTS = ('LOAD_FACTOR_EXPECTED_AVG', 'DWELL_TIME_SECONDS')
+
+# Route parameters that can be sampled, sampled as absolute values
+ROUTE_INPUTS = ('length_km', 'stops')
+
+# MAU weights that can be sampled, sampled as absolute values, in :data:`DEFAULT_WEIGHTS` order
+MAU_WEIGHTS = ('WEIGHT_PASSENGER_VOLUME', 'WEIGHT_PEAK_PASSENGER_THROUGHPUT', 'WEIGHT_AVERAGE_WAIT_TIME', 'WEIGHT_AVAILABILITY')
+
+# Everything an uncertainty can be put on: subsystem attributes (sampled as multiplicative factors on the catalog
+# value), fleet constants, route parameters and MAU weights
+UNCERTAIN_INPUTS = ATTRIBUTE_NAMES + FLEET_CONSTANTS + ROUTE_INPUTS + MAU_WEIGHTS
+
+
+class MonteCarloResult:
+    """
+    :class:`MonteCarloResult` holds the sampled outputs of :func:`run_monte_carlo`, one array entry per sample.
+
+    Samples whose perturbed components violate the battery weight constraint, or whose throughput target cannot be
+    reached, are flagged in ``valid`` and left out of the statistics.
+    """
+
+    OUTPUTS = ('score', 'fleet_cost_1k_usd', 'fleet_size', 'peak_hourly_passenger_throughput', 'average_wait_time_minutes', 'maximum_passenger_volume', 'availability')
+
+    def __init__(self, samples: dict, valid: np.ndarray, peak_throughput_target: float = None) -> None:
+        self.samples: dict = samples
+        self.valid: np.ndarray = valid
+        self.peak_throughput_target: float = peak_throughput_target
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def valid_fraction(self) -> float:
+        return float(self.valid.mean()) if len(self.valid) else 0.0
+
+    def values(self, output: str) -> np.ndarray:
+        """
+        Samples of ``output`` over the valid samples.
+        """
+        if output not in self.samples:
+            raise ValueError(f'Unknown output {output}, expected one of {tuple(self.samples)}')
+        return self.samples[output][self.valid]
+
+    def quantiles(self, output: str, q=(0.05, 0.25, 0.5, 0.75, 0.95)) -> np.ndarray:
+        values = self.values(output)
+        return np.quantile(values, q) if len(values) else np.full(np.shape(q), np.nan)
+
+    def mean(self, output: str) -> float:
+        values = self.values(output)
+        return float(values.mean()) if len(values) else float('nan')
+
+    @property
+    def probability_meeting_target(self) -> float:
+        """
+        Share of all samples, invalid ones counting as failures, whose peak throughput reaches ``peak_throughput_target``.
+        """
+        if self.peak_throughput_target is None:
+            raise ValueError("No peak_throughput_target was given")
+        met = self.valid & (self.samples['peak_hourly_passenger_throughput'] >= self.peak_throughput_target)
+        return float(met.mean()) if len(met) else 0.0
+
+    def summary(self, q=(0.05, 0.5, 0.95)) -> dict:
+        """
+        ``{output: {'mean': m, q: value, ...}}`` for the score and cost, plus the target probability when a target was given.
+        """
+        summary = {}
+        for output in ('score', 'fleet_cost_1k_usd'):
+            summary[output] = {'mean': self.mean(output), **dict(zip(q, self.quantiles(output, q).tolist()))}
+        summary['valid_fraction'] = self.valid_fraction
+        if self.peak_throughput_target is not None:
+            summary['probability_meeting_target'] = self.probability_meeting_target
+        return summary
+
+    def __str__(self) -> str:
+        s = f'Monte Carlo: {len(self)} samples, {100*self.valid_fraction:.1f}% valid\n'
+        for output in ('score', 'fleet_cost_1k_usd'):
+            q05, q50, q95 = self.quantiles(output, (0.05, 0.5, 0.95))
+            s += f'\t{output}: mean={self.mean(output):.4f} p5={q05:.4f} p50={q50:.4f} p95={q95:.4f}\n'
+        if self.peak_throughput_target is not None:
+            s += f'\tP(throughput >= {self.peak_throughput_target}) = {self.probability_meeting_target:.4f}\n'
+        return s
+
+
+def evaluate_samples(route: Route, choices: tuple, inputs: dict, size: int, fleet_size: int = None, peak_throughput_target: float = None, violate_constraints=False) -> tuple:
+    """
+    Evaluates one :class:`Ev` configuration for ``size`` samples of ``inputs``, arrays keyed by :data:`UNCERTAIN_INPUTS`
+    names. Inputs left out keep their nominal value.
+
+    Follows :class:`Ev`, :class:`Fleet` and :class:`MultiAttributeUtility` formula by formula, so unperturbed inputs give
+    exactly the scalar results. Fleets are ``fleet_size`` vehicles, or sized per sample to ``peak_throughput_target``.
+
+    :return: ``(samples, valid)`` as in :class:`MonteCarloResult`
+    """
+    indices = [np.full(size, choice.value - 1, dtype=np.int64) for choice in choices]
+
+    attributes = {}
+    for (subsystem_str, catalog), index in zip(SUBSYSTEM_CATALOGS.items(), indices):
+        for field in catalog.fields:
+            name = f'{subsystem_str}_{field}'
+            if name in inputs:
+                attributes[name] = catalog[field][index[0]] * inputs[name]
+    evs = EvBatch(*indices, violate_constraints=violate_constraints, attributes=attributes)
+
+    load_factor = inputs.get('LOAD_FACTOR_EXPECTED_AVG', np.full(size, LOAD_FACTOR_EXPECTED_AVG))
+    dwell_time_seconds = inputs.get('DWELL_TIME_SECONDS', np.full(size, DWELL_TIME_SECONDS))
+    length_km = inputs.get('length_km', route.length_km)
+    stops = inputs.get('stops', route.stops)
+    roundtrip = route_roundtrip_minutes(length_km, stops, evs.operated_speed_km_hour, dwell_time_seconds)
+
+    valid = evs.valid.copy()
+    if fleet_size is None:
+        n = minimum_fleet_sizes(evs.passenger_capacity, roundtrip, peak_throughput_target, load_factor)
+        valid &= n != UNREACHABLE
+        n = np.where(n == UNREACHABLE, 1, n + FLEET_BUFFER_VEHICLES)
+    else:
+        n = np.full(size, fleet_size, dtype=np.int64)
+    n = np.maximum(n, 1)
+
+    nf = n.astype(np.float64)
+    metrics = fleet_metrics(evs.passenger_capacity, roundtrip, nf, evs.availability, load_factor)
+    average_wait_time_minutes = metrics['average_wait_time_minutes']
+    peak_hourly_passenger_throughput = metrics['peak_hourly_passenger_throughput']
+    maximum_passenger_volume = metrics['maximum_passenger_volume']
+
+    # out of range samples (e.g. a negative capacity drawn from a wide normal) cannot be scored
+    valid &= np.isfinite(peak_hourly_passenger_throughput) & (peak_hourly_passenger_throughput >= 0) & \
+        np.isfinite(average_wait_time_minutes) & (average_wait_time_minutes >= 0) & (evs.availability >= 0) & (maximum_passenger_volume >= 0)
+
+    weights = tuple(np.broadcast_to(inputs[name], size)[valid] if name in inputs else weight for name, weight in zip(MAU_WEIGHTS, DEFAULT_WEIGHTS))
+    score = np.full(size, np.nan)
+    score[valid] = score_batch(maximum_passenger_volume[valid], peak_hourly_passenger_throughput[valid], average_wait_time_minutes[valid], evs.availability[valid], weights=weights)
+
+    samples = {
+        'score': score,
+        'fleet_cost_1k_usd': evs.total_vehicle_cost_1k_usd * nf,
+        'fleet_size': n,
+        'peak_hourly_passenger_throughput': peak_hourly_passenger_throughput,
+        'average_wait_time_minutes': average_wait_time_minutes,
+        'maximum_passenger_volume': maximum_passenger_volume,
+        'availability': np.array(evs.availability),
+    }
+    return samples, valid
+
+
+def _run_chunk(route, choices, distributions, size, seed_sequence, fleet_size, peak_throughput_target, violate_constraints):
+    rng = np.random.default_rng(seed_sequence)
+    # sampled in a fixed order so a seed always maps to the same draws
+    inputs = {name: distributions[name].sample(rng, size) for name in UNCERTAIN_INPUTS if name in distributions}
+    return evaluate_samples(route, choices, inputs, size, fleet_size, peak_throughput_target, violate_constraints)
+
+
+def run_monte_carlo(route: Route, choices: tuple, distributions: dict, samples: int = 100_000, fleet_size: int = None, peak_throughput_target: float = None,
+                    seed=None, workers: int = 1, chunk_size: int = 100_000, violate_constraints=False) -> MonteCarloResult:
+    """
+    Propagates input uncertainty through one :class:`Ev` configuration on ``route``.
+
+    :param choices: ``(autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter)`` choices
+    :param distributions: ``{name: Distribution}`` with names from :data:`UNCERTAIN_INPUTS`. Subsystem attributes such as
+        ``battery_pack_capacity_kWh`` are sampled as multiplicative factors on the catalog value (``Normal(1, 0.05)`` is a 5%
+        spread), fleet constants such as ``LOAD_FACTOR_EXPECTED_AVG``, route parameters and MAU weights as absolute values.
+    :param fleet_size: evaluate fleets of this size; without it fleets are sized per sample to ``peak_throughput_target``
+    :param peak_throughput_target: target throughput, also used for :attr:`MonteCarloResult.probability_meeting_target`
+    :param seed: anything :class:`numpy.random.SeedSequence` accepts. Every ``chunk_size`` chunk draws from its own spawned
+        child sequence, so results depend on the seed and chunk size but not on ``workers``.
+    :param workers: processes sampling and evaluating chunks in parallel, ``None`` for all cores
+    """
+    unknown = [name for name in distributions if name not in UNCERTAIN_INPUTS]
+    if unknown:
+        raise ValueError(f'Cannot sample {unknown}, expected some of {UNCERTAIN_INPUTS}')
+    if fleet_size is None and peak_throughput_target is None:
+        raise ValueError("Please specify fleet_size, peak_throughput_target, or both")
+    if samples < 1 or chunk_size < 1:
+        raise ValueError(f'samples and chunk_size must be at least 1, not {samples} and {chunk_size}')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f'workers must be at least 1, not {workers}')
+
+    sizes = [min(chunk_size, samples - start) for start in range(0, samples, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [(route, tuple(choices), distributions, size, seed_sequence, fleet_size, peak_throughput_target, violate_constraints)
+                 for size, seed_sequence in zip(sizes, seed_sequences)]
+
+    if workers == 1 or len(arguments) == 1:
+        chunks = [_run_chunk(*a) for a in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(arguments))) as executor:
+            chunks = list(executor.map(_run_chunk, *zip(*arguments)))
+
+    merged = {name: np.concatenate([chunk[0][name] for chunk in chunks]) for name in chunks[0][0]}
+    valid = np.concatenate([chunk[1] for chunk in chunks])
+    return MonteCarloResult(merged, valid, peak_throughput_target)
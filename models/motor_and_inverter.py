@@ -1,5 +1,7 @@
 from enum import Enum, auto
 
+from models.catalog import CatalogComponent, ComponentCatalog
+
 
 class MotorAndInverterChoice(Enum):
     """
@@ -25,53 +27,31 @@ class MotorAndInverterChoice(Enum):
     M4 = auto()
 
 
-class MotorAndInverter:
-    """
-    :class:`MotorAndInverter` represents an instance of a motor and inverter. To be used in the construction of :class:`Ev`
-    """
-
-    def __init__(self, motor_and_inverter: MotorAndInverterChoice) -> None:
-
-        if type(motor_and_inverter) is not MotorAndInverterChoice:
-            raise ValueError(f'motor_and_inverter argument must be of type MotorAndInverterChoice rather than supplied {type(motor_and_inverter)}')
-
-        self._key_weight_kg = "weight_kg"
-        self._key_power_kW = "power_kW"
-        self._key_cost_1k_usd = "cost_1k_usd"
+MOTOR_AND_INVERTER_CATALOG = ComponentCatalog(
+    MotorAndInverterChoice,
+    fields=('weight_kg', 'power_kW', 'cost_1k_usd'),
+    rows={
+        MotorAndInverterChoice.M1: (82, 150, 1.2),
+        MotorAndInverterChoice.M2: (60, 150, 1.4),
+        MotorAndInverterChoice.M3: (140, 210, 1.65),
+        MotorAndInverterChoice.M4: (100, 450, 3.6)
+    }
+)
 
-        attribute_dict = self._get_attribute_mapping(motor_and_inverter)
 
-        self.choice: MotorAndInverterChoice = motor_and_inverter
-        self.weight_kg: float = attribute_dict.get(self._key_weight_kg, -1)
-        self.power_kW: float = attribute_dict.get(self._key_power_kW, -1)
-        self.cost_1k_usd: float = attribute_dict.get(self._key_cost_1k_usd, -1)
+class MotorAndInverter(CatalogComponent):
+    """
+    :class:`MotorAndInverter` represents an instance of a motor and inverter. To be used in the construction of :class:`Ev`
 
-    def _get_attribute_mapping(self, motor_and_inverter: MotorAndInverterChoice) -> dict:
+    Instances are shared per choice and read-only; their attributes come from :data:`MOTOR_AND_INVERTER_CATALOG`.
+    """
 
-        attribute_map = {
-            MotorAndInverterChoice.M1: {
-                self._key_weight_kg: 82,
-                self._key_power_kW: 150,
-                self._key_cost_1k_usd: 1.2
-            },
-            MotorAndInverterChoice.M2: {
-                self._key_weight_kg: 60,
-                self._key_power_kW: 150,
-                self._key_cost_1k_usd: 1.4
-            },
-            MotorAndInverterChoice.M3: {
-                self._key_weight_kg: 140,
-                self._key_power_kW: 210,
-                self._key_cost_1k_usd: 1.65
-            },
-            MotorAndInverterChoice.M4: {
-                self._key_weight_kg: 100,
-                self._key_power_kW: 450,
-                self._key_cost_1k_usd: 3.6
-            }
-        }
+    __slots__ = ('weight_kg', 'power_kW', 'cost_1k_usd')
 
-        return attribute_map.get(motor_and_inverter, None)
+    CATALOG = MOTOR_AND_INVERTER_CATALOG
+    ARGUMENT_NAME = 'motor_and_inverter'
 
-    def __str__(self) -> str:
-        return self.choice.name
+    choice: MotorAndInverterChoice
+    weight_kg: float
+    power_kW: float
+    cost_1k_usd: float
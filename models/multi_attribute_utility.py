@@ -1,3 +1,118 @@
+from bisect import bisect_left
+
+import numpy as np
+
+from models._vectorized import round_like_python
+
+
+class UtilityCurve:
+    """
+    :class:`UtilityCurve` is a compiled piecewise-linear utility map: breakpoints are stored once as sorted arrays and
+    looked up by binary search. Values outside the breakpoints clamp to the first/last utility, and interpolated values
+    are rounded to 4 decimals exactly like :meth:`MultiAttributeUtility.interpolate`.
+    """
+
+    __slots__ = ('_keys', '_values', '_key_array', '_value_array')
+
+    def __init__(self, util_map: dict) -> None:
+
+        if not util_map:
+            raise ValueError("util_map must contain at least one breakpoint")
+
+        keys = list(util_map)
+        if any(a >= b for a, b in zip(keys, keys[1:])):
+            raise ValueError(f"util_map breakpoints must be strictly increasing, not {keys}")
+
+        self._keys: tuple = tuple(keys)
+        self._values: tuple = tuple(util_map.values())
+        self._key_array = np.array(self._keys, dtype=np.float64)
+        self._value_array = np.array(self._values, dtype=np.float64)
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._keys, self._values))
+
+    def segment(self, x: float) -> tuple:
+        """
+        The ``((x1, y1), (x2, y2))`` breakpoints surrounding ``x``. Both are the same breakpoint when ``x`` is on or beyond one.
+        """
+        i = bisect_left(self._keys, x)
+        if i < len(self._keys) and self._keys[i] == x or i == 0:
+            p = (self._keys[i], self._values[i])
+            return p, p
+        if i == len(self._keys):
+            p = (self._keys[-1], self._values[-1])
+            return p, p
+        return (self._keys[i - 1], self._values[i - 1]), (self._keys[i], self._values[i])
+
+    def __call__(self, x: float) -> float:
+        p1, p2 = self.segment(x)
+        if p1 == p2:
+            return p1[1]
+
+        x1, y1 = p1
+        x2, y2 = p2
+        return round(y1 + (x - x1) * (y2 - y1)/(x2 - x1), 4)
+
+    def evaluate(self, x) -> np.ndarray:
+        """
+        Vectorized :meth:`__call__` over an array of values.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        keys, values = self._key_array, self._value_array
+
+        i = np.searchsorted(keys, x, side='left')
+        inner = np.clip(i, 1, len(keys) - 1) if len(keys) > 1 else np.zeros(i.shape, dtype=np.intp)
+        x1, y1 = keys[inner - 1], values[inner - 1]
+        x2, y2 = keys[inner], values[inner]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            interpolated = round_like_python(y1 + (x - x1) * (y2 - y1)/(x2 - x1), 4)
+
+        exact = keys[np.minimum(i, len(keys) - 1)] == x
+        utility = np.where(exact, values[np.minimum(i, len(keys) - 1)], interpolated)
+        utility = np.where(i == 0, values[0], utility)
+        utility = np.where(i == len(keys), values[-1], utility)
+        # NaN never compares, so the scalar lookup falls back to the first breakpoint
+        return np.where(np.isnan(x), values[0], utility)
+
+
+WEIGHT_PASSENGER_VOLUME = 0.15
+WEIGHT_PEAK_PASSENGER_THROUGHPUT = 0.25
+WEIGHT_AVERAGE_WAIT_TIME = 0.35
+WEIGHT_AVAILABILITY = 0.25
+
+PASSENGER_VOLUME_UTILITY = UtilityCurve({
+    0: 0.0,
+    500: 0.2,
+    1000: 0.4,
+    1500: 0.8,
+    2000: 1.0
+})
+
+AVERAGE_WAIT_TIME_UTILITY = UtilityCurve({
+    0: 1.0,
+    5: 0.95,
+    10: 0.75,
+    15: 0.40,
+    20: 0.20,
+    30: 0.0
+})
+
+PEAK_PASSENGER_THROUGHPUT_UTILITY = UtilityCurve({
+    0:   0,
+    50: 0.2,
+    100: 0.5,
+    150: 0.9,
+    200: 1.0
+})
+
+AVAILABILITY_UTILITY = UtilityCurve({
+    0.0: 0.0,
+    0.2: 0.2,
+    0.4: 0.4,
+    0.6: 0.6,
+    0.8: 0.8,
+    1.0: 1.0
+})
 
 
 class MultiAttributeUtility:
@@ -7,10 +122,10 @@ class MultiAttributeUtility:
 
     def __init__(self, daily_passenger_volume, peak_passenger_throuput, average_wait_time_minutes, availability, name='', explain=False) -> None:
 
-        self.WEIGHT_PASSENGER_VOLUME = 0.15
-        self.WEIGHT_PEAK_PASSENGER_THROUGHPUT = 0.25
-        self.WEIGHT_AVERAGE_WAIT_TIME = 0.35
-        self.WEIGHT_AVAILABILITY = 0.25
+        self.WEIGHT_PASSENGER_VOLUME = WEIGHT_PASSENGER_VOLUME
+        self.WEIGHT_PEAK_PASSENGER_THROUGHPUT = WEIGHT_PEAK_PASSENGER_THROUGHPUT
+        self.WEIGHT_AVERAGE_WAIT_TIME = WEIGHT_AVERAGE_WAIT_TIME
+        self.WEIGHT_AVAILABILITY = WEIGHT_AVAILABILITY
 
         if daily_passenger_volume < 0:
             raise ValueError(f"passenger_volume must be greater than 0, not {daily_passenger_volume}")
@@ -32,26 +147,14 @@ class MultiAttributeUtility:
         self.availability: float = availability
         self.score: float = self._calculate_weighted_sum_mau()
 
-    def interpolate(self, x: float, util_map: dict) -> float:
-        p1 = p2 = list(util_map.items())[0]
-        for k, v in util_map.items():
-            if k <= x:
-                p1 = (k, v)
-            if k >= x:
-                p2 = (k, v)
-                break
-        else:
-            p2 = p1
-
-        if p1 == p2:
-            return p1[1]
-
-        x1, y1 = p1
-        x2, y2 = p2
-        val = round(y1 + (x - x1) * (y2 - y1)/(x2 - x1), 4)
+    def interpolate(self, x: float, util_map) -> float:
+        curve = util_map if isinstance(util_map, UtilityCurve) else UtilityCurve(util_map)
+        val = curve(x)
 
         if self._explain:
-            print(f'INTERPOLATING {x} between {p1} and {p2} => ({x}. {val})')
+            p1, p2 = curve.segment(x)
+            if p1 != p2:
+                print(f'INTERPOLATING {x} between {p1} and {p2} => ({x}. {val})')
 
         return val
 
@@ -61,15 +164,7 @@ class MultiAttributeUtility:
         if passenger_volume < 0:
             raise ValueError("passenger_volume must be greater than 0.")
 
-        util_map = {
-            0: 0.0,
-            500: 0.2,
-            1000: 0.4,
-            1500: 0.8,
-            2000: 1.0
-        }
-
-        utility = self.interpolate(passenger_volume, util_map)
+        utility = self.interpolate(passenger_volume, PASSENGER_VOLUME_UTILITY)
 
         if self._explain:
             print(f'passenger_volume value of {passenger_volume} is {utility} utility')
@@ -82,16 +177,7 @@ class MultiAttributeUtility:
         if average_wait_time_minutes < 0:
             raise ValueError("average_wait_time_minutes must be greater than 0.")
 
-        util_map = {
-            0: 1.0,
-            5: 0.95,
-            10: 0.75,
-            15: 0.40,
-            20: 0.20,
-            30: 0.0
-        }
-
-        utility = self.interpolate(average_wait_time_minutes, util_map)
+        utility = self.interpolate(average_wait_time_minutes, AVERAGE_WAIT_TIME_UTILITY)
         if self._explain:
             print(f'average_wait_time_minutes value of {average_wait_time_minutes} is {utility} utility')
         return utility
@@ -102,15 +188,7 @@ class MultiAttributeUtility:
         if peak_passenger_throuput < 0:
             raise ValueError("peak_passenger_throuput must be greater than 0.")
 
-        util_map = {
-            0:   0,
-            50: 0.2,
-            100: 0.5,
-            150: 0.9,
-            200: 1.0
-        }
-
-        utility = self.interpolate(peak_passenger_throuput, util_map)
+        utility = self.interpolate(peak_passenger_throuput, PEAK_PASSENGER_THROUGHPUT_UTILITY)
         if self._explain:
             print(f'peak_passenger_throuput value of {peak_passenger_throuput} is {utility} utility')
         return utility
@@ -121,16 +199,7 @@ class MultiAttributeUtility:
         if availability < 0:
             raise ValueError("availability must be greater than 0.")
 
-        util_map = {
-            0.0: 0.0,
-            0.2: 0.2,
-            0.4: 0.4,
-            0.6: 0.6,
-            0.8: 0.8,
-            1.0: 1.0
-        }
-
-        utility = self.interpolate(availability, util_map)
+        utility = self.interpolate(availability, AVAILABILITY_UTILITY)
         if self._explain:
             print(f'availability value of {availability} is {availability} utility')
         return utility
@@ -163,3 +232,35 @@ class MultiAttributeUtility:
         s += f'{"MAU:                 ":<15}{self.score:>8}\n'
 
         return s
+
+
+DEFAULT_WEIGHTS = (WEIGHT_PASSENGER_VOLUME, WEIGHT_PEAK_PASSENGER_THROUGHPUT, WEIGHT_AVERAGE_WAIT_TIME, WEIGHT_AVAILABILITY)
+DEFAULT_CURVES = (PASSENGER_VOLUME_UTILITY, PEAK_PASSENGER_THROUGHPUT_UTILITY, AVERAGE_WAIT_TIME_UTILITY, AVAILABILITY_UTILITY)
+
+
+def score_batch(daily_passenger_volume, peak_passenger_throuput, average_wait_time_minutes, availability, weights: tuple = DEFAULT_WEIGHTS, curves: tuple = DEFAULT_CURVES) -> np.ndarray:
+    """
+    Vectorized :attr:`MultiAttributeUtility.score` over broadcastable arrays of the four attributes.
+
+    Bit-identical to the scalar path, including the rounding to 4 decimals and the clamping to [0, 1].
+
+    :param weights: ``(passenger volume, peak throughput, wait time, availability)`` weights
+    :param curves: :class:`UtilityCurve` s in the same order as ``weights``
+    """
+    if len(weights) != 4 or len(curves) != 4:
+        raise ValueError("weights and curves must each hold the 4 attributes: passenger volume, peak throughput, wait time, availability")
+
+    attributes = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (daily_passenger_volume, peak_passenger_throuput, average_wait_time_minutes, availability)))
+    names = ('daily_passenger_volume', 'peak_passenger_throuput', 'average_wait_time_minutes', 'availability')
+    for name, values in zip(names, attributes):
+        if np.any(values < 0):
+            raise ValueError(f"{name} must be greater than 0")
+
+    mau = 0
+    for weight, curve, values in zip(weights, curves, attributes):
+        mau = mau + weight * curve.evaluate(values)
+    mau = round_like_python(mau, 4)
+
+    # same comparisons as max(0.0, min(1.0, mau))
+    mau = np.where(mau < 1.0, mau, 1.0)
+    return np.where(mau > 0.0, mau, 0.0)
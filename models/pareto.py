@@ -0,0 +1,230 @@
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS
+from models.feasibility import feasible_choices
+from models.fleet import Fleet, FleetSizeScan
+from models.route import Route
+
+
+# Objectives that can be traded off, and whether they are minimized or maximized
+OBJECTIVE_SENSES = {
+    'fleet_cost_1k_usd': 'min',
+    'score': 'max',
+    'average_wait_time_minutes': 'min',
+    'availability': 'max',
+}
+
+DEFAULT_OBJECTIVES = ('fleet_cost_1k_usd', 'score')
+
+
+def _nondominated_mask_2d(points: np.ndarray) -> np.ndarray:
+    # lexicographic sort, then a point is dominated iff an earlier, different point has a second objective <= its own
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    ordered = points[order]
+
+    new_group = np.ones(len(ordered), dtype=bool)
+    new_group[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    group_start = np.maximum.accumulate(np.where(new_group, np.arange(len(ordered)), 0))
+
+    best_before = np.empty(len(ordered))
+    best_before[0] = np.inf
+    best_before[1:] = np.minimum.accumulate(ordered[:-1, 1])
+
+    keep = np.empty(len(ordered), dtype=bool)
+    keep[order] = ordered[:, 1] < best_before[group_start]
+    return keep
+
+
+def _dominated_by(points: np.ndarray, others: np.ndarray, chunk_size: int = 1024) -> np.ndarray:
+    # mask of ``points`` dominated by at least one of ``others``
+    dominated = np.zeros(len(points), dtype=bool)
+    if not len(others):
+        return dominated
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start:start + chunk_size]
+        no_worse = np.ones((len(chunk), len(others)), dtype=bool)
+        better = np.zeros((len(chunk), len(others)), dtype=bool)
+        for k in range(points.shape[1]):
+            no_worse &= others[:, k] <= chunk[:, k, None]
+            better |= others[:, k] < chunk[:, k, None]
+        dominated[start:start + chunk_size] = np.any(no_worse & better, axis=1)
+    return dominated
+
+
+def _nondominated_mask_nd(points: np.ndarray, block_size: int = 256) -> np.ndarray:
+    # a dominating point always has a strictly smaller sum: visiting blocks in order of increasing sum, a block only has
+    # to be checked against the front found so far and against itself
+    order = np.argsort(points.sum(axis=1), kind='stable')
+    front = np.empty((0, points.shape[1]))
+
+    keep = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(order), block_size):
+        block_index = order[start:start + block_size]
+        block = points[block_index]
+        survivors = ~_dominated_by(block, front)
+        survivors[survivors] = ~_dominated_by(block[survivors], block[survivors])
+        keep[block_index[survivors]] = True
+        front = np.concatenate((front, block[survivors]))
+    return keep
+
+
+def nondominated_mask(points) -> np.ndarray:
+    """
+    Boolean mask of the points no other point dominates, with every objective minimized.
+
+    Equal points do not dominate each other, so duplicates are all kept.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    if points.shape[1] == 1:
+        return points[:, 0] == points[:, 0].min()
+    if points.shape[1] == 2:
+        return _nondominated_mask_2d(points)
+    return _nondominated_mask_nd(points)
+
+
+class ParetoArchive:
+    """
+    :class:`ParetoArchive` keeps the non-dominated subset of every point added to it.
+
+    Points are added in batches. A batch is reduced to its own front, filtered against the archive, and the archive
+    points it dominates are dropped, so memory is bounded by the front size rather than the number of
+    evaluations. Fronts of two objectives use an ``O(n log n)`` sort-and-sweep, more objectives a blocked pass in order
+    of increasing objective sum; every dominance check is a vectorized comparison.
+    """
+
+    def __init__(self, senses: tuple) -> None:
+
+        if any(sense not in ('min', 'max') for sense in senses):
+            raise ValueError(f"senses must be 'min' or 'max', not {senses}")
+
+        self.senses: tuple = tuple(senses)
+        self._signs = np.array([1.0 if sense == 'min' else -1.0 for sense in senses])
+        self._points = np.empty((0, len(senses)))
+        self._payloads = np.empty((0, 0), dtype=np.int64)
+        self.evaluated: int = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    @property
+    def points(self) -> np.ndarray:
+        """
+        Objective values of the archived points, in their original (unsigned) orientation.
+        """
+        return self._points * self._signs
+
+    @property
+    def payloads(self) -> np.ndarray:
+        return self._payloads
+
+    def add(self, objectives, payloads) -> int:
+        """
+        Merges a batch of points into the archive.
+
+        :param objectives: ``(n, k)`` array of objective values in the orientation given by ``senses``
+        :param payloads: ``(n, p)`` integer array identifying each point
+        :return: number of points of the batch that entered the archive
+        """
+        objectives = np.asarray(objectives, dtype=np.float64).reshape(-1, len(self.senses))
+        payloads = np.asarray(payloads, dtype=np.int64).reshape(len(objectives), -1)
+        self.evaluated += len(objectives)
+        if not len(objectives):
+            return 0
+
+        candidates = objectives * self._signs
+        if len(self._payloads) == 0:
+            self._payloads = np.empty((0, payloads.shape[1]), dtype=np.int64)
+
+        # the archive is already mutually non-dominated: the batch is reduced to its own front, filtered against the archive,
+        # and the archive then loses the points the accepted batch points dominate
+        front = nondominated_mask(candidates)
+        candidates, payloads = candidates[front], payloads[front]
+        survivors = ~_dominated_by(candidates, self._points)
+        candidates, payloads = candidates[survivors], payloads[survivors]
+        if not len(candidates):
+            return 0
+
+        retained = ~_dominated_by(self._points, candidates)
+        self._points = np.concatenate((self._points[retained], candidates))
+        self._payloads = np.concatenate((self._payloads[retained], payloads))
+        return len(candidates)
+
+
+class ParetoPoint:
+    """
+    :class:`ParetoPoint` is one member of a Pareto front: a :class:`Ev` configuration, its fleet size and its tradespace coordinates.
+    """
+
+    def __init__(self, choices: tuple, fleet_size: int, coordinates: dict) -> None:
+        self.choices: tuple = choices
+        self.fleet_size: int = fleet_size
+        self.coordinates: dict = coordinates
+
+    def to_fleet(self, route: Route, violate_constraints=False) -> Fleet:
+        return Fleet(route, Ev(*self.choices, violate_constraints=violate_constraints), fleet_size=self.fleet_size)
+
+    def __str__(self) -> str:
+        coordinates = ', '.join(f'{k}={v}' for k, v in self.coordinates.items())
+        return f'{"-".join(choice.name for choice in self.choices)} x{self.fleet_size}: {coordinates}'
+
+
+def _evaluate_batches(route, fleet_sizes, choices, objectives, violate_constraints, batch_size):
+    fleet_sizes = np.asarray(fleet_sizes, dtype=np.int64)
+    values, payloads, pending = [], [], 0
+    for combination in choices:
+        try:
+            ev = Ev(*combination, violate_constraints=violate_constraints)
+        except ValueError:
+            continue
+
+        curves = FleetSizeScan(route, ev).curves(fleet_sizes)
+        curves['availability'] = np.full(len(fleet_sizes), ev.availability)
+        values.append(np.column_stack([curves[objective] for objective in objectives]))
+
+        codes = np.array([choice.value - 1 for choice in combination], dtype=np.int64)
+        payloads.append(np.column_stack((np.broadcast_to(codes, (len(fleet_sizes), len(codes))), fleet_sizes)))
+
+        pending += len(fleet_sizes)
+        if pending >= batch_size:
+            yield np.concatenate(values), np.concatenate(payloads)
+            values, payloads, pending = [], [], 0
+
+    if values:
+        yield np.concatenate(values), np.concatenate(payloads)
+
+
+def explore_pareto_front(route: Route, fleet_sizes, objectives: tuple = DEFAULT_OBJECTIVES, choices=None, violate_constraints=False, batch_size=4096) -> list:
+    """
+    Streams every :class:`Ev` configuration times every fleet size on ``route`` through a :class:`ParetoArchive` and
+    returns the non-dominated :class:`ParetoPoint` s, sorted by their coordinates. Each configuration is evaluated over all
+    fleet sizes at once with a :class:`FleetSizeScan`.
+
+    :param route: :class:`Route` the fleets run on
+    :param fleet_sizes: iterable of fleet sizes to try for every configuration
+    :param objectives: names from :data:`OBJECTIVE_SENSES`, by default fleet cost against MAU score
+    :param choices: iterable of ``(autonomous_system, battery_charger, battery_pack, chasis, motor_and_inverter)`` choice
+        tuples, by default every feasible configuration. Configurations violating constraints are skipped.
+    """
+    unknown = [objective for objective in objectives if objective not in OBJECTIVE_SENSES]
+    if unknown:
+        raise ValueError(f'Unknown objectives {unknown}, expected some of {tuple(OBJECTIVE_SENSES)}')
+
+    fleet_sizes = list(fleet_sizes)
+    if not fleet_sizes:
+        raise ValueError("fleet_sizes must not be empty")
+    choices = feasible_choices(violate_constraints) if choices is None else choices
+    archive = ParetoArchive(tuple(OBJECTIVE_SENSES[objective] for objective in objectives))
+
+    for values, payloads in _evaluate_batches(route, fleet_sizes, choices, objectives, violate_constraints, batch_size):
+        archive.add(values, payloads)
+
+    front = []
+    for point, payload in zip(archive.points.tolist(), archive.payloads.tolist()):
+        combination = tuple(choice_enum(code + 1) for choice_enum, code in zip(CHOICE_ENUMS, payload[:-1]))
+        front.append(ParetoPoint(combination, payload[-1], dict(zip(objectives, point))))
+
+    front.sort(key=lambda p: tuple(p.coordinates.values()))
+    return front
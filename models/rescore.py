@@ -0,0 +1,241 @@
+"""
+Rescoring of stored sweep results under new MAU weights or utility curves, without re-running the model.
+
+The MAU score only depends on four stored columns (daily passenger volume, peak throughput, average wait and
+availability), so a new scoring scheme is applied by streaming those columns through :func:`score_batch`. A scheme is a
+JSON file overriding any of the weights and utility curves of :mod:`models.multi_attribute_utility`::
+
+    {
+        "weights": {"WEIGHT_AVERAGE_WAIT_TIME": 0.25, "WEIGHT_AVAILABILITY": 0.35},
+        "curves": {"AVAILABILITY_UTILITY": {"0": 0, "0.5": 0.2, "0.9": 1}}
+    }
+
+Run it with::
+
+    python -m models.rescore results/ rescored.csv --scheme scheme.json --keep chasis fleet_size
+
+where the source is a :class:`FleetWriter` file or a :mod:`models.sweep` study directory.
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS, SUBSYSTEM_CATALOGS, EvBatch
+from models.export import FORMATS, infer_format, read_columns, write_columns
+from models.fleet_record import FleetRecordArray
+from models.monte_carlo import MAU_WEIGHTS
+from models.multi_attribute_utility import DEFAULT_CURVES, DEFAULT_WEIGHTS, UtilityCurve, score_batch
+from models.sweep import MANIFEST_NAME, load_manifest
+
+
+# Stored columns the MAU score depends on, in :func:`score_batch` argument order
+MAU_INPUTS = ('maximum_passenger_volume', 'peak_hourly_passenger_throughput', 'average_wait_time_minutes', 'availability')
+
+# Utility curves of a scheme, in :data:`DEFAULT_CURVES` order
+MAU_CURVES = ('PASSENGER_VOLUME_UTILITY', 'PEAK_PASSENGER_THROUGHPUT_UTILITY', 'AVERAGE_WAIT_TIME_UTILITY', 'AVAILABILITY_UTILITY')
+
+
+def load_scheme(path) -> tuple:
+    """
+    ``(weights, curves)`` of a JSON scheme file (see the module documentation), defaults filling what it leaves out.
+    """
+    with open(path) as f:
+        scheme = json.load(f)
+    unknown = set(scheme) - {'weights', 'curves'}
+    unknown |= set(scheme.get('weights', {})) - set(MAU_WEIGHTS)
+    unknown |= set(scheme.get('curves', {})) - set(MAU_CURVES)
+    if unknown:
+        raise ValueError(f'Unknown scheme keys {sorted(unknown)}, expected weights among {MAU_WEIGHTS} and curves among {MAU_CURVES}')
+
+    weights = tuple(float(scheme.get('weights', {}).get(name, weight)) for name, weight in zip(MAU_WEIGHTS, DEFAULT_WEIGHTS))
+    curves = tuple(UtilityCurve({float(x): float(y) for x, y in scheme['curves'][name].items()}) if name in scheme.get('curves', {}) else curve
+                   for name, curve in zip(MAU_CURVES, DEFAULT_CURVES))
+    return weights, curves
+
+
+def _record_chunks(records: np.ndarray, columns: tuple, chunk_size: int):
+    # Ev attributes are looked up by configuration in the evaluated design space, with and without constraints
+    ev_columns = [name for name in columns if name in Ev.DERIVED_ATTRIBUTES]
+    tables = {name: np.stack([getattr(EvBatch.design_space(violate), name) for violate in (False, True)]) for name in ev_columns}
+    unknown = set(columns) - set(records.dtype.names) - set(ev_columns)
+    if unknown:
+        raise ValueError(f'Unknown columns {sorted(unknown)}')
+
+    for start in range(0, len(records), chunk_size):
+        rows = records[start:start + chunk_size]
+        chunk = {name: rows[name] for name in columns if name not in ev_columns}
+        if ev_columns:
+            configuration = np.ravel_multi_index(tuple(rows[subsystem_str] for subsystem_str in SUBSYSTEM_CATALOGS), tuple(len(choice_enum) for choice_enum in CHOICE_ENUMS))
+            for name in ev_columns:
+                chunk[name] = tables[name][rows['violate_constraints'].view(np.uint8), configuration]
+        yield chunk
+
+
+def read_chunks(source, columns=MAU_INPUTS, chunk_size: int = 250_000, format: str = None, numeric=True):
+    """
+    Streams ``columns`` of stored results as dicts of arrays of at most ``chunk_size`` rows, in row order.
+
+    :param source: a :class:`FleetWriter` file, a :mod:`models.sweep` study directory (its shards are read in order), or
+        a :class:`FleetRecordArray` or :data:`FLEET_RECORD_DTYPE` array, whose :class:`Ev` attributes are looked up from
+        its choice codes
+    :param format: format of a source file, inferred from its suffix by default
+    :param numeric: read the columns as float64, otherwise as strings; record arrays keep their own types
+    """
+    columns = tuple(columns)
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, not {chunk_size}')
+
+    if isinstance(source, (FleetRecordArray, np.ndarray)):
+        yield from _record_chunks(source.array if isinstance(source, FleetRecordArray) else source, columns, chunk_size)
+        return
+
+    if os.path.isdir(source):
+        manifest = load_manifest(source)
+        if manifest is None:
+            raise ValueError(f'{source} holds no {MANIFEST_NAME}')
+        for shard in manifest['shards']:
+            yield from read_chunks(os.path.join(source, shard['path']), columns, chunk_size, manifest['format'], numeric)
+        return
+
+    yield from read_columns(source, columns, chunk_size, format, numeric)
+
+
+def rescore(chunk: dict, weights: tuple = DEFAULT_WEIGHTS, curves: tuple = DEFAULT_CURVES) -> np.ndarray:
+    """
+    MAU scores of a chunk holding the :data:`MAU_INPUTS` columns, with ``weights`` and ``curves`` as in :func:`score_batch`.
+    """
+    return score_batch(*(chunk[name] for name in MAU_INPUTS), weights=weights, curves=curves)
+
+
+def _rank(scores: np.ndarray) -> np.ndarray:
+    # 1 for the highest score, ties in row order. MAU scores are rounded to 4 decimals within [0, 1], so they are sorted
+    # as exact int16 keys, for which the stable sort is a radix sort
+    keys = np.rint(scores * 10_000)
+    if np.array_equal(keys / 10_000, scores) and (keys.size == 0 or keys.max() <= 10_000 and keys.min() >= 0):
+        order = np.argsort((-keys).astype(np.int16), kind='stable')
+    else:
+        order = np.argsort(-scores, kind='stable')
+    rank = np.empty(len(scores), dtype=np.int64)
+    rank[order] = np.arange(1, len(scores) + 1)
+    return rank
+
+
+class RescoreResult:
+    """
+    :class:`RescoreResult` holds the new and stored scores of every row of a rescored source, in row order, and their
+    ranks: 1 for the highest score, ties ranked in row order.
+    """
+
+    def __init__(self, scores: np.ndarray, previous_scores: np.ndarray) -> None:
+        self.scores: np.ndarray = scores
+        self.previous_scores: np.ndarray = previous_scores
+        self.rank: np.ndarray = _rank(scores)
+        self.previous_rank: np.ndarray = _rank(previous_scores)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    @property
+    def changed(self) -> int:
+        """
+        Number of rows whose score changed.
+        """
+        return int(np.sum(self.scores != self.previous_scores))
+
+    def top(self, k: int = 10) -> np.ndarray:
+        """
+        Rows of the ``k`` highest new scores, best first.
+        """
+        return np.argsort(self.rank)[:k]
+
+    def rank_correlation(self) -> float:
+        """
+        Spearman correlation between the new and stored ranks, 1 when the scheme kept the ranking.
+        """
+        n = len(self)
+        if n < 2:
+            return 1.0
+        d = (self.rank - self.previous_rank).astype(np.float64)
+        return float(1 - 6 * np.sum(d ** 2) / (n * (n ** 2 - 1.0)))
+
+    def __str__(self) -> str:
+        s = f'Rescored {len(self)} rows, {self.changed} scores changed, rank correlation {self.rank_correlation():.4f}\n'
+        s += f'\t{"row":>10}{"score":>10}{"rank":>10}{"previous score":>16}{"previous rank":>16}\n'
+        for row in self.top(10):
+            s += f'\t{row:>10}{self.scores[row]:>10.4f}{self.rank[row]:>10}{self.previous_scores[row]:>16.4f}{self.previous_rank[row]:>16}\n'
+        return s
+
+
+def rescore_results(source, output=None, weights: tuple = DEFAULT_WEIGHTS, curves: tuple = DEFAULT_CURVES, keep=(), chunk_size: int = 250_000,
+                    format: str = None, output_format: str = None) -> RescoreResult:
+    """
+    Rescores every row of ``source`` (see :func:`read_chunks`) under ``weights`` and ``curves``.
+
+    The :data:`MAU_INPUTS` and stored ``score`` columns are streamed ``chunk_size`` rows at a time, so memory holds the
+    scores and ranks only. Ranks need every score, so ``output`` is written once all rows are rescored, from a second
+    pass over ``source`` when ``keep`` names columns to copy.
+
+    :param output: optional file of the ``row`` number, the ``keep`` columns, ``score``, ``rank``, ``previous_score``
+        and ``previous_rank`` of every row, in row order
+    :param output_format: format of ``output``, inferred from its suffix by default
+    """
+    keep = tuple(keep)
+    if output is not None:
+        output_format = infer_format(output) if output_format is None else output_format
+        if output_format not in FORMATS:
+            raise ValueError(f'output_format must be one of {FORMATS}, not {output_format}')
+
+    scores, previous_scores = [], []
+    for chunk in read_chunks(source, MAU_INPUTS + ('score',), chunk_size, format):
+        scores.append(rescore(chunk, weights, curves))
+        previous_scores.append(np.asarray(chunk['score'], dtype=np.float64))
+    result = RescoreResult(np.concatenate(scores) if scores else np.zeros(0), np.concatenate(previous_scores) if previous_scores else np.zeros(0))
+
+    if output is not None:
+        names = ('row',) + keep + ('score', 'rank', 'previous_score', 'previous_rank')
+        # chunks of a study directory end with their shard, so rows are counted from the chunks read
+        kept = read_chunks(source, keep, chunk_size, format, numeric=False) if keep else ({} for _ in range(0, len(result), chunk_size))
+
+        def chunks():
+            start = 0
+            for columns in kept:
+                stop = start + len(columns[keep[0]]) if columns else min(start + chunk_size, len(result))
+                yield {
+                    'row': np.arange(start, stop),
+                    **columns,
+                    'score': result.scores[start:stop],
+                    'rank': result.rank[start:stop],
+                    'previous_score': result.previous_scores[start:stop],
+                    'previous_rank': result.previous_rank[start:stop],
+                }
+                start = stop
+        write_columns(output, names, chunks(), output_format)
+
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m models.rescore', description='Rescores stored sweep results under new MAU weights or utility curves.')
+    parser.add_argument('source', help='result file or study directory')
+    parser.add_argument('output', nargs='?', default=None, help='file of the new scores and ranks')
+    parser.add_argument('--scheme', default=None, help='JSON weights and utility curves (default: the current ones)')
+    parser.add_argument('--keep', nargs='*', default=(), help='source columns copied to the output')
+    parser.add_argument('--chunk-size', type=int, default=250_000, help='rows read at a time (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        weights, curves = (DEFAULT_WEIGHTS, DEFAULT_CURVES) if args.scheme is None else load_scheme(args.scheme)
+        result = rescore_results(args.source, args.output, weights, curves, keep=args.keep, chunk_size=args.chunk_size)
+    except ValueError as e:
+        parser.exit(2, f'{parser.prog}: error: {e}\n')
+
+    print(result, end='')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
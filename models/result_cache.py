@@ -0,0 +1,181 @@
+import hashlib
+import json
+import sqlite3
+
+import numpy as np
+
+from models import fleet, multi_attribute_utility
+from models.ev_batch import SUBSYSTEM_CATALOGS
+from models.fleet_record import FLEET_RECORD_DTYPE, FleetRecord
+from models.route import Route
+from models.sweep_runner import SweepGrid, SweepResult, evaluate_points
+
+
+# SQLite host parameters per statement, under the limit of older SQLite builds
+_BATCH = 500
+
+_MODEL_VERSION = None
+
+
+def model_version() -> str:
+    """
+    Hash of everything a :class:`Fleet` result depends on: the component catalogs, the :class:`Fleet` and MAU constants
+    and :data:`models.fleet.MODEL_VERSION`, which stands for the formulas. Any change to them yields a new version, so
+    cached results of the old model are no longer found, while edits that leave every result unchanged keep the cache.
+    """
+    global _MODEL_VERSION
+    if _MODEL_VERSION is not None:
+        return _MODEL_VERSION
+
+    h = hashlib.sha256()
+    for subsystem_str, catalog in SUBSYSTEM_CATALOGS.items():
+        h.update(subsystem_str.encode())
+        for field in catalog.fields:
+            column = np.ascontiguousarray(catalog[field])
+            h.update(f'{field}:{column.dtype.str}'.encode())
+            h.update(column.tobytes())
+
+    constants = {
+        'model': fleet.MODEL_VERSION,
+        'fleet': [getattr(fleet, name) for name in ('PASSENGER_WEIGHT_AVERAGE_KG', 'LOAD_FACTOR_EXPECTED_AVG', 'BENCHMARK_AVAIL_COMPETING_SYSTEMS', 'DWELL_TIME_SECONDS', 'FLEET_BUFFER_VEHICLES')],
+        'weights': list(multi_attribute_utility.DEFAULT_WEIGHTS),
+        'curves': [sorted(curve.to_dict().items()) for curve in multi_attribute_utility.DEFAULT_CURVES],
+    }
+    h.update(json.dumps(constants, sort_keys=True).encode())
+
+    _MODEL_VERSION = h.hexdigest()
+    return _MODEL_VERSION
+
+
+class ResultCache:
+    """
+    :class:`ResultCache` is a persistent, content-addressed store of evaluated :class:`Fleet` results in a SQLite file.
+
+    A key hashes the :func:`model_version` together with the Ev choices, ``violate_constraints``, route length, stops and
+    the fleet size or peak throughput target, so entries of an older model are never returned; they are simply the first
+    to be evicted. Values are :data:`FLEET_RECORD_DTYPE` rows, or the message of the ``ValueError`` the point raised.
+
+    Lookups and inserts take thousands of keys per call. Once the cache holds more than ``max_entries`` results the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries: int = 1_000_000, version: str = None) -> None:
+
+        if max_entries < 1:
+            raise ValueError(f'max_entries must be at least 1, not {max_entries}')
+
+        self.path = path
+        self.max_entries: int = max_entries
+        self.version: str = model_version() if version is None else version
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, record BLOB, error TEXT, used INTEGER NOT NULL) WITHOUT ROWID')
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        self._clock = self._connection.execute('SELECT COALESCE(MAX(used), 0) FROM results').fetchone()[0]
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, choices: tuple, route: Route, value, by_fleet_size: bool, violate_constraints=False) -> bytes:
+        """
+        Key of one evaluation: ``Fleet(route, Ev(*choices), fleet_size=value)`` if ``by_fleet_size``, otherwise sized for
+        ``peak_throughput_target=value``.
+        """
+        point = (
+            self.version,
+            tuple(choice.value - 1 for choice in choices),
+            bool(violate_constraints),
+            float(route.length_km),
+            int(route.stops),
+            'fleet_size' if by_fleet_size else 'peak_throughput_target',
+            int(value) if by_fleet_size else float(value),
+        )
+        return hashlib.blake2b(repr(point).encode(), digest_size=16).digest()
+
+    def get_many(self, keys) -> dict:
+        """
+        Cached values of ``keys``, as ``{key: FleetRecord or error message}``. Missing keys are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        self._clock += 1
+        found = {}
+        with self._connection:
+            for start in range(0, len(keys), _BATCH):
+                batch = keys[start:start + _BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._connection.execute(f'SELECT key, record, error FROM results WHERE key IN ({placeholders})', batch).fetchall()
+                if rows:
+                    self._connection.execute(f'UPDATE results SET used = ? WHERE key IN ({placeholders})', [self._clock, *batch])
+
+                records = [(key, record) for key, record, _ in rows if record is not None]
+                if records:
+                    array = np.frombuffer(b''.join(record for _, record in records), dtype=FLEET_RECORD_DTYPE)
+                    found.update((key, FleetRecord.from_row(row)) for (key, _), row in zip(records, array.tolist()))
+                found.update((key, error) for key, record, error in rows if record is None)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items) -> None:
+        """
+        Stores ``(key, value)`` pairs, where a value is a :class:`FleetRecord` or an error message, then evicts the least
+        recently used entries beyond ``max_entries``.
+        """
+        self._clock += 1
+        rows = []
+        for key, value in items:
+            if isinstance(value, FleetRecord):
+                rows.append((key, np.array(value.to_row(), dtype=FLEET_RECORD_DTYPE).tobytes(), None, self._clock))
+            else:
+                rows.append((key, None, str(value), self._clock))
+
+        with self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO results (key, record, error, used) VALUES (?, ?, ?, ?)', rows)
+            excess = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._connection.execute('DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used LIMIT ?)', (excess,))
+
+    def evaluate(self, grid: SweepGrid, start: int = 0, stop: int = None) -> list:
+        """
+        :class:`SweepResult` s of grid points ``[start, stop)``, like :func:`evaluate_chunk`: cached points are looked up
+        in one call, the others are evaluated and stored.
+        """
+        stop = len(grid) if stop is None else min(stop, len(grid))
+        points = [grid.point(index) for index in range(start, stop)]
+        keys = [self.key(choices, route, value, grid.by_fleet_size, grid.violate_constraints) for choices, route, value in points]
+        cached = self.get_many(keys)
+
+        missing = [index for index, key in zip(range(start, stop), keys) if key not in cached]
+        evaluated = {result.index: result for result in evaluate_points(grid, missing)}
+        self.put_many((keys[result.index - start], FleetRecord.from_dict(result.fleet) if result.ok else result.error) for result in evaluated.values())
+
+        results = []
+        for index, key, (choices, route, value) in zip(range(start, stop), keys, points):
+            if index in evaluated:
+                results.append(evaluated[index])
+            elif isinstance(cached[key], FleetRecord):
+                results.append(SweepResult(index, choices, route, value, fleet=cached[key].to_dict()))
+            else:
+                results.append(SweepResult(index, choices, route, value, error=cached[key]))
+        return results
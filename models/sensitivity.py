@@ -0,0 +1,228 @@
+import numpy as np
+
+from models.ev_batch import ATTRIBUTE_NAMES
+from models.fleet import DWELL_TIME_SECONDS, LOAD_FACTOR_EXPECTED_AVG
+from models.monte_carlo import MAU_WEIGHTS, UNCERTAIN_INPUTS, MonteCarloResult, evaluate_samples
+from models.multi_attribute_utility import DEFAULT_WEIGHTS
+from models.route import Route
+
+
+def nominal_value(route: Route, name: str) -> float:
+    """
+    Unperturbed value of the input ``name`` of :data:`UNCERTAIN_INPUTS`: 1 for the multiplicative factors on subsystem
+    attributes, the constant, route parameter or MAU weight otherwise.
+    """
+    if name in ATTRIBUTE_NAMES:
+        return 1.0
+    if name in MAU_WEIGHTS:
+        return DEFAULT_WEIGHTS[MAU_WEIGHTS.index(name)]
+    nominal = {
+        'LOAD_FACTOR_EXPECTED_AVG': LOAD_FACTOR_EXPECTED_AVG,
+        'DWELL_TIME_SECONDS': DWELL_TIME_SECONDS,
+        'length_km': route.length_km,
+        'stops': route.stops,
+    }
+    if name not in nominal:
+        raise ValueError(f'Unknown input {name}, expected one of {UNCERTAIN_INPUTS}')
+    return float(nominal[name])
+
+
+def _check(names, outputs) -> None:
+    unknown = [name for name in names if name not in UNCERTAIN_INPUTS]
+    if unknown:
+        raise ValueError(f'Unknown inputs {unknown}, expected some of {UNCERTAIN_INPUTS}')
+    unknown = [output for output in outputs if output not in MonteCarloResult.OUTPUTS]
+    if unknown:
+        raise ValueError(f'Unknown outputs {unknown}, expected some of {MonteCarloResult.OUTPUTS}')
+
+
+class LocalSensitivity:
+    """
+    :class:`LocalSensitivity` holds the finite difference derivatives of the outputs around a design point.
+
+    ``derivatives[output][i]`` is the derivative of ``output`` with respect to ``inputs[i]`` and ``elasticities`` the same
+    derivative scaled by ``nominal_inputs[i] / nominal_outputs[output]``, the relative change of the output per relative
+    change of the input, comparable across inputs of different units.
+    """
+
+    def __init__(self, inputs: tuple, nominal_inputs: np.ndarray, steps: np.ndarray, nominal_outputs: dict, derivatives: dict) -> None:
+        self.inputs: tuple = inputs
+        self.nominal_inputs: np.ndarray = nominal_inputs
+        self.steps: np.ndarray = steps
+        self.nominal_outputs: dict = nominal_outputs
+        self.derivatives: dict = derivatives
+
+        self.elasticities: dict = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for output, derivative in derivatives.items():
+                self.elasticities[output] = derivative * nominal_inputs / nominal_outputs[output]
+
+    def derivative(self, output: str, name: str) -> float:
+        return float(self.derivatives[output][self.inputs.index(name)])
+
+    def ranking(self, output: str = 'score') -> list:
+        """
+        ``(input, elasticity)`` pairs by decreasing absolute elasticity of ``output``. Inputs without a derivative come last.
+        """
+        elasticities = self.elasticities[output]
+        order = np.argsort(-np.nan_to_num(np.abs(elasticities), nan=-1.0), kind='stable')
+        return [(self.inputs[i], float(elasticities[i])) for i in order]
+
+    def __str__(self) -> str:
+        s = ''
+        for output in self.derivatives:
+            s += f'{output} = {self.nominal_outputs[output]}\n'
+            s += f'\t{"input":<50}{"derivative":>14}{"elasticity":>12}\n'
+            for name, elasticity in self.ranking(output):
+                s += f'\t{name:<50}{self.derivative(output, name):>14.6g}{elasticity:>12.4f}\n'
+        return s
+
+
+def local_sensitivities(route: Route, choices: tuple, inputs=None, fleet_size: int = None, peak_throughput_target: float = None, relative_step: float = 0.01,
+                        outputs=('score', 'fleet_cost_1k_usd'), violate_constraints=False) -> LocalSensitivity:
+    """
+    Central finite difference derivatives of ``outputs`` with respect to ``inputs`` (all of :data:`UNCERTAIN_INPUTS` by
+    default) for one :class:`Ev` configuration on ``route``.
+
+    The ``2 * len(inputs) + 1`` perturbed points are evaluated in a single :func:`evaluate_samples` batch. A point that
+    cannot be evaluated (e.g. a perturbed battery breaking the weight constraint) falls back to a one-sided difference.
+
+    The model rounds its intermediate results and sizes fleets in whole vehicles, so it is piecewise constant at small
+    scales: ``relative_step`` must be large enough to cross those steps, and derivatives of sized fleets jump where the
+    fleet size does.
+
+    :param relative_step: step of each input as a fraction of its nominal value (of 1 for inputs that are nominally 0)
+    :raises ValueError: if the design point itself cannot be evaluated
+    """
+    names = tuple(UNCERTAIN_INPUTS if inputs is None else inputs)
+    _check(names, outputs)
+    if fleet_size is None and peak_throughput_target is None:
+        raise ValueError("Please specify fleet_size, peak_throughput_target, or both")
+    if relative_step <= 0:
+        raise ValueError(f'relative_step must be positive, not {relative_step}')
+
+    x0 = np.array([nominal_value(route, name) for name in names])
+    steps = relative_step * np.where(x0 != 0, np.abs(x0), 1.0)
+
+    # rows: design point, then every input stepped up, then every input stepped down
+    k = len(names)
+    points = np.tile(x0, (2 * k + 1, 1))
+    points[1 + np.arange(k), np.arange(k)] += steps
+    points[1 + k + np.arange(k), np.arange(k)] -= steps
+
+    samples, valid = evaluate_samples(route, choices, {name: points[:, i] for i, name in enumerate(names)}, len(points), fleet_size, peak_throughput_target, violate_constraints)
+    if not valid[0]:
+        raise ValueError(f'The design point {choices} on this route cannot be evaluated')
+
+    up, down = valid[1:k + 1], valid[k + 1:]
+    derivatives = {}
+    for output in outputs:
+        f = samples[output].astype(np.float64)
+        f0, f_up, f_down = f[0], f[1:k + 1], f[k + 1:]
+        central = (f_up - f_down) / (2 * steps)
+        forward = (f_up - f0) / steps
+        backward = (f0 - f_down) / steps
+        derivatives[output] = np.where(up & down, central, np.where(up, forward, np.where(down, backward, np.nan)))
+
+    nominal_outputs = {output: samples[output][0].item() for output in outputs}
+    return LocalSensitivity(names, x0, steps, nominal_outputs, derivatives)
+
+
+class SobolResult:
+    """
+    :class:`SobolResult` holds variance-based sensitivity indices estimated by :func:`sobol_indices`.
+
+    ``first_order[output][i]`` is the share of the variance of ``output`` explained by ``inputs[i]`` alone, and
+    ``total_order[output][i]`` the share involving ``inputs[i]``, interactions included. Their difference measures the
+    interactions; a total index near 0 means the input can be fixed at any value of its range.
+    """
+
+    def __init__(self, inputs: tuple, first_order: dict, total_order: dict, variance: dict, samples: int, valid_fraction: float) -> None:
+        self.inputs: tuple = inputs
+        self.first_order: dict = first_order
+        self.total_order: dict = total_order
+        self.variance: dict = variance
+        self.samples: int = samples
+        self.valid_fraction: float = valid_fraction
+
+    @property
+    def evaluations(self) -> int:
+        return self.samples * (len(self.inputs) + 2)
+
+    def indices(self, output: str = 'score') -> dict:
+        """
+        ``{input: (first order, total order)}`` of ``output``.
+        """
+        return {name: (float(s), float(st)) for name, s, st in zip(self.inputs, self.first_order[output], self.total_order[output])}
+
+    def ranking(self, output: str = 'score') -> list:
+        """
+        ``(input, total order index)`` pairs by decreasing total order index of ``output``.
+        """
+        total = self.total_order[output]
+        order = np.argsort(-np.nan_to_num(total, nan=-1.0), kind='stable')
+        return [(self.inputs[i], float(total[i])) for i in order]
+
+    def __str__(self) -> str:
+        s = f'Sobol indices: {self.samples} base samples, {self.evaluations} evaluations, {100*self.valid_fraction:.1f}% valid\n'
+        for output in self.first_order:
+            s += f'{output} (variance {self.variance[output]:.6g})\n'
+            s += f'\t{"input":<50}{"S1":>10}{"ST":>10}\n'
+            indices = self.indices(output)
+            for name, _ in self.ranking(output):
+                s += f'\t{name:<50}{indices[name][0]:>10.4f}{indices[name][1]:>10.4f}\n'
+        return s
+
+
+def sobol_indices(route: Route, choices: tuple, distributions: dict, samples: int = 10_000, fleet_size: int = None, peak_throughput_target: float = None, seed=None,
+                  outputs=('score', 'fleet_cost_1k_usd'), chunk_size: int = 100_000, violate_constraints=False) -> SobolResult:
+    """
+    First and total order Sobol indices of ``outputs`` for the inputs of ``distributions``, by Saltelli sampling.
+
+    Two independent sample matrices ``A`` and ``B`` of ``samples`` rows are drawn from ``distributions`` (named and scaled
+    as in :func:`run_monte_carlo`), and for every input a matrix ``AB_i`` taking that column from ``B`` and the others from
+    ``A``: ``samples * (len(distributions) + 2)`` model runs, evaluated ``chunk_size`` at a time with
+    :func:`evaluate_samples`. First order indices use the Saltelli (2010) estimator, total order ones Jansen's. Base samples
+    where any of the runs cannot be evaluated are left out of every estimate.
+
+    :param seed: anything :class:`numpy.random.SeedSequence` accepts
+    """
+    names = tuple(name for name in UNCERTAIN_INPUTS if name in distributions)
+    _check(distributions, outputs)
+    if fleet_size is None and peak_throughput_target is None:
+        raise ValueError("Please specify fleet_size, peak_throughput_target, or both")
+    if samples < 2 or chunk_size < 1:
+        raise ValueError(f'samples must be at least 2 and chunk_size at least 1, not {samples} and {chunk_size}')
+
+    rng = np.random.default_rng(seed)
+    a = {name: distributions[name].sample(rng, samples) for name in names}
+    b = {name: distributions[name].sample(rng, samples) for name in names}
+
+    def evaluate(inputs):
+        chunks = [evaluate_samples(route, choices, {name: values[start:start + chunk_size] for name, values in inputs.items()}, min(chunk_size, samples - start),
+                                   fleet_size, peak_throughput_target, violate_constraints) for start in range(0, samples, chunk_size)]
+        values = {output: np.concatenate([chunk[0][output] for chunk in chunks]).astype(np.float64) for output in outputs}
+        return values, np.concatenate([chunk[1] for chunk in chunks])
+
+    f_a, valid = evaluate(a)
+    f_b, valid_b = evaluate(b)
+    valid = valid & valid_b
+    f_ab = []
+    for name in names:
+        values, valid_ab = evaluate({**a, name: b[name]})
+        f_ab.append(values)
+        valid &= valid_ab
+
+    first_order, total_order, variance = {}, {}, {}
+    for output in outputs:
+        fa, fb = f_a[output][valid], f_b[output][valid]
+        variance[output] = float(np.var(np.concatenate((fa, fb)))) if valid.any() else float('nan')
+        first, total = np.full(len(names), np.nan), np.full(len(names), np.nan)
+        if variance[output] > 0:
+            for i, values in enumerate(f_ab):
+                fab = values[output][valid]
+                first[i] = np.mean(fb * (fab - fa)) / variance[output]
+                total[i] = 0.5 * np.mean((fa - fab) ** 2) / variance[output]
+        first_order[output], total_order[output] = first, total
+
+    return SobolResult(names, first_order, total_order, variance, samples, float(valid.mean()))
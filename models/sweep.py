@@ -0,0 +1,234 @@
+"""
+Command-line entry point running a sweep study into sharded result files.
+
+A study is a JSON spec::
+
+    {
+        "routes": [{"length_km": 15, "stops": 8}, {"length_km": 30, "stops": 12}],
+        "peak_throughput_targets": [100, 150, 200],
+        "subsystems": {"chasis": ["C1", "C5"], "battery_pack": ["P2", "P3", "P4"]},
+        "violate_constraints": false,
+        "feasible_only": true
+    }
+
+with either ``fleet_sizes`` or ``peak_throughput_targets``. Subsystems missing from ``subsystems`` take every choice.
+Run it with::
+
+    python -m models.sweep study.json results/ --shard-size 50000 --workers 8
+
+The grid is split into shards of ``--shard-size`` points, each written to its own file (see :class:`FleetWriter`) and
+recorded in ``results/manifest.json`` once complete. Re-running the same command after an interruption skips the shards
+already in the manifest, so at most one shard is recomputed.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+
+from models.design_space import ConfigurationSpace
+from models.ev_batch import CHOICE_ENUMS, SUBSYSTEM_CATALOGS
+from models.export import FORMATS, FleetWriter, preferred_format
+from models.route import Route
+from models.sweep_runner import SweepGrid, run_sweep, sweep_executor
+
+
+MANIFEST_NAME = 'manifest.json'
+
+_SUFFIX_BY_FORMAT = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+
+
+class StudySpec:
+    """
+    :class:`StudySpec` is a parsed study spec (see the module documentation) and the :class:`SweepGrid` it describes.
+    """
+
+    def __init__(self, routes, fleet_sizes=None, peak_throughput_targets=None, subsystems: dict = None, violate_constraints=False, feasible_only=False) -> None:
+
+        if (fleet_sizes is None) == (peak_throughput_targets is None):
+            raise ValueError("Please specify exactly one of fleet_sizes or peak_throughput_targets")
+
+        subsystems = {} if subsystems is None else dict(subsystems)
+        unknown = set(subsystems) - set(SUBSYSTEM_CATALOGS)
+        if unknown:
+            raise ValueError(f'Unknown subsystems {sorted(unknown)}, expected some of {tuple(SUBSYSTEM_CATALOGS)}')
+
+        self.routes: list = [{'length_km': route['length_km'], 'stops': route['stops']} for route in routes]
+        self.fleet_sizes: list = None if fleet_sizes is None else list(fleet_sizes)
+        self.peak_throughput_targets: list = None if peak_throughput_targets is None else list(peak_throughput_targets)
+        self.subsystems: dict = {name: list(subsystems[name]) for name in SUBSYSTEM_CATALOGS if name in subsystems}
+        self.violate_constraints: bool = bool(violate_constraints)
+        self.feasible_only: bool = bool(feasible_only)
+
+        self.choice_subsets: tuple = tuple(self._choice_subset(name, choice_enum) for name, choice_enum in zip(SUBSYSTEM_CATALOGS, CHOICE_ENUMS))
+
+    def _choice_subset(self, name: str, choice_enum) -> tuple:
+        if name not in self.subsystems:
+            return tuple(choice_enum)
+        try:
+            return tuple(choice_enum[choice_name] for choice_name in self.subsystems[name])
+        except KeyError as e:
+            raise ValueError(f'Unknown {name} choice {e}, expected some of {[choice.name for choice in choice_enum]}') from None
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> 'StudySpec':
+        known = {'routes', 'fleet_sizes', 'peak_throughput_targets', 'subsystems', 'violate_constraints', 'feasible_only'}
+        unknown = set(spec) - known
+        if unknown:
+            raise ValueError(f'Unknown study spec keys {sorted(unknown)}, expected some of {sorted(known)}')
+        if 'routes' not in spec:
+            raise ValueError("Study spec must list its routes")
+        return cls(**spec)
+
+    @classmethod
+    def from_file(cls, path) -> 'StudySpec':
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self) -> dict:
+        d = {'routes': self.routes}
+        if self.fleet_sizes is not None:
+            d['fleet_sizes'] = self.fleet_sizes
+        else:
+            d['peak_throughput_targets'] = self.peak_throughput_targets
+        d['subsystems'] = self.subsystems
+        d['violate_constraints'] = self.violate_constraints
+        d['feasible_only'] = self.feasible_only
+        return d
+
+    def fingerprint(self) -> str:
+        """
+        SHA-256 of the canonical JSON spec, recorded in the manifest to refuse resuming a different study.
+        """
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()
+
+    def choices(self) -> ConfigurationSpace:
+        choices = ConfigurationSpace(dict(zip(SUBSYSTEM_CATALOGS, self.choice_subsets)))
+        return choices.feasible(self.violate_constraints) if self.feasible_only else choices
+
+    def grid(self) -> SweepGrid:
+        routes = [Route(length_km=route['length_km'], number_stops=route['stops']) for route in self.routes]
+        return SweepGrid(routes, fleet_sizes=self.fleet_sizes, peak_throughput_targets=self.peak_throughput_targets, choices=self.choices(),
+                         violate_constraints=self.violate_constraints)
+
+
+def _write_json_atomically(path, data) -> None:
+    partial = f'{path}.partial'
+    with open(partial, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(partial, path)
+
+
+def load_manifest(output_dir) -> dict:
+    """
+    The manifest of ``output_dir``, or ``None`` if no study was started there.
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_study(spec: StudySpec, output_dir, shard_size: int = 50_000, chunk_size: int = 512, workers: int = None, format: str = None, progress=None) -> dict:
+    """
+    Runs ``spec`` into ``output_dir``, resuming from its manifest if one exists, and returns the final manifest.
+
+    Each shard covers ``shard_size`` consecutive grid points. Evaluated fleets are streamed to the shard file, points that
+    could not be evaluated are only counted. A shard is written under a temporary name and renamed once complete, then
+    recorded in the manifest, so an interrupted run never leaves a shard that looks finished but is not.
+
+    :param progress: optional callable receiving the manifest entry of every shard written by this call
+    :raises ValueError: if ``output_dir`` holds a different study, or the same one with another shard size or format
+    """
+    if shard_size < 1:
+        raise ValueError(f'shard_size must be at least 1, not {shard_size}')
+    format = preferred_format() if format is None else format
+    if format not in FORMATS:
+        raise ValueError(f'format must be one of {FORMATS}, not {format}')
+
+    grid = spec.grid()
+    manifest = {
+        'spec': spec.to_dict(),
+        'fingerprint': spec.fingerprint(),
+        'points': len(grid),
+        'shard_size': shard_size,
+        'format': format,
+        'shards': [],
+        'complete': False,
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)
+    if previous is not None:
+        for key in ('fingerprint', 'points', 'shard_size', 'format'):
+            if previous[key] != manifest[key]:
+                raise ValueError(f'{output_dir} holds a study with another {key} ({previous[key]} rather than {manifest[key]}), use a new output directory')
+        manifest['shards'] = previous['shards']
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    done = {shard['index'] for shard in manifest['shards']}
+    shard_ranges = [(start, min(start + shard_size, len(grid))) for start in range(0, len(grid), shard_size)]
+
+    # one process pool for every shard of this call, rather than one per shard
+    with contextlib.ExitStack() as stack:
+        executor = None
+        if workers != 1 and len(done) < len(shard_ranges):
+            executor = stack.enter_context(sweep_executor(grid, workers))
+
+        for index, (start, stop) in enumerate(shard_ranges):
+            if index in done:
+                continue
+
+            name = f'shard-{index:05d}{_SUFFIX_BY_FORMAT[format]}'
+            path = os.path.join(output_dir, name)
+            errors = 0
+            with FleetWriter(f'{path}.partial', format=format) as writer:
+                for result in run_sweep(grid, workers=workers, chunk_size=chunk_size, start=start, stop=stop, executor=executor):
+                    if result.ok:
+                        writer.write(result.fleet)
+                    else:
+                        errors += 1
+            os.replace(f'{path}.partial', path)
+
+            shard = {'index': index, 'path': name, 'start': start, 'stop': stop, 'rows': writer.rows_written, 'errors': errors}
+            manifest['shards'].append(shard)
+            manifest['shards'].sort(key=lambda shard: shard['index'])
+            _write_json_atomically(manifest_path, manifest)
+            if progress is not None:
+                progress(shard)
+
+    manifest['complete'] = len(manifest['shards']) == len(shard_ranges)
+    _write_json_atomically(manifest_path, manifest)
+    return manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m models.sweep', description='Runs a sweep study into sharded result files, resuming an interrupted run.')
+    parser.add_argument('spec', help='JSON study spec')
+    parser.add_argument('output_dir', help='directory of the shards and manifest.json')
+    parser.add_argument('--shard-size', type=int, default=50_000, help='grid points per shard file (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=512, help='grid points per worker task (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--format', choices=FORMATS, default=None, help='shard file format (default: parquet if pyarrow is installed, csv otherwise)')
+    args = parser.parse_args(argv)
+
+    try:
+        spec = StudySpec.from_file(args.spec)
+        shards_total = -(-len(spec.grid()) // args.shard_size) if args.shard_size > 0 else 0
+
+        def report(shard):
+            print(f'shard {shard["index"] + 1}/{shards_total}: points {shard["start"]}-{shard["stop"]}, {shard["rows"]} rows, {shard["errors"]} errors', file=sys.stderr)
+
+        manifest = run_study(spec, args.output_dir, shard_size=args.shard_size, chunk_size=args.chunk_size, workers=args.workers, format=args.format, progress=report)
+    except ValueError as e:
+        parser.exit(2, f'{parser.prog}: error: {e}\n')
+
+    rows = sum(shard['rows'] for shard in manifest['shards'])
+    print(f'{manifest["points"]} points, {rows} rows in {len(manifest["shards"])} shards, manifest at {os.path.join(args.output_dir, MANIFEST_NAME)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
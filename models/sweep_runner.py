@@ -0,0 +1,231 @@
+import itertools
+import numbers
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from models.design_space import ConfigurationSpace, DesignSpace
+from models.ev_registry import get_ev
+from models.fleet import Fleet
+from models.route import Route
+
+
+class SweepGrid:
+    """
+    :class:`SweepGrid` is the ``configuration x route x value`` grid of a sweep, where each value is either a fleet size or
+    a peak throughput target. Points are numbered in ``itertools.product(choices, routes, values)`` order so that
+    consecutive points share their :class:`Ev`.
+
+    ``choices`` defaults to the whole design space, whose infeasible configurations come back as errors; pass
+    ``ConfigurationSpace().feasible()`` or :func:`models.feasibility.feasible_choices` to only generate configurations
+    that can be built. A :class:`ConfigurationSpace` is used as is, so the grid is never materialized: points are unranked
+    from their index by the grid's :class:`DesignSpace`.
+    """
+
+    def __init__(self, routes, fleet_sizes=None, peak_throughput_targets=None, choices=None, violate_constraints=False) -> None:
+
+        if (fleet_sizes is None) == (peak_throughput_targets is None):
+            raise ValueError("Please specify exactly one of fleet_sizes or peak_throughput_targets")
+
+        self.routes: tuple = tuple(routes)
+        self.by_fleet_size: bool = fleet_sizes is not None
+        self.values: tuple = tuple(fleet_sizes if self.by_fleet_size else peak_throughput_targets)
+        # rejected here rather than by every point, where Fleet raises ZeroDivisionError, AttributeError or TypeError for them
+        if self.by_fleet_size:
+            invalid = [value for value in self.values if type(value) is not int or value < 1]
+            if invalid:
+                raise ValueError(f'fleet_sizes must be ints of at least 1, not {invalid}')
+        else:
+            invalid = [value for value in self.values if isinstance(value, bool) or not isinstance(value, numbers.Real) or not value > 0]
+            if invalid:
+                raise ValueError(f'peak_throughput_targets must be numbers greater than 0, not {invalid}')
+        if choices is None:
+            choices = ConfigurationSpace()
+        elif not isinstance(choices, ConfigurationSpace):
+            choices = ConfigurationSpace.from_choices(choices)
+        self.choices: ConfigurationSpace = choices
+        self.violate_constraints: bool = violate_constraints
+
+        if any(type(route) is not Route for route in self.routes):
+            raise ValueError("routes must all be of type Route")
+        self.space: DesignSpace = DesignSpace(self.choices, self.routes, self.values)
+
+    def __len__(self) -> int:
+        return len(self.space)
+
+    def point(self, index: int) -> tuple:
+        """
+        Returns ``(choices, route, value)`` of grid point ``index``.
+        """
+        point = self.space.unrank(index)
+        return point[:-2], point[-2], point[-1]
+
+    def chunks(self, chunk_size: int, start: int = 0, stop: int = None) -> list:
+        """
+        ``[start, stop)`` index ranges covering grid points ``[start, stop)``, the whole grid by default.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [(chunk_start, min(chunk_start + chunk_size, stop)) for chunk_start in range(start, stop, chunk_size)]
+
+
+class SweepResult:
+    """
+    :class:`SweepResult` is one evaluated grid point. ``fleet`` holds :meth:`Fleet.to_dict` of the evaluated fleet, or
+    ``None`` when the point could not be evaluated, in which case ``error`` explains why (e.g. a violated constraint).
+    """
+
+    __slots__ = ('index', 'choices', 'route', 'value', 'fleet', 'error')
+
+    def __init__(self, index: int, choices: tuple, route: Route, value, fleet: dict = None, error: str = None) -> None:
+        self.index = index
+        self.choices = choices
+        self.route = route
+        self.value = value
+        self.fleet = fleet
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SweepProgress:
+    """
+    :class:`SweepProgress` is handed to the ``progress`` callback of :func:`run_sweep` after every chunk.
+    """
+
+    __slots__ = ('points_done', 'points_total', 'chunks_done', 'chunks_total', 'errors')
+
+    def __init__(self, points_done, points_total, chunks_done, chunks_total, errors) -> None:
+        self.points_done = points_done
+        self.points_total = points_total
+        self.chunks_done = chunks_done
+        self.chunks_total = chunks_total
+        self.errors = errors
+
+    @property
+    def fraction(self) -> float:
+        return self.points_done / self.points_total if self.points_total else 1.0
+
+    def __str__(self) -> str:
+        return f'{self.points_done}/{self.points_total} points ({100*self.fraction:.1f}%), {self.chunks_done}/{self.chunks_total} chunks, {self.errors} errors'
+
+
+def evaluate_chunk(grid: SweepGrid, start: int, stop: int) -> list:
+    """
+    Evaluates grid points ``[start, stop)``. :class:`Ev` and :class:`Fleet` ``ValueError`` s are recorded on the result.
+    """
+    return evaluate_points(grid, range(start, stop))
+
+
+def evaluate_points(grid: SweepGrid, indices) -> list:
+    """
+    Evaluates the grid points ``indices``, in the given order, like :func:`evaluate_chunk`.
+    """
+    results = []
+    ev_choices = ev = ev_error = None
+    for index in indices:
+        choices, route, value = grid.point(index)
+        if choices != ev_choices:
+            ev_choices, ev, ev_error = choices, None, None
+            try:
+                ev = get_ev(*choices, violate_constraints=grid.violate_constraints)
+            except ValueError as e:
+                ev_error = str(e)
+
+        if ev is None:
+            results.append(SweepResult(index, choices, route, value, error=ev_error))
+            continue
+
+        try:
+            if grid.by_fleet_size:
+                fleet = Fleet(route, ev, fleet_size=value)
+            else:
+                fleet = Fleet(route, ev, peak_throughput_target=value)
+        except ValueError as e:
+            results.append(SweepResult(index, choices, route, value, error=str(e)))
+            continue
+
+        results.append(SweepResult(index, choices, route, value, fleet=fleet.to_dict()))
+    return results
+
+
+_WORKER_GRID: SweepGrid = None
+
+
+def _initialize_worker(grid: SweepGrid) -> None:
+    global _WORKER_GRID
+    _WORKER_GRID = grid
+
+
+def _evaluate_worker_chunk(chunk: tuple) -> list:
+    return evaluate_chunk(_WORKER_GRID, *chunk)
+
+
+def sweep_executor(grid: SweepGrid, workers: int = None) -> ProcessPoolExecutor:
+    """
+    Process pool of ``workers`` processes (all cores by default) evaluating the chunks of ``grid``, to share between several
+    :func:`run_sweep` calls over that same grid. The caller shuts it down, e.g. by using it as a context manager.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f'workers must be at least 1, not {workers}')
+    return ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(grid,))
+
+
+def run_sweep(grid: SweepGrid, workers: int = None, chunk_size: int = 512, progress=None, include_errors: bool = True, start: int = 0, stop: int = None,
+              executor: ProcessPoolExecutor = None):
+    """
+    Evaluates every point of ``grid``, or only points ``[start, stop)``, and yields :class:`SweepResult` s in grid order.
+
+    The grid is split into ``chunk_size`` point chunks that are evaluated by a pool of ``workers`` processes (all cores by
+    default, ``workers=1`` evaluates in this process). Only a bounded window of chunks is in flight at a time, so results
+    are streamed back in a deterministic order without buffering the whole sweep.
+
+    :param progress: optional callable receiving a :class:`SweepProgress` after every chunk
+    :param include_errors: also yield the points that raised ``ValueError`` (constraint violations, unreachable targets)
+    :param executor: a :func:`sweep_executor` of ``grid`` to evaluate the chunks with instead of starting a pool for this
+        call, left running afterwards
+    """
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, not {chunk_size}')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers < 1:
+        raise ValueError(f'workers must be at least 1, not {workers}')
+
+    chunks = grid.chunks(chunk_size, start, stop)
+    points_total = sum(chunk_stop - chunk_start for chunk_start, chunk_stop in chunks)
+    points_done = errors = 0
+
+    def finish(chunk_number, results):
+        nonlocal points_done, errors
+        points_done += len(results)
+        errors += sum(1 for result in results if not result.ok)
+        if progress is not None:
+            progress(SweepProgress(points_done, points_total, chunk_number + 1, len(chunks), errors))
+        return results if include_errors else [result for result in results if result.ok]
+
+    if executor is None and workers == 1:
+        for chunk_number, chunk in enumerate(chunks):
+            yield from finish(chunk_number, evaluate_chunk(grid, *chunk))
+        return
+
+    owned = executor is None
+    if owned:
+        executor = sweep_executor(grid, workers)
+    try:
+        pending = deque()
+        chunk_iter = iter(chunks)
+        for chunk in itertools.islice(chunk_iter, 2 * workers):
+            pending.append(executor.submit(_evaluate_worker_chunk, chunk))
+
+        chunk_number = 0
+        while pending:
+            results = pending.popleft().result()
+            for chunk in itertools.islice(chunk_iter, 1):
+                pending.append(executor.submit(_evaluate_worker_chunk, chunk))
+            yield from finish(chunk_number, results)
+            chunk_number += 1
+    finally:
+        if owned:
+            executor.shutdown()
@@ -0,0 +1,59 @@
+from models.budget_optimizer import _max_affordable_fleet_size, optimize_under_budget
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS
+from models.fleet import Fleet
+from models.route import Route
+
+import itertools
+import pytest
+
+
+def brute_force(route, budget_1k_usd, violate_constraints=False):
+    best_score, best = -1, set()
+    for choices in itertools.product(*CHOICE_ENUMS):
+        try:
+            ev = Ev(*choices, violate_constraints=violate_constraints)
+        except ValueError:
+            continue
+        fleet_size = _max_affordable_fleet_size(ev.total_vehicle_cost_1k_usd, budget_1k_usd)
+        if fleet_size < 1:
+            continue
+        score = Fleet(route, ev, fleet_size=fleet_size).score
+        if score > best_score:
+            best_score, best = score, {choices}
+        elif score == best_score:
+            best.add(choices)
+    return best_score, best
+
+
+@pytest.mark.parametrize('length_km, stops, budget_1k_usd, violate_constraints', [
+    (5, 4, 500, False),
+    (12, 10, 2000, False),
+    (1, 1, 30, False),
+    (8, 6, 1000, True),
+])
+def test_matches_brute_force(length_km, stops, budget_1k_usd, violate_constraints):
+    route = Route(length_km=length_km, number_stops=stops)
+    result = optimize_under_budget(route, budget_1k_usd, violate_constraints=violate_constraints)
+    best_score, best = brute_force(route, budget_1k_usd, violate_constraints)
+
+    assert result.score == best_score
+    assert {choices for choices, _, _ in result.configurations} == best
+    assert result.pruned_fraction > 0.9
+
+    for choices, fleet_size, fleet_cost_1k_usd in result.configurations:
+        ev = Ev(*choices, violate_constraints=violate_constraints)
+        assert fleet_cost_1k_usd <= budget_1k_usd
+        assert Fleet(route, ev, fleet_size=fleet_size).score == best_score
+        if fleet_size > 1:
+            assert Fleet(route, ev, fleet_size=fleet_size - 1).score < best_score
+
+
+def test_unaffordable_budget():
+    result = optimize_under_budget(Route(length_km=5, number_stops=4), 1)
+    assert result.score is None
+    assert result.configurations == []
+    assert result.statistics['configurations_evaluated'] == 0
+
+    with pytest.raises(ValueError):
+        optimize_under_budget(Route(length_km=5, number_stops=4), 0)
@@ -0,0 +1,39 @@
+import pickle
+
+from models.battery_pack import BATTERY_PACK_CATALOG, BatteryPack, BatteryPackChoice
+from models.chasis import CHASIS_CATALOG, Chasis, ChasisChoice
+
+import numpy as np
+import pytest
+
+
+def test_components_are_shared_read_only_views():
+    pack = BatteryPack(BatteryPackChoice.P3)
+    assert pack is BatteryPack(BatteryPackChoice.P3)
+    assert (pack.capacity_kWh, pack.cost_1k_usd, pack.weight_kg) == (75, 16, 825)
+    assert str(pack) == 'P3'
+    assert not hasattr(pack, '__dict__')
+
+    with pytest.raises(AttributeError):
+        pack.weight_kg = 1
+    assert pickle.loads(pickle.dumps(pack)) is pack
+
+
+def test_component_type_validation():
+    with pytest.raises(ValueError):
+        BatteryPack(ChasisChoice.C1)
+    with pytest.raises(ValueError):
+        Chasis('C1')
+
+
+def test_catalog_columns():
+    assert CHASIS_CATALOG['passenger_capacity'].dtype == np.int64
+    assert CHASIS_CATALOG['passenger_capacity'][CHASIS_CATALOG.index(ChasisChoice.C8)] == 30
+    assert CHASIS_CATALOG.choice(7) is ChasisChoice.C8
+    assert BATTERY_PACK_CATALOG.value(BatteryPackChoice.P7, 'weight_kg') == 2880
+    assert len(BATTERY_PACK_CATALOG) == len(BatteryPackChoice)
+
+    with pytest.raises(ValueError):
+        BATTERY_PACK_CATALOG['weight_kg'][0] = 0
+    with pytest.raises(AttributeError):
+        BATTERY_PACK_CATALOG.fields = ()
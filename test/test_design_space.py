@@ -0,0 +1,85 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from models.design_space import ConfigurationSpace, DesignSpace
+from models.ev_batch import CHOICE_ENUMS
+from models.feasibility import feasible_choices
+from models.route import Route
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+
+ROUTES = (Route(length_km=15, number_stops=8), Route(length_km=30, number_stops=12))
+
+
+def test_configuration_space_matches_product():
+    space = ConfigurationSpace({'chasis': (ChasisChoice.C5, ChasisChoice.C1), 'battery_pack': (BatteryPackChoice.P2, BatteryPackChoice.P4)})
+    subsets = [list(choice_enum) for choice_enum in CHOICE_ENUMS]
+    subsets[2], subsets[3] = [BatteryPackChoice.P2, BatteryPackChoice.P4], [ChasisChoice.C5, ChasisChoice.C1]
+    expected = list(itertools.product(*subsets))
+
+    assert len(space) == len(expected)
+    assert list(space) == expected
+    assert space[-1] == expected[-1]
+    assert all(space.index(choices) == i for i, choices in enumerate(expected))
+    assert space.codes().tolist() == [[choice.value - 1 for choice in choices] for choices in expected]
+    assert tuple(ChasisChoice) not in space
+
+    with pytest.raises(IndexError):
+        space[len(space)]
+    with pytest.raises(ValueError):
+        ConfigurationSpace({'wheels': ()})
+    with pytest.raises(ValueError):
+        ConfigurationSpace({'chasis': (BatteryPackChoice.P1,)})
+
+
+def test_feasible_view():
+    feasible = ConfigurationSpace().feasible()
+    assert list(feasible) == feasible_choices()
+    choices = feasible[len(feasible) // 2]
+    assert feasible.index(choices) == len(feasible) // 2
+    assert ConfigurationSpace.from_choices(feasible_choices()).positions.tolist() == feasible.positions.tolist()
+
+    infeasible = next(choices for choices in ConfigurationSpace() if choices not in feasible)
+    with pytest.raises(ValueError):
+        feasible.index(infeasible)
+
+    # subsets in another order than the enums, and a view already filtered, against a chunked evaluation
+    space = ConfigurationSpace({'chasis': (ChasisChoice.C5, ChasisChoice.C1, ChasisChoice.C3), 'battery_pack': (BatteryPackChoice.P4, BatteryPackChoice.P1)})
+    assert list(space.feasible()) == list(space.filter(lambda evs: evs.valid, chunk_size=7))
+    cheap = space.filter(lambda evs: evs.total_vehicle_cost_1k_usd <= 60, chunk_size=5)
+    assert list(cheap.feasible()) == [choices for choices in cheap if choices in feasible]
+    assert len(space.feasible(violate_constraints=True)) == len(space)
+
+
+def test_design_space_unrank_and_rank():
+    configurations = ConfigurationSpace({'chasis': (ChasisChoice.C2,)}).feasible()
+    space = DesignSpace(configurations, ROUTES, (100, 150, 200))
+    expected = [choices + (route, value) for choices, route, value in itertools.product(configurations, ROUTES, (100, 150, 200))]
+
+    assert len(space) == len(expected)
+    assert list(space) == expected
+    assert [space.rank(point) for point in expected] == list(range(len(expected)))
+    assert list(space.iter_range(5, 11, 2)) == expected[5:11:2]
+
+    indices = np.array([0, 7, len(space) - 1])
+    codes, route_index, value_index = space.unrank_codes(indices)
+    for i, index in enumerate(indices):
+        point = space[index]
+        assert codes[i].tolist() == [choice.value - 1 for choice in point[:5]]
+        assert (ROUTES[route_index[i]], (100, 150, 200)[value_index[i]]) == point[5:]
+
+    with pytest.raises(IndexError):
+        space.unrank(len(space))
+    with pytest.raises(ValueError):
+        space.rank(expected[0][:5] + (ROUTES[0], 125))
+
+
+def test_shards_cover_the_space():
+    space = DesignSpace(ConfigurationSpace().feasible(), ROUTES, (1, 2, 3))
+    for shard in (space.shard, space.strided_shard):
+        indices = sorted(itertools.chain.from_iterable(shard(k, 7) for k in range(7)))
+        assert indices == list(range(len(space)))
+    with pytest.raises(ValueError):
+        space.shard(7, 7)
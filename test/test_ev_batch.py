@@ -0,0 +1,83 @@
+from models._vectorized import round_like_python
+from models.ev import Ev
+from models.ev_batch import EvBatch, iter_design_space
+
+import numpy as np
+import pytest
+
+
+DERIVED_ATTRIBUTES = (
+    'total_vehicle_cost_1k_usd',
+    'total_vehicle_weight_kg',
+    'battery_charge_time_hours',
+    'power_consumption_Wh_per_km',
+    'range_km',
+    'maximum_sustained_speed_km_per_hour',
+    'operated_speed_km_hour',
+    'uptime_hours',
+    'downtime_hours',
+    'availability',
+    'passenger_capacity_to_cost_ratio',
+)
+
+
+@pytest.mark.parametrize('violate_constraints', [False, True])
+def test_design_space_matches_ev(violate_constraints):
+    batch = EvBatch.design_space(violate_constraints=violate_constraints)
+    assert len(batch) == 5 * 3 * 7 * 8 * 4
+
+    for i, choices in enumerate(iter_design_space()):
+        assert batch.choices(i) == choices
+        try:
+            ev = Ev(*choices, violate_constraints=violate_constraints)
+        except ValueError:
+            assert not batch.valid[i]
+            continue
+
+        assert batch.valid[i]
+        assert batch.speed_capped[i] == (ev.maximum_sustained_speed_km_per_hour > ev.MAX_SPEED_KMH)
+        for attribute in DERIVED_ATTRIBUTES:
+            assert getattr(batch, attribute)[i] == getattr(ev, attribute), attribute
+
+
+def test_battery_weight_mask():
+    batch = EvBatch.design_space()
+    assert batch.battery_weight_ok.sum() < len(batch)
+    assert not batch.valid[~batch.battery_weight_ok].any()
+    assert EvBatch.design_space(violate_constraints=True).valid.all()
+
+
+def test_from_choices_and_invalid_indices():
+    choices = list(iter_design_space())[:10]
+    batch = EvBatch.from_choices(choices)
+    assert [batch.choices(i) for i in range(len(batch))] == choices
+
+    with pytest.raises(ValueError):
+        EvBatch(0, 0, 0, 8, 0)
+
+    assert np.array_equal(EvBatch(0, 0, 0, 0, [0, 1]).passenger_capacity, [2, 2])
+
+
+def test_attribute_overrides():
+    batch = EvBatch.design_space()
+    i = int(np.flatnonzero(batch.valid)[0])
+    choices = [np.full(3, index.flat[i]) for index in (batch.autonomous_system_index, batch.battery_charger_index, batch.battery_pack_index, batch.chasis_index, batch.motor_and_inverter_index)]
+    capacity = batch.to_ev(i).battery_pack.capacity_kWh
+
+    perturbed = EvBatch(*choices, attributes={'battery_pack_capacity_kWh': capacity * np.array([0.5, 1.0, 2.0])})
+    assert perturbed.range_km[1] == batch.range_km[i]
+    assert perturbed.range_km[0] < perturbed.range_km[1] < perturbed.range_km[2]
+    assert np.all(perturbed.total_vehicle_cost_1k_usd == batch.total_vehicle_cost_1k_usd[i])
+
+    with pytest.raises(ValueError):
+        EvBatch(*choices, attributes={'battery_pack_colour': np.ones(3)})
+
+
+@pytest.mark.parametrize('ndigits', [0, 2, 3, 4])
+def test_round_like_python_near_ties(ndigits):
+    rng = np.random.default_rng(ndigits)
+    midpoints = (2 * rng.integers(-10**6, 10**6, 20_000) + 1) / (2 * 10.0 ** ndigits)
+    values = np.concatenate((midpoints, np.nextafter(midpoints, np.inf), np.nextafter(midpoints, -np.inf), rng.uniform(-1e3, 1e3, 20_000)))
+
+    expected = [round(v, ndigits) for v in values.tolist()]
+    assert round_like_python(values, ndigits).tolist() == expected
@@ -0,0 +1,52 @@
+from models.autonomous_system import AutonomousSystemChoice
+from models.battery_charger import BatteryChargerChoice
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+from models.ev import Ev
+from models.ev_registry import EvRegistry
+from models.fleet import Fleet
+from models.motor_and_inverter import MotorAndInverterChoice
+from models.route import Route
+
+import pytest
+
+
+FEASIBLE = (AutonomousSystemChoice.A2, BatteryChargerChoice.G2, BatteryPackChoice.P2, ChasisChoice.C5, MotorAndInverterChoice.M1)
+INFEASIBLE = (AutonomousSystemChoice.A2, BatteryChargerChoice.G2, BatteryPackChoice.P7, ChasisChoice.C1, MotorAndInverterChoice.M1)
+
+
+def test_shared_frozen_instances():
+    registry = EvRegistry()
+    ev = registry.get(*FEASIBLE)
+    assert registry.get(*FEASIBLE) is ev
+    assert registry.get(*FEASIBLE, violate_constraints=True) is not ev
+    assert (registry.hits, registry.misses, len(registry)) == (1, 2, 2)
+
+    assert ev.range_km == Ev(*FEASIBLE).range_km
+    with pytest.raises(AttributeError):
+        ev.range_km = 0
+    assert Fleet(Route(10, 5), ev, fleet_size=2).vehicle is ev
+
+
+def test_infeasible_configurations_are_cached():
+    registry = EvRegistry()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            registry.get(*INFEASIBLE)
+    assert (registry.hits, registry.misses) == (1, 1)
+
+
+def test_lru_eviction_and_clear():
+    registry = EvRegistry(maxsize=2)
+    first = registry.get(*FEASIBLE)
+    registry.get(*FEASIBLE[:4], MotorAndInverterChoice.M2)
+    registry.get(*FEASIBLE)
+    registry.get(*FEASIBLE[:4], MotorAndInverterChoice.M3)
+
+    assert registry.get(*FEASIBLE) is first
+    info = registry.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (2, 3, 2)
+
+    registry.clear()
+    assert registry.cache_info().currsize == 0 and registry.hits == registry.misses == 0
+    assert registry.get(*FEASIBLE) is not first
@@ -0,0 +1,49 @@
+from models.ev import Ev
+from models.ev_table import EvTable, ev_table
+from models.feasibility import feasible_choices
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def evs():
+    return [Ev(*choices) for choices in feasible_choices()]
+
+
+def test_where_matches_ev_filters(evs):
+    table = ev_table()
+    assert len(table) == len(evs)
+
+    rows = table.where(range_km=(150, None), availability=(0.8, None), passenger_capacity=(8, None), total_vehicle_cost_1k_usd=(None, 60))
+    expected = [i for i, ev in enumerate(evs)
+                if ev.range_km >= 150 and ev.availability >= 0.8 and ev.chasis.passenger_capacity >= 8 and ev.total_vehicle_cost_1k_usd <= 60]
+    assert rows.tolist() == expected
+    assert 0 < len(expected) < len(evs)
+
+    assert table.where(passenger_capacity=10).tolist() == [i for i, ev in enumerate(evs) if ev.chasis.passenger_capacity == 10]
+    assert table.where(range_km=(300, 100)).tolist() == []
+    assert table.where(range_km=[150, None]).tolist() == table.where(range_km=(150, None)).tolist()
+    with pytest.raises(ValueError):
+        table.where(range_km=(150,))
+    assert table.where().tolist() == list(range(len(evs)))
+    with pytest.raises(ValueError):
+        table.where(top_speed=(0, None))
+
+
+def test_top_and_projection(evs):
+    table = ev_table()
+    best = table.top(5, 'availability')
+    assert [evs[i].availability for i in best] == sorted((ev.availability for ev in evs), reverse=True)[:5]
+
+    rows = table.where(passenger_capacity=(10, None))
+    cheapest = table.top(3, 'total_vehicle_cost_1k_usd', rows, ascending=True)
+    expected = sorted(rows.tolist(), key=lambda i: (evs[i].total_vehicle_cost_1k_usd, i))[:3]
+    assert cheapest.tolist() == expected
+
+    projected = table.project(cheapest, columns=('total_vehicle_cost_1k_usd',))
+    for row, d in zip(cheapest, projected):
+        ev_dict = evs[row].to_dict()
+        assert d == {name: ev_dict[name] for name in d}
+    assert table.choices(cheapest) == [feasible_choices()[i] for i in cheapest]
+
+    assert len(EvTable(violate_constraints=True)) > len(table)
@@ -0,0 +1,70 @@
+from models.ev import Ev
+from models.ev_batch import CHOICE_ENUMS
+from models.evolutionary import GENES, OBJECTIVES, evaluate_genomes, rank_population, run_nsga2
+from models.fleet import Fleet
+from models.pareto import explore_pareto_front
+from models.route import Route
+
+import numpy as np
+import pytest
+
+ROUTE = Route(length_km=15, number_stops=8)
+
+
+def _choices(genome) -> tuple:
+    return tuple(choice_enum(code + 1) for choice_enum, code in zip(CHOICE_ENUMS, genome[:-1]))
+
+
+def test_evaluate_genomes_matches_fleet():
+    rng = np.random.default_rng(0)
+    genomes = np.column_stack([rng.integers(0, len(choice_enum), 300) for choice_enum in CHOICE_ENUMS] + [rng.integers(1, 40, 300)])
+    assert genomes.shape[1] == len(GENES)
+    values = evaluate_genomes(ROUTE, genomes)
+
+    for i, genome in enumerate(genomes.tolist()):
+        try:
+            ev = Ev(*_choices(genome))
+        except ValueError:
+            assert not values['valid'][i] and values['violation'][i] > 0
+            continue
+        fleet = Fleet(ROUTE, ev, fleet_size=genome[-1])
+        assert values['valid'][i] and values['violation'][i] == 0
+        assert [values[name][i] for name in OBJECTIVES] == [getattr(fleet, name) for name in OBJECTIVES]
+
+
+def test_rank_population():
+    objectives = np.array([[0, 0], [1, 1], [0, 2], [2, 0], [5, 5], [5, 5]], dtype=float)
+    valid = np.array([True, True, True, True, False, False])
+    rank, crowding = rank_population(objectives, valid, np.array([0, 0, 0, 0, 3.0, 1.0]))
+    assert rank.tolist() == [0, 1, 1, 1, 3, 2]
+    assert crowding[0] == np.inf
+
+
+def test_nsga2_is_reproducible_and_cached():
+    kwargs = dict(population_size=40, generations=15, max_fleet_size=12, seed=11)
+    result = run_nsga2(ROUTE, **kwargs)
+
+    assert [p.coordinates for p in run_nsga2(ROUTE, **kwargs).front] == [p.coordinates for p in result.front]
+    assert [p.coordinates for p in run_nsga2(ROUTE, workers=2, **kwargs).front] == [p.coordinates for p in result.front]
+    assert result.evaluations + result.cache_hits == 40 * 16
+    assert result.history[-1]['evaluations'] == result.evaluations
+    assert len(result.population) == 40
+
+    for point in result.front:
+        fleet = point.to_fleet(ROUTE)
+        assert point.coordinates == {name: getattr(fleet, name) for name in OBJECTIVES}
+        assert 1 <= point.fleet_size <= 12
+
+
+def test_nsga2_approaches_the_exhaustive_front():
+    result = run_nsga2(ROUTE, population_size=100, generations=40, max_fleet_size=10, seed=3)
+    exhaustive = explore_pareto_front(ROUTE, range(1, 11), objectives=OBJECTIVES)
+
+    found = {tuple(p.coordinates.values()) for p in result.front}
+    optimal = {tuple(p.coordinates.values()) for p in exhaustive}
+    assert max(p.coordinates['score'] for p in result.front) == max(p.coordinates['score'] for p in exhaustive)
+    assert len(found & optimal) >= 0.5 * len(optimal)
+    assert result.evaluations < 0.5 * 2760 * 10
+
+    with pytest.raises(ValueError):
+        run_nsga2(ROUTE, population_size=1)
@@ -0,0 +1,89 @@
+import csv
+
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.export import FleetWriter, fleet_schema, infer_format, read_columns, write_columns
+from models.fleet import Fleet
+from models.route import Route
+
+import pytest
+
+
+@pytest.fixture
+def fleets():
+    fleets = []
+    for choices in list(iter_design_space())[::150]:
+        try:
+            ev = Ev(*choices)
+        except ValueError:
+            continue
+        fleets.append(Fleet(Route(length_km=8, number_stops=4), ev, peak_throughput_target=90))
+        fleets.append(Fleet(Route(length_km=8.5, number_stops=4), ev, fleet_size=3))
+    return fleets
+
+
+def test_schema_matches_to_dict(fleets):
+    schema = dict(fleet_schema())
+    assert list(schema) == list(fleets[0].to_dict())
+    assert schema['fleet_size'] == 'int64'
+    assert schema['chasis_passenger_capacity'] == 'int64'
+    assert schema['battery_charger_weight_kg'] == 'float64'
+    assert schema['chasis'] == 'string'
+    assert schema['violate_constraints'] == 'bool'
+
+
+def test_csv_writer_round_trip(tmp_path, fleets):
+    path = tmp_path / 'fleets.csv'
+    with FleetWriter(path) as writer:
+        writer.write_many(fleets)
+    assert writer.rows_written == len(fleets)
+
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(fleets)
+    for row, fleet in zip(rows, fleets):
+        for name, value in fleet.to_dict().items():
+            assert row[name] == ('' if value is None else str(value))
+
+
+def test_read_and_write_columns(tmp_path, fleets):
+    with FleetWriter(tmp_path / 'fleets.csv') as writer:
+        writer.write_many(fleets)
+
+    chunks = list(read_columns(tmp_path / 'fleets.csv', ('score', 'fleet_size'), chunk_size=3))
+    assert [len(chunk['score']) for chunk in chunks[:-1]] == [3] * (len(chunks) - 1)
+    assert np.concatenate([chunk['score'] for chunk in chunks]).tolist() == [fleet.score for fleet in fleets]
+    names = np.concatenate([chunk['chasis'] for chunk in read_columns(tmp_path / 'fleets.csv', ('chasis',), numeric=False)])
+    assert names.tolist() == [fleet.vehicle.chasis.choice.name for fleet in fleets]
+    with pytest.raises(ValueError):
+        next(read_columns(tmp_path / 'fleets.csv', ('top_speed',)))
+
+    write_columns(tmp_path / 'scores.csv', ('row', 'score'), ({'row': np.arange(len(chunk['score'])), 'score': chunk['score']} for chunk in chunks[:1]))
+    assert next(read_columns(tmp_path / 'scores.csv', ('row', 'score')))['score'].tolist() == chunks[0]['score'].tolist()
+    assert [infer_format(name) for name in ('a.parquet', 'a.FEATHER', 'a.csv')] == ['parquet', 'arrow', 'csv']
+
+
+def test_arrow_writers(tmp_path, fleets):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    with FleetWriter(tmp_path / 'fleets.parquet', batch_size=4) as writer:
+        writer.write_many(fleets)
+    table = pq.read_table(tmp_path / 'fleets.parquet')
+    assert table.num_rows == len(fleets)
+    assert table.column('score').to_pylist() == [fleet.score for fleet in fleets]
+
+    with FleetWriter(tmp_path / 'fleets.arrow', batch_size=4) as writer:
+        writer.write_many(fleets)
+    with pa.memory_map(str(tmp_path / 'fleets.arrow')) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.column('fleet_size').to_pylist() == [fleet.fleet_size for fleet in fleets]
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        FleetWriter(tmp_path / 'fleets.txt')
+    with pytest.raises(ValueError):
+        read_columns(tmp_path / 'fleets.txt', ('score',))
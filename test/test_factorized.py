@@ -0,0 +1,71 @@
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+from models.design_space import ConfigurationSpace
+from models.ev import Ev
+from models.ev_batch import EvBatch
+from models.factorized import FactorizedEvaluator, FactorizedEvs
+from models.fleet import Fleet
+from models.fleet_sizing import UnreachableThroughputError
+from models.route import Route
+
+import numpy as np
+import pytest
+
+ROUTE = Route(length_km=15, number_stops=8)
+
+
+@pytest.mark.parametrize('violate_constraints', [False, True])
+def test_factorized_evs_match_ev_batch(violate_constraints):
+    evs = FactorizedEvs(violate_constraints=violate_constraints)
+    batch = EvBatch.design_space(violate_constraints)
+    for name in FactorizedEvs.DERIVED_ATTRIBUTES + ('valid',):
+        assert np.array_equal(evs.column(name), getattr(batch, name)), name
+    assert evs.partial_size('battery_charge_time_hours') < len(evs)
+
+    feasible = ConfigurationSpace({'chasis': (ChasisChoice.C3, ChasisChoice.C1)}).feasible()
+    evs = FactorizedEvs(feasible)
+    assert np.array_equal(evs.column('availability'), feasible.batch().availability)
+
+
+def test_evaluate_matches_fleet():
+    configurations = ConfigurationSpace()
+    evaluator = FactorizedEvaluator(configurations)
+    assert evaluator.speed_class_count < evaluator.class_count < evaluator.valid.sum() < len(evaluator)
+
+    sized = evaluator.evaluate(ROUTE, fleet_sizes=[1, 7])
+    targeted = evaluator.evaluate(ROUTE, peak_throughput_targets=[150, float('inf')])
+    assert not targeted['valid'][:, 1].any()
+
+    for i in range(0, len(configurations), 7):
+        try:
+            ev = Ev(*configurations[i])
+        except ValueError:
+            assert not sized['valid'][i].any() and np.isnan(sized['score'][i]).all()
+            continue
+        for j, fleet_size in enumerate((1, 7)):
+            fleet = Fleet(ROUTE, ev, fleet_size=fleet_size)
+            assert {name: values[i, j] for name, values in sized.items() if name != 'valid'} == {name: getattr(fleet, name) for name in sized if name != 'valid'}
+        fleet = Fleet(ROUTE, ev, peak_throughput_target=150)
+        assert {name: values[i, 0] for name, values in targeted.items() if name != 'valid'} == {name: getattr(fleet, name) for name in targeted if name != 'valid'}
+        with pytest.raises(UnreachableThroughputError):
+            Fleet(ROUTE, ev, peak_throughput_target=float('inf'))
+
+    with pytest.raises(ValueError):
+        evaluator.evaluate(ROUTE, fleet_sizes=[0])
+    with pytest.raises(ValueError):
+        evaluator.evaluate(ROUTE)
+
+
+def test_evaluate_without_buildable_configuration():
+    # the P4 battery pack is too heavy for the C1 chassis
+    for configurations in (ConfigurationSpace({'chasis': (ChasisChoice.C1,), 'battery_pack': (BatteryPackChoice.P4,)}),
+                           ConfigurationSpace({'chasis': (ChasisChoice.C1,), 'battery_pack': (BatteryPackChoice.P4,)}).feasible()):
+        evaluator = FactorizedEvaluator(configurations)
+        assert evaluator.class_count == 0
+        for result in (evaluator.evaluate(ROUTE, fleet_sizes=[2]), evaluator.evaluate(ROUTE, peak_throughput_targets=[50, 150])):
+            assert result['valid'].shape == result['score'].shape == result['fleet_size'].shape
+            assert result['valid'].shape[0] == len(configurations)
+            assert not result['valid'].any() and not result['fleet_size'].any()
+            assert np.isnan(result['score']).all() and np.isnan(result['fleet_cost_1k_usd']).all()
+        with pytest.raises(ValueError):
+            evaluator.evaluate(ROUTE, fleet_sizes=[0])
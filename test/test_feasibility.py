@@ -0,0 +1,41 @@
+import numpy as np
+
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.feasibility import FeasibilityIndex, feasible_choices
+
+
+def buildable(violate_constraints=False):
+    evs = {}
+    for choices in iter_design_space():
+        try:
+            evs[choices] = Ev(*choices, violate_constraints=violate_constraints)
+        except ValueError:
+            continue
+    return evs
+
+
+def test_enumerates_exactly_the_buildable_configurations():
+    evs = buildable()
+    index = FeasibilityIndex()
+    assert index.choices() == list(evs)
+    assert len(index) == len(evs) < len(list(iter_design_space()))
+    assert all(choices in index for choices in evs)
+    assert next(iter(iter_design_space())) not in index
+
+    pairs = {(ev.battery_pack.choice, ev.chasis.choice) for ev in evs.values()}
+    assert set(index.pairs()) == pairs
+
+    assert len(FeasibilityIndex(violate_constraints=True)) == len(list(iter_design_space()))
+
+
+def test_constraint_masks_match_ev_filters():
+    evs = buildable()
+    chosen = feasible_choices(max_cost_1k_usd=60, min_range_km=150, min_passenger_capacity=8, constraints=(lambda batch: batch.availability >= 0.85,))
+    expected = [choices for choices, ev in evs.items()
+                if ev.total_vehicle_cost_1k_usd <= 60 and ev.range_km >= 150 and ev.chasis.passenger_capacity >= 8 and ev.availability >= 0.85]
+    assert chosen == expected
+    assert 0 < len(chosen) < len(evs)
+
+    index = FeasibilityIndex()
+    assert np.array_equal(index.rows(min_passenger_capacity=8), np.flatnonzero(index.batch.passenger_capacity >= 8))
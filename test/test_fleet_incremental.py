@@ -0,0 +1,52 @@
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.fleet import Fleet, FleetSizeScan
+from models.route import Route
+
+import pytest
+
+
+@pytest.fixture
+def evs():
+    evs = []
+    for choices in list(iter_design_space())[::211]:
+        try:
+            evs.append(Ev(*choices))
+        except ValueError:
+            continue
+    return evs
+
+
+ROUTES = (Route(length_km=3, number_stops=2), Route(length_km=17.3, number_stops=9), Route(length_km=60, number_stops=25))
+
+
+def test_curves_match_fleet(evs):
+    for route in ROUTES:
+        for ev in evs:
+            curves = FleetSizeScan(route, ev).curves(range(1, 61))
+            for i, fleet_size in enumerate(range(1, 61)):
+                expected = Fleet(route, ev, fleet_size=fleet_size).to_dict()
+                assert {k: v[i] for k, v in curves.items()} == {k: expected[k] for k in curves}
+
+
+def test_with_fleet_size_and_route(evs):
+    ev = evs[3]
+    fleet = Fleet(ROUTES[0], ev, peak_throughput_target=180)
+
+    resized = fleet.with_fleet_size(7)
+    assert str(resized) == str(Fleet(ROUTES[0], ev, fleet_size=7))
+    assert resized.to_dict() == Fleet(ROUTES[0], ev, fleet_size=7).to_dict()
+
+    rerouted = fleet.with_route(ROUTES[2])
+    assert rerouted.to_dict() == Fleet(ROUTES[2], ev, peak_throughput_target=180).to_dict()
+    assert resized.with_route(ROUTES[1]).to_dict() == Fleet(ROUTES[1], ev, fleet_size=7).to_dict()
+    assert fleet.to_dict() == Fleet(ROUTES[0], ev, peak_throughput_target=180).to_dict()
+
+
+def test_scan_validation(evs):
+    scan = FleetSizeScan(ROUTES[0], evs[0])
+    assert scan.fleet(4).to_dict() == Fleet(ROUTES[0], evs[0], fleet_size=4).to_dict()
+    with pytest.raises(ValueError):
+        scan.curves([0, 1])
+    with pytest.raises(AttributeError):
+        scan.fleet(2.0)
@@ -0,0 +1,85 @@
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.feasibility import feasible_choices
+from models.fleet import Fleet
+from models.fleet_record import FLEET_RECORD_DTYPE, FleetRecord, FleetRecordArray
+from models.route import Route
+
+ROUTE = Route(length_km=15, number_stops=8)
+CHOICES = list(iter_design_space())
+FEASIBLE = feasible_choices()[0]
+
+
+def _fleets():
+    fleets = []
+    for i, choices in enumerate(CHOICES[::97]):
+        ev = Ev(*choices, violate_constraints=True)
+        kwargs = {'peak_throughput_target': 150} if i % 2 else {'fleet_size': 1 + i % 7}
+        fleets.append(Fleet(ROUTE, ev, **kwargs))
+    return fleets
+
+
+def test_record_matches_fleet():
+    for fleet in _fleets():
+        record = fleet.to_record()
+        assert record.to_dict() == fleet.to_dict()
+        assert list(record.to_dict()) == list(fleet.to_dict())
+        assert record.choices == tuple(s.choice for s in (fleet.vehicle.autonomous_system, fleet.vehicle.battery_charger, fleet.vehicle.battery_pack, fleet.vehicle.chasis, fleet.vehicle.motor_and_inverter))
+        assert str(fleet.route) in str(record)
+
+    feasible = Fleet(ROUTE, Ev(*FEASIBLE), fleet_size=4)
+    assert not feasible.to_record().violate_constraints
+    assert _fleets()[0].to_record().violate_constraints
+    for fleet in (feasible, _fleets()[0]):
+        assert FleetRecord.from_dict(fleet.to_dict()) == fleet.to_record()
+    assert feasible.to_record().to_dict() == feasible.to_dict()
+
+
+def test_record_is_immutable_and_picklable():
+    record = _fleets()[0].to_record()
+    with pytest.raises(AttributeError):
+        record.score = 1.0
+    with pytest.raises(AttributeError):
+        del record.fleet_size
+    assert not hasattr(record, '__dict__')
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert hash(pickle.loads(pickle.dumps(record))) == hash(record)
+    assert sys.getsizeof(record) < sys.getsizeof(_fleets()[0].__dict__)
+
+
+def test_lazy_fleet_record():
+    fleet = Fleet(ROUTE, Ev(*FEASIBLE), peak_throughput_target=150, lazy=True)
+    assert fleet.to_record() == Fleet(ROUTE, Ev(*FEASIBLE), peak_throughput_target=150).to_record()
+
+
+def test_record_array_round_trip():
+    fleets = _fleets()
+    records = FleetRecordArray(capacity=2)
+    records.append(fleets[0])
+    records.extend(fleets[1:])
+
+    assert len(records) == len(fleets)
+    assert records.nbytes == len(fleets) * FLEET_RECORD_DTYPE.itemsize
+    assert [record.to_dict() for record in records] == [fleet.to_dict() for fleet in fleets]
+    assert records[-1] == fleets[-1].to_record()
+    assert np.array_equal(records.column('score'), [fleet.score for fleet in fleets])
+
+    best = records.take(records.column('score') > 0.6)
+    assert [record.score for record in best] == [fleet.score for fleet in fleets if fleet.score > 0.6]
+    assert len(records[1:3]) == 2
+
+    restored = FleetRecordArray.from_array(records.array.copy())
+    assert list(restored) == list(records)
+
+    with pytest.raises(IndexError):
+        records[len(fleets)]
+    with pytest.raises(ValueError):
+        records.column('colour')
+    with pytest.raises(ValueError):
+        records.array['score'][0] = 1.0
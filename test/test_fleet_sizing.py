@@ -0,0 +1,65 @@
+import math
+
+from models.ev_batch import iter_design_space
+from models.ev import Ev
+from models.fleet import Fleet, size_fleets
+from models.fleet_sizing import UNREACHABLE, UnreachableThroughputError, minimum_fleet_size, minimum_fleet_sizes, throughput
+from models.route import Route
+
+import numpy as np
+import pytest
+
+
+def linear_search(passenger_capacity, roundtrip_minutes, target):
+    fleet_size = 0
+    calculated_throughput = 0
+    while calculated_throughput < target:
+        fleet_size += 1
+        calculated_throughput = throughput(passenger_capacity, roundtrip_minutes, fleet_size)
+    return fleet_size
+
+
+CASES = [(capacity, roundtrip, target)
+         for capacity in (2, 4, 6, 8, 10, 16, 20, 30)
+         for roundtrip in (0.5, 3.0, 12.345, 28.75, 187.5, 1234.567)
+         for target in (0, 1, 7, 50, 99, 100, 101, 200, 999, 5000, 40000)]
+
+
+def test_minimum_fleet_size_matches_linear_search():
+    for capacity, roundtrip, target in CASES:
+        assert minimum_fleet_size(capacity, roundtrip, target) == linear_search(capacity, roundtrip, target)
+
+
+def test_minimum_fleet_sizes_matches_scalar():
+    capacity, roundtrip, target = (np.array(column) for column in zip(*CASES))
+    expected = [minimum_fleet_size(*case) for case in CASES]
+    assert minimum_fleet_sizes(capacity, roundtrip, target).tolist() == expected
+
+
+def test_unreachable_targets():
+    with pytest.raises(UnreachableThroughputError):
+        minimum_fleet_size(0, 10.0, 100)
+    with pytest.raises(UnreachableThroughputError):
+        minimum_fleet_size(2, math.inf, 100)
+    with pytest.raises(UnreachableThroughputError):
+        minimum_fleet_size(2, 10.0, math.inf)
+
+    sizes = minimum_fleet_sizes([0, 2, 2, 2], [10.0, math.inf, 10.0, 10.0], [100, 100, math.inf, 0])
+    assert sizes.tolist() == [UNREACHABLE, UNREACHABLE, UNREACHABLE, 0]
+
+
+def test_fleet_and_size_fleets():
+    routes = [Route(length_km=length_km, number_stops=stops) for length_km, stops in ((1, 2), (10, 10), (45.5, 3))]
+    evs = []
+    for choices in iter_design_space():
+        try:
+            evs.append(Ev(*choices))
+        except ValueError:
+            continue
+
+    tuples = [(route, ev, target) for route in routes for ev in evs[::97] for target in (1, 150, 2500)]
+    sizes = size_fleets(*zip(*tuples))
+    for (route, ev, target), size in zip(tuples, sizes):
+        fleet = Fleet(route, ev, peak_throughput_target=target)
+        assert fleet.fleet_size == size
+        assert fleet.fleet_size == linear_search(ev.chasis.passenger_capacity, fleet.route_completion_time_per_vehicle_minutes, target)
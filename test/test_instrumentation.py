@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from models.autonomous_system import AutonomousSystemChoice
+from models.battery_charger import BatteryChargerChoice
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+from models.ev import Ev
+from models.fleet import Fleet
+from models.instrumentation import active_profiler, enable, instrumented
+from models.motor_and_inverter import MotorAndInverterChoice
+from models.route import Route
+
+CHOICES = (AutonomousSystemChoice.A2, BatteryChargerChoice.G2, BatteryPackChoice.P2, ChasisChoice.C5, MotorAndInverterChoice.M1)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_records_stages_and_restores_originals():
+    original = Ev.__dict__['_calculate_range_km']
+    with instrumented() as profiler:
+        fleet = Fleet(Route(length_km=15, number_stops=8), Ev(*CHOICES), peak_throughput_target=150)
+        fleet.to_dict()
+        assert Ev.__dict__['_calculate_range_km'] is not original
+
+    assert Ev.__dict__['_calculate_range_km'] is original
+    assert active_profiler() is None
+
+    stages = profiler.report()['stages']
+    assert stages['Ev._calculate_range_km']['calls'] == 1
+    assert stages['CatalogComponent.__new__']['calls'] == 5
+    assert stages['MultiAttributeUtility.interpolate']['calls'] == 4
+    assert stages['Fleet.to_dict']['calls'] == 1
+    init = stages['Fleet.__init__']
+    assert 0 < init['self_seconds'] < init['total_seconds']
+
+    stacks = dict(line.rsplit(' ', 1) for line in profiler.collapsed_stacks())
+    assert any(stack.startswith('Fleet.__init__;Fleet._calculate_fleet_size_dependents;Fleet.calculate_mau_score;MultiAttributeUtility.__init__') for stack in stacks)
+    assert any(stack.startswith('Fleet.__init__;Fleet.optimize_ideal_fleet_size;fleet_sizing.minimum_fleet_size') for stack in stacks)
+
+
+def test_enable_wraps_every_stage_or_none():
+    original = Ev.__dict__['_calculate_range_km']
+    with pytest.raises(ValueError):
+        enable(stages=[(Ev, '_calculate_range_km', 'Ev._calculate_range_km'), (Ev, 'top_speed', 'Ev.top_speed')])
+    assert Ev.__dict__['_calculate_range_km'] is original
+    assert active_profiler() is None
+
+    with instrumented(stages=[(Ev, '_calculate_range_km', 'Ev._calculate_range_km')]):
+        wrapped = Ev.__dict__['_calculate_range_km']
+        assert wrapped is not original and wrapped.__wrapped__ is original
+    assert Ev.__dict__['_calculate_range_km'] is original
+
+
+def test_enabled_from_environment(tmp_path):
+    report, stacks = tmp_path / 'report.json', tmp_path / 'stacks.folded'
+    env = dict(os.environ, MODELS_INSTRUMENT='1', MODELS_INSTRUMENT_REPORT=str(report), MODELS_INSTRUMENT_STACKS=str(stacks))
+    code = 'from models.ev_batch import iter_design_space; from models.ev import Ev; Ev(*next(iter(iter_design_space())), violate_constraints=True)'
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, check=True)
+
+    assert json.loads(report.read_text())['stages']['Ev.__init__']['calls'] == 1
+    assert any(line.startswith('Ev.__init__;Ev._calculate_availability ') for line in stacks.read_text().splitlines())
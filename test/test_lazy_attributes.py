@@ -0,0 +1,59 @@
+import pytest
+
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.fleet import Fleet
+from models.route import Route
+
+ROUTE = Route(length_km=15, number_stops=8)
+
+
+def test_lazy_ev_matches_eager():
+    for choices in iter_design_space():
+        eager, lazy = Ev(*choices, violate_constraints=True), Ev(*choices, violate_constraints=True, lazy=True)
+        assert [getattr(lazy, name) for name in Ev.DERIVED_ATTRIBUTES] == [getattr(eager, name) for name in Ev.DERIVED_ATTRIBUTES]
+
+
+def test_lazy_ev_computes_only_what_is_read():
+    ev = Ev(*next(iter(iter_design_space())), violate_constraints=True, lazy=True)
+    assert not any(name in vars(ev) for name in Ev.DERIVED_ATTRIBUTES)
+
+    ev.total_vehicle_cost_1k_usd
+    assert 'total_vehicle_cost_1k_usd' in vars(ev)
+    assert 'availability' not in vars(ev) and 'range_km' not in vars(ev)
+
+    # dependencies are pulled in on demand
+    ev.uptime_hours
+    assert {'range_km', 'operated_speed_km_hour', 'power_consumption_Wh_per_km'} <= set(vars(ev))
+    assert 'availability' not in vars(ev)
+
+
+def test_lazy_ev_keeps_constraints_and_freezes():
+    with pytest.raises(ValueError):
+        Ev(*next(iter(iter_design_space())), lazy=True)
+
+    ev = Ev(*next(iter(iter_design_space())), violate_constraints=True, lazy=True).freeze()
+    assert ev.availability == Ev(*next(iter(iter_design_space())), violate_constraints=True).availability
+
+
+@pytest.mark.parametrize('kwargs', [{'fleet_size': 9}, {'peak_throughput_target': 150}])
+def test_lazy_fleet_matches_eager(kwargs):
+    choices = list(iter_design_space())[1500]
+    eager = Fleet(ROUTE, Ev(*choices, violate_constraints=True), **kwargs)
+    lazy = Fleet(ROUTE, Ev(*choices, violate_constraints=True, lazy=True), lazy=True, **kwargs)
+    assert 'score' not in vars(lazy)
+
+    # reading in a different order than the eager constructor does must not change the listed order
+    assert lazy.score == eager.score
+    assert list(lazy.to_dict().items()) == list(eager.to_dict().items())
+    assert str(lazy) == str(eager)
+
+
+def test_lazy_fleet_stays_lazy_when_resized():
+    choices = list(iter_design_space())[1500]
+    lazy = Fleet(ROUTE, Ev(*choices, violate_constraints=True), fleet_size=3, lazy=True)
+    lazy.score
+
+    resized = lazy.with_fleet_size(12)
+    assert 'score' not in vars(resized)
+    assert resized.to_dict() == Fleet(ROUTE, Ev(*choices, violate_constraints=True), fleet_size=12).to_dict()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from models.ev_batch import ATTRIBUTE_NAMES, EvBatch
+from models.fleet import Fleet
+from models.monte_carlo import Constant, Normal, Triangular, Uniform, run_monte_carlo
+from models.route import Route
+
+ROUTE = Route(length_km=15, number_stops=8)
+DISTRIBUTIONS = {
+    'battery_pack_capacity_kWh': Normal(1, 0.05),
+    'chasis_nominal_power_consumption_Wh_per_km': Triangular(0.9, 1, 1.2),
+    'LOAD_FACTOR_EXPECTED_AVG': Uniform(0.6, 0.9),
+    'DWELL_TIME_SECONDS': Normal(60, 10),
+}
+
+
+@pytest.fixture(scope='module')
+def evs():
+    batch = EvBatch.design_space()
+    return [batch.to_ev(int(i)) for i in np.flatnonzero(batch.valid)[::97]]
+
+
+def choices_of(ev):
+    return tuple(subsystem.choice for subsystem in (ev.autonomous_system, ev.battery_charger, ev.battery_pack, ev.chasis, ev.motor_and_inverter))
+
+
+def test_nominal_inputs_match_fleet(evs):
+    nominal = {name: Constant(1.0) for name in ATTRIBUTE_NAMES}
+    for ev in evs:
+        fixed = run_monte_carlo(ROUTE, choices_of(ev), nominal, samples=2, fleet_size=7)
+        sized = run_monte_carlo(ROUTE, choices_of(ev), {}, samples=2, peak_throughput_target=150)
+
+        for result, fleet in ((fixed, Fleet(ROUTE, ev, fleet_size=7)), (sized, Fleet(ROUTE, ev, peak_throughput_target=150))):
+            assert result.valid.all()
+            for output in ('score', 'fleet_cost_1k_usd', 'fleet_size', 'peak_hourly_passenger_throughput', 'average_wait_time_minutes', 'maximum_passenger_volume'):
+                assert result.samples[output].tolist() == [getattr(fleet, output)] * 2, output
+
+
+def test_seeded_and_independent_of_workers(evs):
+    choices = choices_of(evs[3])
+    serial = run_monte_carlo(ROUTE, choices, DISTRIBUTIONS, samples=5000, fleet_size=10, seed=7, chunk_size=1000)
+    parallel = run_monte_carlo(ROUTE, choices, DISTRIBUTIONS, samples=5000, fleet_size=10, seed=7, chunk_size=1000, workers=2)
+    other = run_monte_carlo(ROUTE, choices, DISTRIBUTIONS, samples=5000, fleet_size=10, seed=8, chunk_size=1000)
+
+    assert np.array_equal(serial.samples['score'], parallel.samples['score'], equal_nan=True)
+    assert not np.array_equal(serial.samples['score'], other.samples['score'], equal_nan=True)
+
+
+def test_distributions_and_target_probability(evs):
+    choices = choices_of(evs[3])
+    fleet = Fleet(ROUTE, evs[3], fleet_size=10)
+    result = run_monte_carlo(ROUTE, choices, DISTRIBUTIONS, samples=20_000, fleet_size=10, peak_throughput_target=fleet.peak_hourly_passenger_throughput, seed=0)
+
+    q05, q50, q95 = result.quantiles('score', (0.05, 0.5, 0.95))
+    assert q05 < q50 < q95
+    # a load factor spread around the nominal value leaves roughly half of the samples short of the nominal throughput
+    assert 0.2 < result.probability_meeting_target < 0.8
+    assert set(result.summary()) == {'score', 'fleet_cost_1k_usd', 'valid_fraction', 'probability_meeting_target'}
+
+
+def test_invalid_arguments(evs):
+    choices = choices_of(evs[0])
+    with pytest.raises(ValueError):
+        run_monte_carlo(ROUTE, choices, {'PASSENGER_WEIGHT_AVERAGE_KG': Normal(100, 10)}, fleet_size=3)
+    with pytest.raises(ValueError):
+        run_monte_carlo(ROUTE, choices, DISTRIBUTIONS)
@@ -1,5 +1,7 @@
-from models.multi_attribute_utility import MultiAttributeUtility
+from models.multi_attribute_utility import (AVAILABILITY_UTILITY, AVERAGE_WAIT_TIME_UTILITY, PASSENGER_VOLUME_UTILITY,
+                                            PEAK_PASSENGER_THROUGHPUT_UTILITY, MultiAttributeUtility, score_batch)
 
+import numpy as np
 import pytest
 
 
@@ -70,3 +72,47 @@ def test_availibility_dml3_utility(test_case):
 
     with pytest.raises(ValueError):
         test_case.utility_availibility_dml3(-1)
+
+
+def reference_interpolate(x, util_map):
+    p1 = p2 = list(util_map.items())[0]
+    for k, v in util_map.items():
+        if k <= x:
+            p1 = (k, v)
+        if k >= x:
+            p2 = (k, v)
+            break
+    else:
+        p2 = p1
+
+    if p1 == p2:
+        return p1[1]
+
+    x1, y1 = p1
+    x2, y2 = p2
+    return round(y1 + (x - x1) * (y2 - y1)/(x2 - x1), 4)
+
+
+@pytest.mark.parametrize('curve', [PASSENGER_VOLUME_UTILITY, PEAK_PASSENGER_THROUGHPUT_UTILITY, AVERAGE_WAIT_TIME_UTILITY, AVAILABILITY_UTILITY])
+def test_utility_curve_matches_linear_scan(curve):
+    util_map = curve.to_dict()
+    top = max(util_map) * 1.3
+    xs = np.concatenate((np.linspace(-1, top, 5001), list(util_map), [float('nan')]))
+
+    expected = [reference_interpolate(x, util_map) for x in xs.tolist()]
+    assert [curve(x) for x in xs.tolist()] == expected
+    assert curve.evaluate(xs).tolist() == expected
+
+
+def test_score_batch_matches_scalar():
+    rng = np.random.default_rng(3)
+    volume = rng.uniform(0, 3000, 2000).round(3)
+    throughput = rng.integers(0, 260, 2000)
+    wait = rng.uniform(0, 35, 2000).round(3)
+    availability = rng.uniform(0, 1, 2000).round(4)
+
+    expected = [MultiAttributeUtility(*args).score for args in zip(volume.tolist(), throughput.tolist(), wait.tolist(), availability.tolist())]
+    assert score_batch(volume, throughput, wait, availability).tolist() == expected
+
+    with pytest.raises(ValueError):
+        score_batch([1], [1], [-1], [1])
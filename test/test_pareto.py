@@ -0,0 +1,64 @@
+from models.chasis import ChasisChoice
+from models.ev_batch import iter_design_space
+from models.pareto import ParetoArchive, _nondominated_mask_nd, explore_pareto_front, nondominated_mask
+from models.route import Route
+
+import numpy as np
+import pytest
+
+
+def brute_force_mask(points):
+    dominated = [any(np.all(q <= p) and np.any(q < p) for q in points) for p in points]
+    return ~np.array(dominated)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3, 4])
+def test_nondominated_mask_matches_brute_force(k):
+    rng = np.random.default_rng(k)
+    points = rng.integers(0, 12, size=(300, k)).astype(float)
+    assert np.array_equal(nondominated_mask(points), brute_force_mask(points))
+
+
+def test_incremental_archive_matches_single_pass():
+    rng = np.random.default_rng(7)
+    points = rng.random((2000, 3))
+    archive = ParetoArchive(('min', 'max', 'min'))
+    for start in range(0, len(points), 128):
+        archive.add(points[start:start + 128], np.arange(start, min(start + 128, len(points)))[:, None])
+
+    expected = np.flatnonzero(nondominated_mask(points * [1, -1, 1]))
+    assert sorted(archive.payloads[:, 0].tolist()) == expected.tolist()
+    assert archive.evaluated == len(points)
+
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 256])
+def test_blocked_front_and_archive_keep_duplicates(block_size):
+    rng = np.random.default_rng(block_size)
+    points = rng.integers(0, 6, size=(400, 3)).astype(float)
+    assert np.array_equal(_nondominated_mask_nd(points, block_size=block_size), brute_force_mask(points))
+
+    # batches in order of decreasing quality and then improving again, so archived points get dominated later
+    order = np.argsort(-points.sum(axis=1), kind='stable')
+    archive = ParetoArchive(('min', 'min', 'min'))
+    for start in range(0, len(order), 33):
+        archive.add(points[order[start:start + 33]], order[start:start + 33, None])
+    assert sorted(archive.payloads[:, 0].tolist()) == np.flatnonzero(brute_force_mask(points)).tolist()
+
+def test_explore_pareto_front():
+    route = Route(length_km=12, number_stops=6)
+    choices = [c for c in iter_design_space() if c[3] in (ChasisChoice.C2, ChasisChoice.C5)]
+    front = explore_pareto_front(route, fleet_sizes=range(1, 6), choices=choices)
+
+    costs = [p.coordinates['fleet_cost_1k_usd'] for p in front]
+    scores = [p.coordinates['score'] for p in front]
+    assert costs == sorted(costs)
+    assert all(a < b for a, b in zip(scores, scores[1:]))
+
+    best = front[-1]
+    fleet = best.to_fleet(route)
+    assert fleet.score == best.coordinates['score']
+    assert fleet.fleet_cost_1k_usd == best.coordinates['fleet_cost_1k_usd']
+
+    with pytest.raises(ValueError):
+        explore_pareto_front(route, fleet_sizes=[1], objectives=('speed',))
@@ -0,0 +1,90 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.export import FleetWriter
+from models.fleet import Fleet
+from models.fleet_record import FleetRecordArray
+from models.multi_attribute_utility import DEFAULT_CURVES, UtilityCurve, score_batch
+from models.rescore import MAU_INPUTS, load_scheme, main, read_chunks, rescore_results
+from models.route import Route
+from models.sweep import StudySpec, run_study
+
+WEIGHTS = (0.1, 0.2, 0.3, 0.4)
+CURVES = DEFAULT_CURVES[:3] + (UtilityCurve({0.0: 0.0, 0.5: 0.2, 0.9: 1.0}),)
+
+
+@pytest.fixture
+def fleets():
+    fleets = []
+    for choices in list(iter_design_space())[::97]:
+        try:
+            ev = Ev(*choices)
+        except ValueError:
+            continue
+        fleets.append(Fleet(Route(length_km=12, number_stops=6), ev, peak_throughput_target=120))
+        fleets.append(Fleet(Route(length_km=12, number_stops=6), ev, fleet_size=4))
+    return fleets
+
+
+def _expected(fleets) -> np.ndarray:
+    inputs = [[getattr(fleet, name) if name != 'availability' else fleet.vehicle.availability for fleet in fleets] for name in MAU_INPUTS]
+    return score_batch(*inputs, weights=WEIGHTS, curves=CURVES)
+
+
+def test_rescore_file(tmp_path, fleets):
+    with FleetWriter(tmp_path / 'fleets.csv') as writer:
+        writer.write_many(fleets)
+
+    unchanged = rescore_results(tmp_path / 'fleets.csv', chunk_size=7)
+    assert unchanged.scores.tolist() == [fleet.score for fleet in fleets]
+    assert unchanged.changed == 0 and unchanged.rank_correlation() == 1.0
+
+    result = rescore_results(tmp_path / 'fleets.csv', tmp_path / 'rescored.csv', WEIGHTS, CURVES, keep=('chasis', 'fleet_size'), chunk_size=7)
+    expected = _expected(fleets)
+    assert np.array_equal(result.scores, expected)
+    assert result.scores[result.top(1)[0]] == expected.max()
+    assert sorted(result.rank.tolist()) == list(range(1, len(fleets) + 1))
+
+    with open(tmp_path / 'rescored.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [int(row['row']) for row in rows] == list(range(len(fleets)))
+    assert [row['chasis'] for row in rows] == [fleet.vehicle.chasis.choice.name for fleet in fleets]
+    assert [float(row['score']) for row in rows] == expected.tolist()
+    assert [int(row['rank']) for row in rows] == result.rank.tolist()
+
+
+def test_rescore_study_and_records(tmp_path, fleets):
+    spec = StudySpec(routes=[{'length_km': 12, 'stops': 6}], fleet_sizes=[2, 5], subsystems={'chasis': ['C2', 'C4']}, feasible_only=True)
+    manifest = run_study(spec, tmp_path / 'study', shard_size=40, format='csv', workers=1)
+    rows = sum(shard['rows'] for shard in manifest['shards'])
+    result = rescore_results(tmp_path / 'study', tmp_path / 'rescored.csv', WEIGHTS, CURVES, keep=('chasis',), chunk_size=16)
+    assert len(result) == rows
+    with open(tmp_path / 'rescored.csv', newline='') as f:
+        assert len(list(csv.DictReader(f))) == rows
+
+    records = FleetRecordArray(fleet.to_record() for fleet in fleets)
+    chunks = list(read_chunks(records, MAU_INPUTS, chunk_size=10))
+    assert np.array_equal(np.concatenate([chunk['availability'] for chunk in chunks]), [fleet.vehicle.availability for fleet in fleets])
+    assert np.array_equal(rescore_results(records, weights=WEIGHTS, curves=CURVES).scores, _expected(fleets))
+
+
+def test_scheme_and_main(tmp_path, fleets, capsys):
+    scheme = {'weights': dict(zip(('WEIGHT_PASSENGER_VOLUME', 'WEIGHT_PEAK_PASSENGER_THROUGHPUT', 'WEIGHT_AVERAGE_WAIT_TIME', 'WEIGHT_AVAILABILITY'), WEIGHTS)),
+              'curves': {'AVAILABILITY_UTILITY': {'0': 0, '0.5': 0.2, '0.9': 1}}}
+    (tmp_path / 'scheme.json').write_text(json.dumps(scheme))
+    weights, curves = load_scheme(tmp_path / 'scheme.json')
+    assert weights == WEIGHTS and curves[3].to_dict() == CURVES[3].to_dict() and curves[0] is DEFAULT_CURVES[0]
+
+    (tmp_path / 'bad.json').write_text(json.dumps({'weights': {'WEIGHT_COMFORT': 1}}))
+    with pytest.raises(ValueError):
+        load_scheme(tmp_path / 'bad.json')
+
+    with FleetWriter(tmp_path / 'fleets.csv') as writer:
+        writer.write_many(fleets)
+    assert main([str(tmp_path / 'fleets.csv'), str(tmp_path / 'out.csv'), '--scheme', str(tmp_path / 'scheme.json')]) == 0
+    assert f'Rescored {len(fleets)} rows' in capsys.readouterr().out
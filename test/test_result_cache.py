@@ -0,0 +1,65 @@
+from models import fleet, result_cache
+from models.ev_batch import iter_design_space
+from models.fleet_record import FleetRecord
+from models.result_cache import ResultCache, model_version
+from models.route import Route
+from models.sweep_runner import SweepGrid, evaluate_chunk
+
+import pytest
+
+
+@pytest.fixture
+def grid():
+    routes = [Route(length_km=5, number_stops=3), Route(length_km=20, number_stops=10)]
+    return SweepGrid(routes, peak_throughput_targets=[50, 150], choices=list(iter_design_space())[:60])
+
+
+def test_cached_sweep_matches_evaluation(grid, tmp_path):
+    expected = evaluate_chunk(grid, 0, len(grid))
+    with ResultCache(tmp_path / 'cache.sqlite') as cache:
+        first = cache.evaluate(grid)
+        assert cache.hits == 0 and len(cache) == len(grid)
+
+    # a new process: everything comes from disk
+    with ResultCache(tmp_path / 'cache.sqlite') as cache:
+        second = cache.evaluate(grid)
+        assert cache.hits == len(grid) and cache.misses == 0
+
+    for results in (first, second):
+        assert [(r.index, r.fleet, r.error) for r in results] == [(r.index, r.fleet, r.error) for r in expected]
+
+
+def test_model_version_invalidates(grid, tmp_path, monkeypatch):
+    version = model_version()
+    assert model_version() == version
+    # a formula change is recorded by bumping MODEL_VERSION
+    monkeypatch.setattr(result_cache, '_MODEL_VERSION', None)
+    monkeypatch.setattr(fleet, 'MODEL_VERSION', fleet.MODEL_VERSION + 1)
+    assert model_version() != version
+    monkeypatch.undo()
+
+    with ResultCache(tmp_path / 'cache.sqlite') as cache:
+        cache.evaluate(grid, 0, 40)
+    with ResultCache(tmp_path / 'cache.sqlite', version='another model') as cache:
+        cache.evaluate(grid, 0, 40)
+        assert cache.hits == 0 and len(cache) == 80
+
+
+def test_keys_and_lru_eviction(grid, tmp_path):
+    with ResultCache(tmp_path / 'cache.sqlite', max_entries=50) as cache:
+        choices, route, value = grid.point(0)
+        assert cache.key(choices, route, value, False) == cache.key(choices, Route(5.0, 3), float(value), False)
+        assert cache.key(choices, route, value, False) != cache.key(choices, route, value, True)
+        assert cache.key(choices, route, value, False) != cache.key(choices, route, value, False, violate_constraints=True)
+
+        cache.evaluate(grid, 0, 40)
+        cache.get_many([cache.key(*grid.point(i), False) for i in range(10)])
+        cache.evaluate(grid, 40, 60)
+        assert len(cache) == 50
+        # the 10 most recently read points survive, the 10 oldest unread ones are evicted
+        kept = cache.get_many([cache.key(*grid.point(i), False) for i in range(40)])
+        assert len(kept) == 30 and all(cache.key(*grid.point(i), False) in kept for i in range(10))
+        assert all(isinstance(value, (FleetRecord, str)) for value in kept.values())
+
+    with pytest.raises(ValueError):
+        ResultCache(tmp_path / 'other.sqlite', max_entries=0)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from models.ev import Ev
+from models.feasibility import feasible_choices
+from models.fleet import Fleet
+from models.monte_carlo import Uniform
+from models.route import Route
+from models.sensitivity import local_sensitivities, nominal_value, sobol_indices
+
+ROUTE = Route(length_km=15, number_stops=8)
+CHOICES = feasible_choices()[500]
+
+
+def test_local_sensitivities():
+    fleet = Fleet(ROUTE, Ev(*CHOICES), peak_throughput_target=150)
+    local = local_sensitivities(ROUTE, CHOICES, fleet_size=fleet.fleet_size)
+
+    assert local.nominal_outputs == {'score': fleet.score, 'fleet_cost_1k_usd': fleet.fleet_cost_1k_usd}
+    assert nominal_value(ROUTE, 'length_km') == 15 and nominal_value(ROUTE, 'chasis_cost_1k_usd') == 1.0
+
+    # the fleet cost is linear in every component cost (steps below its 2 decimal rounding would not show)
+    for subsystem in ('chasis', 'battery_pack', 'battery_charger'):
+        expected = fleet.fleet_size * getattr(fleet.vehicle, subsystem).cost_1k_usd
+        assert local.derivative('fleet_cost_1k_usd', f'{subsystem}_cost_1k_usd') == pytest.approx(expected)
+    assert local.derivative('fleet_cost_1k_usd', 'length_km') == 0
+
+    # longer routes mean longer waits for the same fleet
+    assert local.derivative('score', 'length_km') < 0
+    assert local.ranking('fleet_cost_1k_usd')[0][0] == 'chasis_cost_1k_usd'
+
+
+def test_local_sensitivities_validation():
+    with pytest.raises(ValueError):
+        local_sensitivities(ROUTE, CHOICES, inputs=('colour',), fleet_size=5)
+    with pytest.raises(ValueError):
+        local_sensitivities(ROUTE, CHOICES)
+    with pytest.raises(ValueError):
+        local_sensitivities(ROUTE, CHOICES, fleet_size=5, outputs=('colour',))
+
+
+def test_sobol_indices_of_an_additive_output():
+    fleet = Fleet(ROUTE, Ev(*CHOICES), fleet_size=6)
+    distributions = {'chasis_cost_1k_usd': Uniform(0.5, 1.5), 'battery_pack_cost_1k_usd': Uniform(0.5, 1.5), 'length_km': Uniform(10, 20)}
+    result = sobol_indices(ROUTE, CHOICES, distributions, samples=50_000, fleet_size=6, seed=7)
+
+    # fleet cost = 6 * (sum of the component costs): each index is the share of its squared coefficient
+    c = np.array([fleet.vehicle.chasis.cost_1k_usd, fleet.vehicle.battery_pack.cost_1k_usd]) ** 2
+    indices = result.indices('fleet_cost_1k_usd')
+    for name, expected in zip(('battery_pack_cost_1k_usd', 'chasis_cost_1k_usd'), (c[1] / c.sum(), c[0] / c.sum())):
+        assert indices[name][0] == pytest.approx(expected, abs=0.04)
+        assert indices[name][1] == pytest.approx(expected, abs=0.04)
+    assert indices['length_km'] == (0.0, 0.0)
+
+    assert result.evaluations == 50_000 * 5 and result.valid_fraction == 1.0
+    assert result.ranking('score')[0][0] == 'length_km'
+    assert sobol_indices(ROUTE, CHOICES, distributions, samples=500, fleet_size=6, seed=7, chunk_size=64).indices() == \
+        sobol_indices(ROUTE, CHOICES, distributions, samples=500, fleet_size=6, seed=7).indices()
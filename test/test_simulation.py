@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from models.autonomous_system import AutonomousSystemChoice
+from models.battery_charger import BatteryChargerChoice
+from models.battery_pack import BatteryPackChoice
+from models.chasis import ChasisChoice
+from models.ev import Ev
+from models.fleet import Fleet
+from models.motor_and_inverter import MotorAndInverterChoice
+from models.route import Route
+from models.simulation import FleetSimulation, simulate_fleet
+
+
+@pytest.fixture
+def ev():
+    return Ev(AutonomousSystemChoice.A2, BatteryChargerChoice.G2, BatteryPackChoice.P2, ChasisChoice.C5, MotorAndInverterChoice.M1)
+
+
+def test_undisturbed_fleet_matches_analytic(ev):
+    route = Route(length_km=15, number_stops=8)
+    fleet = Fleet(route, ev, fleet_size=12)
+    result = simulate_fleet(route, ev, 12, days=3)
+
+    # every vehicle has its own charger, and berths only conflict when recharged vehicles rejoin out of phase
+    assert result.dwell_conflict_minutes < 0.01 * 12 * 24 * 60 * 3
+    assert not np.any(result.charge_queue_minutes)
+    assert result.peak_hourly_passenger_throughput == pytest.approx(fleet.peak_hourly_passenger_throughput, rel=0.05)
+    # energy is only used while driving, so vehicles stay in service at least as long as the analytic uptime
+    assert result.availability >= fleet.vehicle.availability - 0.01
+    assert np.median(result.headways_minutes) == pytest.approx(fleet.average_wait_time_minutes, rel=0.01)
+
+
+def test_charger_queueing_lowers_availability(ev):
+    route = Route(length_km=15, number_stops=8)
+    unlimited = simulate_fleet(route, ev, 12, days=2)
+    single = simulate_fleet(route, ev, 12, days=2, chargers=1)
+
+    assert np.any(single.charge_queue_minutes > 0)
+    assert single.availability < unlimited.availability
+    assert single.daily_passenger_volume < unlimited.daily_passenger_volume
+
+
+def test_berths_cap_departures(ev):
+    # a steady-state headway shorter than the dwell time saturates the berths
+    route = Route(length_km=5, number_stops=3)
+    result = simulate_fleet(route, ev, 40)
+
+    assert result.dwell_conflict_minutes > 0
+    assert result.headways_minutes.min() >= FleetSimulation(route, ev, 40).dwell_minutes - 1e-9
+    assert result.peak_hourly_passenger_throughput < Fleet(route, ev, fleet_size=40).peak_hourly_passenger_throughput
+
+
+def test_invalid_arguments(ev):
+    with pytest.raises(ValueError):
+        FleetSimulation(Route(length_km=5, number_stops=0), ev, 4)
+    with pytest.raises(ValueError):
+        FleetSimulation(Route(length_km=5, number_stops=3), ev, 0)
+    with pytest.raises(ValueError):
+        FleetSimulation(Route(length_km=5, number_stops=3), ev, 4, chargers=0)
+    with pytest.raises(ValueError):
+        FleetSimulation(Route(length_km=5000, number_stops=3), ev, 4)
@@ -0,0 +1,105 @@
+import csv
+import json
+import os
+
+import pytest
+
+import models.sweep
+import models.sweep_runner
+from models.sweep import MANIFEST_NAME, StudySpec, load_manifest, main, run_study
+from models.sweep_runner import run_sweep
+
+SPEC = {
+    'routes': [{'length_km': 5, 'stops': 3}, {'length_km': 20, 'stops': 10}],
+    'peak_throughput_targets': [50, 150],
+    'subsystems': {'chasis': ['C1', 'C5'], 'battery_pack': ['P1', 'P4'], 'autonomous_system': ['A2']},
+    'violate_constraints': False,
+}
+
+
+def _rows(output_dir):
+    rows = []
+    for shard in load_manifest(output_dir)['shards']:
+        with open(os.path.join(output_dir, shard['path']), newline='') as f:
+            rows += list(csv.reader(f))[1:]
+    return rows
+
+
+def test_study_matches_sweep(tmp_path):
+    spec = StudySpec.from_dict(SPEC)
+    grid = spec.grid()
+    assert len(grid) == 1 * 3 * 2 * 2 * 4 * 2 * 2
+
+    manifest = run_study(spec, tmp_path, shard_size=50, workers=1, format='csv')
+    assert manifest['complete'] and manifest['points'] == len(grid)
+    assert [(shard['start'], shard['stop']) for shard in manifest['shards']] == [(start, min(start + 50, len(grid))) for start in range(0, len(grid), 50)]
+
+    results = list(run_sweep(grid, workers=1))
+    assert sum(shard['errors'] for shard in manifest['shards']) == sum(not result.ok for result in results)
+    rows = _rows(tmp_path)
+    assert len(rows) == sum(result.ok for result in results)
+    assert [row[2] for row in rows] == [str(result.fleet['fleet_size']) for result in results if result.ok]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.partial')]
+
+
+def test_parallel_study_shares_one_pool(tmp_path, monkeypatch):
+    spec = StudySpec.from_dict(SPEC)
+    run_study(spec, tmp_path / 'serial', shard_size=40, workers=1, format='csv')
+
+    pools = []
+
+    def sweep_executor(grid, workers=None):
+        pools.append(models.sweep_runner.sweep_executor(grid, workers))
+        return pools[-1]
+    monkeypatch.setattr(models.sweep, 'sweep_executor', sweep_executor)
+
+    manifest = run_study(spec, tmp_path / 'parallel', shard_size=40, chunk_size=16, workers=2, format='csv')
+    assert len(pools) == 1 and len(manifest['shards']) > 1
+    assert _rows(tmp_path / 'parallel') == _rows(tmp_path / 'serial')
+
+
+def test_study_resumes_unfinished_shards(tmp_path):
+    spec = StudySpec.from_dict(SPEC)
+    run_study(spec, tmp_path, shard_size=40, workers=1, format='csv')
+    expected = _rows(tmp_path)
+
+    # an interrupted run: the last two shards never made it to the manifest
+    manifest = load_manifest(tmp_path)
+    for shard in manifest['shards'][-2:]:
+        os.remove(os.path.join(tmp_path, shard['path']))
+    manifest['shards'] = manifest['shards'][:-2]
+    manifest['complete'] = False
+    with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f)
+
+    written = []
+    resumed = run_study(spec, tmp_path, shard_size=40, workers=1, format='csv', progress=written.append)
+    assert [shard['index'] for shard in written] == [len(resumed['shards']) - 2, len(resumed['shards']) - 1]
+    assert resumed['complete'] and _rows(tmp_path) == expected
+
+    with pytest.raises(ValueError):
+        run_study(spec, tmp_path, shard_size=30, workers=1, format='csv')
+    with pytest.raises(ValueError):
+        run_study(StudySpec.from_dict({**SPEC, 'violate_constraints': True}), tmp_path, shard_size=40, workers=1, format='csv')
+
+
+def test_spec_validation():
+    with pytest.raises(ValueError):
+        StudySpec.from_dict({**SPEC, 'fleet_sizes': [3]})
+    with pytest.raises(ValueError):
+        StudySpec.from_dict({**SPEC, 'subsystems': {'chasis': ['C99']}})
+    with pytest.raises(ValueError):
+        StudySpec.from_dict({**SPEC, 'colour': 'red'})
+
+    feasible = StudySpec.from_dict({**SPEC, 'feasible_only': True})
+    assert 0 < len(feasible.choices()) < len(StudySpec.from_dict(SPEC).choices())
+
+
+def test_main(tmp_path, capsys):
+    spec_path = tmp_path / 'study.json'
+    spec_path.write_text(json.dumps({**SPEC, 'feasible_only': True}))
+
+    assert main([str(spec_path), str(tmp_path / 'out'), '--shard-size', '25', '--workers', '1', '--format', 'csv']) == 0
+    manifest = load_manifest(tmp_path / 'out')
+    assert manifest['complete'] and all(shard['errors'] == 0 for shard in manifest['shards'])
+    assert 'manifest' in capsys.readouterr().out
@@ -0,0 +1,58 @@
+from models.ev import Ev
+from models.ev_batch import iter_design_space
+from models.fleet import Fleet
+from models.route import Route
+from models.sweep_runner import SweepGrid, run_sweep
+
+import pytest
+
+
+@pytest.fixture
+def grid():
+    choices = list(iter_design_space())[:40]
+    routes = [Route(length_km=5, number_stops=3), Route(length_km=20, number_stops=10)]
+    return SweepGrid(routes, peak_throughput_targets=[50, 150], choices=choices)
+
+
+def test_grid_points(grid):
+    assert len(grid) == 40 * 2 * 2
+    choices, route, value = grid.point(5)
+    assert choices == grid.choices[1] and route is grid.routes[0] and value == 150
+
+
+def test_serial_sweep_matches_fleet(grid):
+    progress = []
+    results = list(run_sweep(grid, workers=1, chunk_size=7, progress=progress.append))
+
+    assert [result.index for result in results] == list(range(len(grid)))
+    assert progress[-1].points_done == len(grid) and progress[-1].chunks_done == progress[-1].chunks_total
+    assert progress[-1].errors == sum(1 for result in results if not result.ok) > 0
+
+    for result in results:
+        try:
+            ev = Ev(*result.choices)
+        except ValueError as e:
+            assert result.error == str(e)
+            continue
+        assert result.fleet == Fleet(result.route, ev, peak_throughput_target=result.value).to_dict()
+
+
+def test_parallel_sweep_is_deterministic(grid):
+    serial = list(run_sweep(grid, workers=1, chunk_size=16, include_errors=False))
+    parallel = list(run_sweep(grid, workers=2, chunk_size=16, include_errors=False))
+    assert [(r.index, r.fleet) for r in parallel] == [(r.index, r.fleet) for r in serial]
+    assert all(result.ok for result in parallel)
+
+
+def test_grid_validation():
+    with pytest.raises(ValueError):
+        SweepGrid([Route(1, 1)])
+    with pytest.raises(ValueError):
+        SweepGrid([Route(1, 1)], fleet_sizes=[1], peak_throughput_targets=[1])
+    for fleet_sizes in ([0], [2, -1], [2.5], ['3'], [True]):
+        with pytest.raises(ValueError):
+            SweepGrid([Route(1, 1)], fleet_sizes=fleet_sizes)
+    for targets in ([0], [-5], [float('nan')], ['5'], [None]):
+        with pytest.raises(ValueError):
+            SweepGrid([Route(1, 1)], peak_throughput_targets=targets)
+    assert len(SweepGrid([Route(1, 1)], peak_throughput_targets=[0.5, float('inf')], choices=[])) == 0